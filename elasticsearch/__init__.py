@@ -37,7 +37,16 @@ from .client import Elasticsearch
 from .transport import Transport
 from .connection_pool import ConnectionPool, ConnectionSelector, RoundRobinSelector
 from .serializer import JSONSerializer
-from .connection import Connection, RequestsHttpConnection, Urllib3HttpConnection
+from .retry import RetryBudget, CircuitBreaker
+from .metrics import Metrics
+from .cache import ResponseCache
+from .tracing import Tracer, OpenTelemetryTracer
+from .connection import (
+    Connection,
+    RequestsHttpConnection,
+    Urllib3HttpConnection,
+    HttpxHttpConnection,
+)
 from .exceptions import (
     ImproperlyConfigured,
     ElasticsearchException,
@@ -49,6 +58,7 @@ from .exceptions import (
     ConnectionError,
     SSLError,
     ConnectionTimeout,
+    ResponseTooLargeError,
     AuthenticationException,
     AuthorizationException,
     ElasticsearchDeprecationWarning,
@@ -65,9 +75,16 @@ __all__ = [
     "ConnectionSelector",
     "RoundRobinSelector",
     "JSONSerializer",
+    "RetryBudget",
+    "CircuitBreaker",
+    "Metrics",
+    "ResponseCache",
+    "Tracer",
+    "OpenTelemetryTracer",
     "Connection",
     "RequestsHttpConnection",
     "Urllib3HttpConnection",
+    "HttpxHttpConnection",
     "ImproperlyConfigured",
     "ElasticsearchException",
     "SerializationError",
@@ -78,6 +95,7 @@ __all__ = [
     "ConnectionError",
     "SSLError",
     "ConnectionTimeout",
+    "ResponseTooLargeError",
     "AuthenticationException",
     "AuthorizationException",
     "ElasticsearchDeprecationWarning",
@@ -89,12 +107,14 @@ try:
         raise ImportError
 
     from ._async.http_aiohttp import AIOHttpConnection, AsyncConnection
+    from ._async.http_httpx import AsyncHttpxHttpConnection
     from ._async.transport import AsyncTransport
     from ._async.client import AsyncElasticsearch
 
     __all__ += [
         "AIOHttpConnection",
         "AsyncConnection",
+        "AsyncHttpxHttpConnection",
         "AsyncTransport",
         "AsyncElasticsearch",
     ]
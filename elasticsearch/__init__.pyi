@@ -26,10 +26,21 @@ from .connection_pool import (
     RoundRobinSelector as RoundRobinSelector,
 )
 from .serializer import JSONSerializer as JSONSerializer
+from .retry import (
+    RetryBudget as RetryBudget,
+    CircuitBreaker as CircuitBreaker,
+)
+from .metrics import Metrics as Metrics
+from .cache import ResponseCache as ResponseCache
+from .tracing import (
+    Tracer as Tracer,
+    OpenTelemetryTracer as OpenTelemetryTracer,
+)
 from .connection import (
     Connection as Connection,
     RequestsHttpConnection as RequestsHttpConnection,
     Urllib3HttpConnection as Urllib3HttpConnection,
+    HttpxHttpConnection as HttpxHttpConnection,
 )
 from .exceptions import (
     ImproperlyConfigured as ImproperlyConfigured,
@@ -42,6 +53,7 @@ from .exceptions import (
     ConnectionError as ConnectionError,
     SSLError as SSLError,
     ConnectionTimeout as ConnectionTimeout,
+    ResponseTooLargeError as ResponseTooLargeError,
     AuthenticationException as AuthenticationException,
     AuthorizationException as AuthorizationException,
     ElasticsearchDeprecationWarning as ElasticsearchDeprecationWarning,
@@ -52,6 +64,9 @@ try:
         raise ImportError
 
     from ._async.http_aiohttp import AIOHttpConnection as AIOHttpConnection
+    from ._async.http_httpx import (
+        AsyncHttpxHttpConnection as AsyncHttpxHttpConnection,
+    )
     from ._async.transport import AsyncTransport as AsyncTransport
     from ._async.client import AsyncElasticsearch as AsyncElasticsearch
 except (ImportError, SyntaxError):
@@ -0,0 +1,61 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import asyncio
+
+from .compat import get_running_loop
+
+
+class _AsyncSingleFlight(object):
+    """
+    Async version of :class:`~elasticsearch.cache._SingleFlight`: awaits a
+    coroutine function only once for all the concurrent calls sharing the
+    same key.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        future = self._calls.get(key)
+        while future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # we were cancelled ourselves, not the call we waited for
+                if not future.cancelled():
+                    raise
+            future = self._calls.get(key)
+
+        future = self._calls[key] = get_running_loop().create_future()
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            # don't warn about an exception nobody was waiting for
+            future.exception()
+            raise
+        except BaseException:
+            # cancelled, let the waiting calls try again
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -20,38 +20,15 @@ from __future__ import unicode_literals
 import logging
 
 from ..transport import AsyncTransport, TransportError
-from .utils import query_params, _make_path, SKIP_IN_PATH, _bulk_body, _normalize_hosts
-
-from .async_search import AsyncSearchClient
-from .autoscaling import AutoscalingClient
-from .cat import CatClient
-from .cluster import ClusterClient
-from .dangling_indices import DanglingIndicesClient
-from .indices import IndicesClient
-from .ingest import IngestClient
-from .nodes import NodesClient
-from .snapshot import SnapshotClient
-from .tasks import TasksClient
-
-# xpack APIs
-from .xpack import XPackClient
-from .ccr import CcrClient
-from .enrich import EnrichClient
-from .eql import EqlClient
-from .graph import GraphClient
-from .ilm import IlmClient
-from .license import LicenseClient
-from .migration import MigrationClient
-from .ml import MlClient
-from .monitoring import MonitoringClient
-from .rollup import RollupClient
-from .searchable_snapshots import SearchableSnapshotsClient
-from .security import SecurityClient
-from .slm import SlmClient
-from .sql import SqlClient
-from .ssl import SslClient
-from .transform import TransformClient
-from .watcher import WatcherClient
+from .utils import (
+    query_params,
+    _make_path,
+    SKIP_IN_PATH,
+    _bulk_body,
+    _normalize_hosts,
+    _LazyNamespace,
+    _lazy_namespace_classes,
+)
 
 
 logger = logging.getLogger("elasticsearch")
@@ -182,6 +159,41 @@ class AsyncElasticsearch(object):
 
     """
 
+    # namespaced clients for compatibility with API names, created and
+    # imported on first access
+    async_search = _LazyNamespace(__name__, "async_search", "AsyncSearchClient")
+    autoscaling = _LazyNamespace(__name__, "autoscaling", "AutoscalingClient")
+    cat = _LazyNamespace(__name__, "cat", "CatClient")
+    cluster = _LazyNamespace(__name__, "cluster", "ClusterClient")
+    indices = _LazyNamespace(__name__, "indices", "IndicesClient")
+    ingest = _LazyNamespace(__name__, "ingest", "IngestClient")
+    nodes = _LazyNamespace(__name__, "nodes", "NodesClient")
+    snapshot = _LazyNamespace(__name__, "snapshot", "SnapshotClient")
+    tasks = _LazyNamespace(__name__, "tasks", "TasksClient")
+    xpack = _LazyNamespace(__name__, "xpack", "XPackClient")
+    ccr = _LazyNamespace(__name__, "ccr", "CcrClient")
+    dangling_indices = _LazyNamespace(
+        __name__, "dangling_indices", "DanglingIndicesClient"
+    )
+    enrich = _LazyNamespace(__name__, "enrich", "EnrichClient")
+    eql = _LazyNamespace(__name__, "eql", "EqlClient")
+    graph = _LazyNamespace(__name__, "graph", "GraphClient")
+    ilm = _LazyNamespace(__name__, "ilm", "IlmClient")
+    license = _LazyNamespace(__name__, "license", "LicenseClient")
+    migration = _LazyNamespace(__name__, "migration", "MigrationClient")
+    ml = _LazyNamespace(__name__, "ml", "MlClient")
+    monitoring = _LazyNamespace(__name__, "monitoring", "MonitoringClient")
+    rollup = _LazyNamespace(__name__, "rollup", "RollupClient")
+    searchable_snapshots = _LazyNamespace(
+        __name__, "searchable_snapshots", "SearchableSnapshotsClient"
+    )
+    security = _LazyNamespace(__name__, "security", "SecurityClient")
+    slm = _LazyNamespace(__name__, "slm", "SlmClient")
+    sql = _LazyNamespace(__name__, "sql", "SqlClient")
+    ssl = _LazyNamespace(__name__, "ssl", "SslClient")
+    transform = _LazyNamespace(__name__, "transform", "TransformClient")
+    watcher = _LazyNamespace(__name__, "watcher", "WatcherClient")
+
     def __init__(self, hosts=None, transport_class=AsyncTransport, **kwargs):
         """
         :arg hosts: list of nodes, or a single node, we should connect to.
@@ -199,38 +211,6 @@ class AsyncElasticsearch(object):
         """
         self.transport = transport_class(_normalize_hosts(hosts), **kwargs)
 
-        # namespaced clients for compatibility with API names
-        self.async_search = AsyncSearchClient(self)
-        self.autoscaling = AutoscalingClient(self)
-        self.cat = CatClient(self)
-        self.cluster = ClusterClient(self)
-        self.indices = IndicesClient(self)
-        self.ingest = IngestClient(self)
-        self.nodes = NodesClient(self)
-        self.snapshot = SnapshotClient(self)
-        self.tasks = TasksClient(self)
-
-        self.xpack = XPackClient(self)
-        self.ccr = CcrClient(self)
-        self.dangling_indices = DanglingIndicesClient(self)
-        self.enrich = EnrichClient(self)
-        self.eql = EqlClient(self)
-        self.graph = GraphClient(self)
-        self.ilm = IlmClient(self)
-        self.indices = IndicesClient(self)
-        self.license = LicenseClient(self)
-        self.migration = MigrationClient(self)
-        self.ml = MlClient(self)
-        self.monitoring = MonitoringClient(self)
-        self.rollup = RollupClient(self)
-        self.searchable_snapshots = SearchableSnapshotsClient(self)
-        self.security = SecurityClient(self)
-        self.slm = SlmClient(self)
-        self.sql = SqlClient(self)
-        self.ssl = SslClient(self)
-        self.transform = TransformClient(self)
-        self.watcher = WatcherClient(self)
-
     def __repr__(self):
         try:
             # get a list of all connections
@@ -470,7 +450,8 @@ class AsyncElasticsearch(object):
         elif scroll_id and not body:
             body = {"scroll_id": [scroll_id]}
         elif scroll_id:
-            params["scroll_id"] = scroll_id
+            # params may be the caller's own dict
+            params = dict(params, scroll_id=scroll_id)
 
         return await self.transport.perform_request(
             "DELETE", "/_search/scroll", params=params, headers=headers, body=body
@@ -1351,7 +1332,8 @@ class AsyncElasticsearch(object):
         elif scroll_id and not body:
             body = {"scroll_id": scroll_id}
         elif scroll_id:
-            params["scroll_id"] = scroll_id
+            # params may be the caller's own dict
+            params = dict(params, scroll_id=scroll_id)
 
         return await self.transport.perform_request(
             "POST", "/_search/scroll", params=params, headers=headers, body=body
@@ -2067,3 +2049,6 @@ class AsyncElasticsearch(object):
         return await self.transport.perform_request(
             "POST", _make_path(index, "_pit"), params=params, headers=headers
         )
+
+
+__getattr__ = _lazy_namespace_classes(AsyncElasticsearch, globals())
@@ -108,6 +108,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -122,6 +123,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -247,6 +249,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -379,6 +382,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -405,6 +409,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -481,6 +486,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -497,6 +503,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -522,6 +529,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -546,6 +554,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -569,6 +578,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -754,6 +764,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -775,6 +786,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -835,6 +847,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -849,6 +862,7 @@ class AsyncElasticsearch(object):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
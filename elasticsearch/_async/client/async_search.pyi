@@ -48,6 +48,7 @@ class AsyncSearchClient(NamespacedClient):
         filter_path: Optional[Union[str, Collection[str]]] = ...,
         request_timeout: Optional[Union[int, float]] = ...,
         ignore: Optional[Union[int, Collection[int]]] = ...,
+        cache_ttl: Optional[Union[int, float]] = ...,
         opaque_id: Optional[str] = ...,
         params: Optional[MutableMapping[str, Any]] = ...,
         headers: Optional[MutableMapping[str, str]] = ...
@@ -19,8 +19,18 @@ from ...client.utils import (  # noqa
     _make_path,
     _normalize_hosts,
     _escape,
-    _bulk_body,
+    _bulk_body as _sync_bulk_body,
     query_params,
     SKIP_IN_PATH,
     NamespacedClient as NamespacedClient,
+    _LazyNamespace,
+    _lazy_namespace_classes,
 )
+from ...connection.base import _StreamingBody
+
+
+def _bulk_body(serializer, body):
+    # async iterators and generators are serialized lazily as they are sent
+    if hasattr(body, "__aiter__"):
+        return _StreamingBody(serializer, body)
+    return _sync_bulk_body(serializer, body)
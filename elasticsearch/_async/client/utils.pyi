@@ -15,16 +15,30 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import os
+from typing import Any, AsyncIterable, IO, Iterable, Union
+
 from ...client.utils import (  # noqa
     _make_path as _make_path,
     _normalize_hosts as _normalize_hosts,
     _escape as _escape,
-    _bulk_body as _bulk_body,
+    _bulk_body as _sync_bulk_body,
     query_params as query_params,
     SKIP_IN_PATH as SKIP_IN_PATH,
+    _LazyNamespace as _LazyNamespace,
+    _lazy_namespace_classes as _lazy_namespace_classes,
 )
 from ..transport import AsyncTransport
 from ..client import AsyncElasticsearch
+from ...connection.base import _StreamingBody
+from ...serializer import Serializer
+
+def _bulk_body(
+    serializer: Serializer,
+    body: Union[
+        str, bytes, "os.PathLike[str]", IO[Any], Iterable[Any], AsyncIterable[Any]
+    ],
+) -> Union[str, bytes, _StreamingBody]: ...
 
 class NamespacedClient:
     client: AsyncElasticsearch
@@ -16,17 +16,35 @@
 #  under the License.
 
 import asyncio
+import time
+from collections import deque
 
 from .client import AsyncElasticsearch  # noqa
+from .compat import get_running_loop
 from ..exceptions import TransportError
 from ..compat import map
+from ..connection.base import _encode_line
+from ..tracing import start_span
 
 from ..helpers.actions import (
     _ActionChunker,
+    _get_tracer,
+    _msearch_concurrency,
+    _msearch_header,
     _process_bulk_chunk_error,
     _process_bulk_chunk_success,
+    _process_msearch_chunk_error,
+    _process_msearch_chunk_success,
+    _post_data_chunks,
     expand_action,
 )
+from ..helpers.batching import (
+    BulkIndexer,
+    _batch_key,
+    _bulk_item_result,
+    _complete_results,
+    _get_results,
+)
 from ..helpers.errors import ScanError
 
 import logging
@@ -65,8 +83,14 @@ async def _process_bulk_chunk(
     Send a bulk request to elasticsearch and process the output.
     """
     try:
-        # send the actual request
-        resp = await client.bulk("\n".join(bulk_actions) + "\n", *args, **kwargs)
+        with start_span(
+            _get_tracer(client),
+            "elasticsearch.helpers.bulk_chunk",
+            {"elasticsearch.bulk.actions": len(bulk_data)},
+        ) as span:
+            # send the actual request
+            resp = await client.bulk("\n".join(bulk_actions) + "\n", *args, **kwargs)
+            span.set_attribute("elasticsearch.bulk.errors", resp.get("errors"))
     except TransportError as e:
         gen = _process_bulk_chunk_error(
             error=e,
@@ -108,6 +132,71 @@ async def azip(*iterables):
         pass
 
 
+async def _send_bulk_chunk(
+    client,
+    bulk_data,
+    bulk_actions,
+    raise_on_error,
+    raise_on_exception,
+    max_retries,
+    initial_backoff,
+    max_backoff,
+    yield_ok,
+    *args,
+    **kwargs
+):
+    """
+    Send a serialized chunk, retrying documents rejected with ``429``, and
+    yield the results per action.
+    """
+    for attempt in range(max_retries + 1):
+        to_retry, to_retry_data = [], []
+        if attempt:
+            await asyncio.sleep(min(max_backoff, initial_backoff * 2 ** (attempt - 1)))
+
+        try:
+            async for data, (ok, info) in azip(
+                bulk_data,
+                _process_bulk_chunk(
+                    client,
+                    bulk_actions,
+                    bulk_data,
+                    raise_on_exception,
+                    raise_on_error,
+                    *args,
+                    **kwargs
+                ),
+            ):
+
+                if not ok:
+                    action, info = info.popitem()
+                    # retry if retries enabled, we get 429, and we are not
+                    # in the last attempt
+                    if (
+                        max_retries
+                        and info["status"] == 429
+                        and (attempt + 1) <= max_retries
+                    ):
+                        # _process_bulk_chunk expects strings so we need to
+                        # re-serialize the data
+                        to_retry.extend(map(client.transport.serializer.dumps, data))
+                        to_retry_data.append(data)
+                    else:
+                        yield ok, {action: info}
+                elif yield_ok:
+                    yield ok, info
+
+        except TransportError as e:
+            # suppress 429 errors since we will retry them
+            if attempt == max_retries or e.status_code != 429:
+                raise
+        else:
+            if not to_retry:
+                break
+            # retry only subset of documents that didn't succeed
+            bulk_actions, bulk_data = to_retry, to_retry_data
+
+
 async def async_streaming_bulk(
     client,
     actions,
@@ -164,57 +253,20 @@ async def async_streaming_bulk(
     async for bulk_data, bulk_actions in _chunk_actions(
         map_actions(), chunk_size, max_chunk_bytes, client.transport.serializer
     ):
-
-        for attempt in range(max_retries + 1):
-            to_retry, to_retry_data = [], []
-            if attempt:
-                await asyncio.sleep(
-                    min(max_backoff, initial_backoff * 2 ** (attempt - 1))
-                )
-
-            try:
-                async for data, (ok, info) in azip(
-                    bulk_data,
-                    _process_bulk_chunk(
-                        client,
-                        bulk_actions,
-                        bulk_data,
-                        raise_on_exception,
-                        raise_on_error,
-                        *args,
-                        **kwargs
-                    ),
-                ):
-
-                    if not ok:
-                        action, info = info.popitem()
-                        # retry if retries enabled, we get 429, and we are not
-                        # in the last attempt
-                        if (
-                            max_retries
-                            and info["status"] == 429
-                            and (attempt + 1) <= max_retries
-                        ):
-                            # _process_bulk_chunk expects strings so we need to
-                            # re-serialize the data
-                            to_retry.extend(
-                                map(client.transport.serializer.dumps, data)
-                            )
-                            to_retry_data.append(data)
-                        else:
-                            yield ok, {action: info}
-                    elif yield_ok:
-                        yield ok, info
-
-            except TransportError as e:
-                # suppress 429 errors since we will retry them
-                if attempt == max_retries or e.status_code != 429:
-                    raise
-            else:
-                if not to_retry:
-                    break
-                # retry only subset of documents that didn't succeed
-                bulk_actions, bulk_data = to_retry, to_retry_data
+        async for item in _send_bulk_chunk(
+            client,
+            bulk_data,
+            bulk_actions,
+            raise_on_error,
+            raise_on_exception,
+            max_retries,
+            initial_backoff,
+            max_backoff,
+            yield_ok,
+            *args,
+            **kwargs
+        ):
+            yield item
 
 
 async def async_bulk(client, actions, stats_only=False, *args, **kwargs):
@@ -264,6 +316,676 @@ async def async_bulk(client, actions, stats_only=False, *args, **kwargs):
     return success, failed if stats_only else errors
 
 
+class EventLoopLagMonitor(object):
+    """
+    Measures the lag of the running event loop, that is how much later than
+    scheduled the loop resumes a task sleeping for ``interval`` seconds.
+    Lag grows whenever something blocks the loop, for example serializing
+    large documents on the event loop thread.
+
+    Use it as an async context manager or pass it to
+    :func:`~elasticsearch.helpers.async_pipeline_bulk`::
+
+        async with EventLoopLagMonitor() as monitor:
+            await handle_requests()
+        print(monitor.stats())
+
+    :arg interval: number of seconds between two samples
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self._task = None
+        self.reset()
+
+    def reset(self):
+        """ Clear all samples taken so far. """
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """ Start sampling the currently running event loop. """
+        if not self.running:
+            self._task = get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """ Stop sampling, the samples taken so far are kept. """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - scheduled))
+
+    def record(self, lag):
+        self.samples += 1
+        self.total_lag += lag
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def stats(self):
+        """
+        Return a dict with the number of ``samples`` and the ``max_lag``,
+        ``mean_lag`` and ``last_lag`` in seconds.
+        """
+        return {
+            "samples": self.samples,
+            "max_lag": self.max_lag,
+            "mean_lag": self.total_lag / self.samples if self.samples else 0.0,
+            "last_lag": self.last_lag,
+        }
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.stop()
+
+
+class AsyncBatchingClient(object):
+    """
+    Sends concurrent ``get`` calls from many tasks as a single ``mget``, see
+    :class:`~elasticsearch.helpers.BatchingClient`. A batch is sent
+    ``max_wait`` seconds after its first call or as soon as it holds
+    ``max_batch_size`` documents::
+
+        batching = AsyncBatchingClient(es, max_wait=0.002)
+
+        async def handle_request(user_id):
+            user = await batching.get(index="users", id=user_id)
+
+        await batching.close()
+
+    :arg client: instance of :class:`~elasticsearch.AsyncElasticsearch` to use
+    :arg max_batch_size: maximum number of documents per ``mget`` request
+    :arg max_wait: maximum number of seconds a call waits for its batch to
+        fill up
+    """
+
+    def __init__(self, client, max_batch_size=100, max_wait=0.005):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # batch key -> [(index, id, future)]
+        self._batches = {}
+        self._tasks = set()
+        self._closed = False
+
+    async def get(self, index, id, **kwargs):
+        """
+        Return a document like :meth:`~elasticsearch.AsyncElasticsearch.get`.
+        Calls with parameters ``mget`` doesn't support (like ``version``) are
+        sent on their own right away.
+        """
+        key = _batch_key(kwargs)
+        if key is None or self._closed:
+            return await self.client.get(index=index, id=id, **kwargs)
+
+        loop = get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            loop.call_later(self.max_wait, self._flush_batch, key, batch)
+        batch.append((index, id, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush_batch(key, batch)
+        return await future
+
+    def _flush_batch(self, key, batch):
+        # the batch may already have been sent because it was full
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        task = get_running_loop().create_task(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key, batch):
+        """
+        Send a batch of ``get`` calls as a single ``mget`` and resolve them.
+        """
+        docs = [{"_index": index, "_id": id} for index, id, _ in batch]
+        try:
+            resp = await self.client.mget(body={"docs": docs}, **dict(key))
+            results = _get_results(resp, len(batch), self.client.transport.serializer)
+        except Exception as e:
+            # fail every call rather than leave any of them waiting
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            # skip cancelled calls
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """
+        Send the pending batches right away and wait for them. Any later
+        calls are sent on their own.
+        """
+        self._closed = True
+        for key, batch in list(self._batches.items()):
+            self._flush_batch(key, batch)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+class AsyncBulkIndexer(BulkIndexer):
+    """
+    Async version of :class:`~elasticsearch.helpers.BulkIndexer` sending the
+    chunks from a task. :meth:`add` is a coroutine returning an
+    ``asyncio.Future`` that resolves to the item of the action in the
+    ``bulk`` response. It waits for room when ``max_pending`` actions are
+    pending, or raises ``asyncio.QueueFull`` when not blocking::
+
+        async with AsyncBulkIndexer(es, flush_interval=0.5) as indexer:
+            async for event in events():
+                await indexer.add({"_index": "events", "_source": event})
+
+    Takes the same arguments as :class:`~elasticsearch.helpers.BulkIndexer`.
+    """
+
+    def __init__(self, client, *args, **kwargs):
+        super(AsyncBulkIndexer, self).__init__(client, *args, **kwargs)
+        # created on first use, within the running event loop
+        self._cond = None
+        self._task = None
+
+    def _pending(self):
+        return self._added - self._sent - self._failed
+
+    async def add(self, action, callback=None, block=True, timeout=None):
+        """
+        Add an action, returning an ``asyncio.Future`` of its result.
+
+        :arg action: the action or document, see
+            :func:`~elasticsearch.helpers.async_streaming_bulk`
+        :arg callback: called with ``(ok, item)`` once the action has been
+            sent instead of the indexer's ``callback``
+        :arg block: wait for room when ``max_pending`` actions are pending,
+            raise ``asyncio.QueueFull`` right away if ``False``
+        :arg timeout: maximum number of seconds to wait for room before
+            raising ``asyncio.QueueFull``
+        """
+        action, data = self.expand_action_callback(action)
+        serialized = self._chunker.serialize(action, data)
+        loop = get_running_loop()
+        future = loop.create_future()
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+
+        async with self._cond:
+            if self._closed:
+                raise RuntimeError("The BulkIndexer has been closed.")
+            if self._pending() >= self.max_pending:
+                if not block:
+                    raise asyncio.QueueFull
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self._pending() < self.max_pending),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    raise asyncio.QueueFull
+
+            ret = self._chunker.feed_serialized(action, data, *serialized)
+            if ret:
+                self._ready.append(ret + (self._futures,))
+                self._futures = []
+            if not self._futures:
+                self._chunk_started = time.time()
+            self._futures.append((future, callback or self.callback))
+            self._added += 1
+            if self._chunker.action_count >= self.chunk_size:
+                self._end_chunk()
+
+            if self._task is None:
+                self._task = loop.create_task(self._run())
+            self._cond.notify_all()
+        return future
+
+    async def _run(self):
+        while True:
+            async with self._cond:
+                while not self._ready:
+                    if self._futures and (
+                        self._closed
+                        or time.time() >= self._chunk_started + self.flush_interval
+                    ):
+                        self._end_chunk()
+                    elif self._closed:
+                        return
+                    else:
+                        try:
+                            await asyncio.wait_for(
+                                self._cond.wait(),
+                                self._chunk_started + self.flush_interval - time.time()
+                                if self._futures
+                                else None,
+                            )
+                        except asyncio.TimeoutError:
+                            pass
+                bulk_data, bulk_actions, futures = self._ready.popleft()
+
+            await self._send(bulk_data, bulk_actions, futures)
+
+    async def _send(self, bulk_data, bulk_actions, futures):
+        results = []
+        error = None
+        try:
+            async for result in _process_bulk_chunk(
+                self.client,
+                bulk_actions,
+                bulk_data,
+                raise_on_exception=False,
+                raise_on_error=False,
+                **self.kwargs
+            ):
+                results.append(result)
+        except Exception as e:
+            # not a TransportError, fail the remaining actions with it
+            logger.exception("Failed to send bulk request")
+            error = e
+        results = _complete_results(results, len(futures), error)
+
+        failed = sum(1 for ok, _ in results if not ok)
+        async with self._cond:
+            self._chunks += 1
+            self._sent += len(results) - failed
+            self._failed += failed
+            self._cond.notify_all()
+
+        for (future, callback), (ok, item) in zip(futures, results):
+            if not future.done():
+                result = _bulk_item_result(ok, item)
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                    # don't warn about failures only reported to the callback
+                    future.exception()
+                else:
+                    future.set_result(result)
+            if callback is not None:
+                try:
+                    callback(ok, item)
+                except Exception:
+                    logger.exception("Error in bulk indexer callback")
+
+    async def flush(self, timeout=None):
+        """
+        Send all the actions added so far and wait for them. Returns ``False``
+        if they weren't all sent within ``timeout`` seconds.
+        """
+        if self._cond is None:
+            return True
+        async with self._cond:
+            target = self._added
+            self._end_chunk()
+            self._cond.notify_all()
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self._sent + self._failed >= target),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return False
+            return True
+
+    async def close(self):
+        """
+        Send all pending actions and stop the background task. No actions
+        can be added afterwards.
+        """
+        self._closed = True
+        if self._cond is None:
+            return
+        async with self._cond:
+            self._cond.notify_all()
+        if self._task is not None:
+            await self._task
+
+    def stats(self):
+        """
+        Return a dict with the number of ``pending``, ``sent`` and ``failed``
+        actions and the number of ``chunks`` sent so far.
+        """
+        return {
+            "pending": self._pending(),
+            "sent": self._sent,
+            "failed": self._failed,
+            "chunks": self._chunks,
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+# marks the end of the input for the stages of async_pipeline_bulk()
+_PIPELINE_DONE = object()
+
+
+def _serialize_actions(
+    items, expand_action_callback, chunk_size, max_chunk_bytes, serializer
+):
+    """
+    Expand and serialize a batch of actions into chunks. Called in an
+    executor by :func:`~elasticsearch.helpers.async_pipeline_bulk`.
+    """
+    chunker = _ActionChunker(
+        chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, serializer=serializer
+    )
+    chunks = []
+    for item in items:
+        ret = chunker.feed(*expand_action_callback(item))
+        if ret:
+            chunks.append(ret)
+    ret = chunker.flush()
+    if ret:
+        chunks.append(ret)
+    return chunks
+
+
+async def async_pipeline_bulk(
+    client,
+    actions,
+    chunk_size=500,
+    max_chunk_bytes=100 * 1024 * 1024,
+    queue_size=4,
+    executor=None,
+    lag_monitor=None,
+    raise_on_error=True,
+    expand_action_callback=expand_action,
+    raise_on_exception=True,
+    max_retries=0,
+    initial_backoff=2,
+    max_backoff=600,
+    yield_ok=True,
+    *args,
+    **kwargs
+):
+    """
+    Pipelined variant of :func:`~elasticsearch.helpers.async_streaming_bulk`
+    which keeps the event loop responsive while ingesting. It runs three
+    stages connected by bounded queues:
+
+    * a producer consuming ``actions`` in batches of ``chunk_size``,
+    * a serializer expanding and serializing each batch in ``executor``,
+      away from the event loop thread,
+    * a sender making the bulk requests and yielding the results per action.
+
+    While one chunk is being sent the next ones are already serialized,
+    at most ``queue_size`` batches and chunks are buffered between stages.
+    Chunks are split by ``chunk_size`` and ``max_chunk_bytes`` like in
+    :func:`~elasticsearch.helpers.async_streaming_bulk` except that a
+    chunk never spans two batches.
+
+    :arg client: instance of :class:`~elasticsearch.AsyncElasticsearch` to use
+    :arg actions: iterable or async iterable containing the actions to be executed
+    :arg chunk_size: number of docs in one chunk sent to es (default: 500)
+    :arg max_chunk_bytes: the maximum size of the request in bytes (default: 100MB)
+    :arg queue_size: number of batches and chunks buffered between the
+        stages (default: 4)
+    :arg executor: ``concurrent.futures.Executor`` to serialize in, defaults
+        to the default executor of the event loop
+    :arg lag_monitor: optional :class:`~elasticsearch.helpers.EventLoopLagMonitor`,
+        started for the duration of the pipeline unless it's already running
+    :arg raise_on_error: raise ``BulkIndexError`` containing errors (as `.errors`)
+        from the execution of the last chunk when some occur. By default we raise.
+    :arg raise_on_exception: if ``False`` then don't propagate exceptions from
+        call to ``bulk`` and just report the items that failed as failed.
+    :arg expand_action_callback: callback executed on each action passed in,
+        should return a tuple containing the action line and the data line
+        (`None` if data line should be omitted). It's called in ``executor``
+        so it must be thread safe.
+    :arg max_retries: maximum number of times a document will be retried when
+        ``429`` is received, set to 0 (default) for no retries on ``429``
+    :arg initial_backoff: number of seconds we should wait before the first
+        retry. Any subsequent retries will be powers of ``initial_backoff *
+        2**retry_number``
+    :arg max_backoff: maximum number of seconds a retry will wait
+    :arg yield_ok: if set to False will skip successful documents in the output
+    """
+    loop = get_running_loop()
+    serializer = client.transport.serializer
+    batches = asyncio.Queue(maxsize=queue_size)
+    chunks = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        try:
+            batch = []
+            async for item in aiter(actions):
+                batch.append(item)
+                if len(batch) == chunk_size:
+                    await batches.put(batch)
+                    batch = []
+            if batch:
+                await batches.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await batches.put(_PIPELINE_DONE)
+            raise
+        await batches.put(_PIPELINE_DONE)
+
+    async def serialize():
+        try:
+            while True:
+                batch = await batches.get()
+                if batch is _PIPELINE_DONE:
+                    break
+                for chunk in await loop.run_in_executor(
+                    executor,
+                    _serialize_actions,
+                    batch,
+                    expand_action_callback,
+                    chunk_size,
+                    max_chunk_bytes,
+                    serializer,
+                ):
+                    await chunks.put(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await chunks.put(_PIPELINE_DONE)
+            raise
+        await chunks.put(_PIPELINE_DONE)
+
+    stop_monitor = lag_monitor is not None and not lag_monitor.running
+    if stop_monitor:
+        lag_monitor.start()
+
+    tasks = [
+        asyncio.ensure_future(produce()),
+        asyncio.ensure_future(serialize()),
+    ]
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is _PIPELINE_DONE:
+                break
+            bulk_data, bulk_actions = chunk
+            async for item in _send_bulk_chunk(
+                client,
+                bulk_data,
+                bulk_actions,
+                raise_on_error,
+                raise_on_exception,
+                max_retries,
+                initial_backoff,
+                max_backoff,
+                yield_ok,
+                *args,
+                **kwargs
+            ):
+                yield item
+
+        # re-raise any error from the serializer or the producer
+        for task in reversed(tasks):
+            await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if stop_monitor:
+            await lag_monitor.stop()
+
+
+async def _process_msearch_chunk(
+    client, bulk_actions, count, raise_on_exception, **kwargs
+):
+    """
+    Send a msearch request to elasticsearch and return ``(ok, response)`` for
+    every search.
+    """
+    try:
+        with start_span(
+            _get_tracer(client),
+            "elasticsearch.helpers.msearch_chunk",
+            {"elasticsearch.msearch.searches": count},
+        ):
+            resp = await client.msearch(body=bulk_actions, **kwargs)
+    except TransportError as e:
+        return _process_msearch_chunk_error(e, count, raise_on_exception)
+    return _process_msearch_chunk_success(resp)
+
+
+async def async_multi_search(
+    client,
+    searches,
+    chunk_size=100,
+    max_chunk_bytes=10 * 1024 * 1024,
+    concurrency=4,
+    max_concurrent_searches=None,
+    raise_on_exception=True,
+    **kwargs
+):
+    """
+    Async version of :func:`~elasticsearch.helpers.multi_search` sending up
+    to ``concurrency`` ``msearch`` requests at once from tasks. Yields
+    ``(ok, response)`` for every search, in the order they were passed in.
+
+    :arg client: instance of :class:`~elasticsearch.AsyncElasticsearch` to use
+    :arg searches: iterable or async iterable of ``(index, body)`` pairs
+    :arg chunk_size: number of searches in one ``msearch`` request (default: 100)
+    :arg max_chunk_bytes: the maximum size of the request in bytes (default: 10MB)
+    :arg concurrency: maximum number of ``msearch`` requests in flight
+    :arg max_concurrent_searches: maximum number of searches executed at once
+        by elasticsearch, across all the ``msearch`` requests in flight. Caps
+        ``concurrency`` and is split between the requests.
+    :arg raise_on_exception: if ``False`` then don't propagate exceptions from
+        call to ``msearch`` and just report the searches that failed as failed.
+
+    Any additional keyword arguments will be passed to
+    :meth:`~elasticsearch.AsyncElasticsearch.msearch`.
+    """
+    concurrency = _msearch_concurrency(concurrency, max_concurrent_searches, kwargs)
+
+    async def actions():
+        async for index, body in aiter(searches):
+            yield _msearch_header(index), body
+
+    # requests in flight, in the order of their chunks
+    pending = deque()
+    try:
+        async for bulk_data, bulk_actions in _chunk_actions(
+            actions(), chunk_size, max_chunk_bytes, client.transport.serializer
+        ):
+            pending.append(
+                asyncio.ensure_future(
+                    _process_msearch_chunk(
+                        client,
+                        bulk_actions,
+                        len(bulk_data),
+                        raise_on_exception,
+                        **kwargs
+                    )
+                )
+            )
+            if len(pending) >= concurrency:
+                for item in await pending.popleft():
+                    yield item
+
+        while pending:
+            for item in await pending.popleft():
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def async_streaming_post_data(
+    client, job_id, data, max_chunk_bytes=10 * 1024 * 1024, **kwargs
+):
+    """
+    Async version of :func:`~elasticsearch.helpers.streaming_post_data`. Files
+    are read in the default executor, ``data`` can also be an async iterable
+    of lines or documents.
+
+    :arg client: instance of :class:`~elasticsearch.AsyncElasticsearch` to use
+    :arg job_id: the name of the job receiving the data
+    :arg data: a path (``os.PathLike``), a file object or an iterable or async
+        iterable of lines or documents
+    :arg max_chunk_bytes: the maximum size of a request in bytes (default: 10MB)
+
+    Any additional keyword arguments will be passed to
+    :meth:`~elasticsearch.client.MlClient.post_data`.
+    """
+    serializer = client.transport.serializer
+    if hasattr(data, "__aiter__"):
+        chunk, size = [], 0
+        async for line in data:
+            line = _encode_line(serializer, line)
+            if chunk and size + len(line) > max_chunk_bytes:
+                yield await client.ml.post_data(job_id, body=b"".join(chunk), **kwargs)
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line)
+        if chunk:
+            yield await client.ml.post_data(job_id, body=b"".join(chunk), **kwargs)
+        return
+
+    loop = get_running_loop()
+    chunks = _post_data_chunks(data, max_chunk_bytes, serializer)
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            yield await client.ml.post_data(job_id, body=chunk, **kwargs)
+    finally:
+        chunks.close()
+
+
 async def async_scan(
     client,
     query=None,
@@ -321,10 +1043,21 @@ async def async_scan(
         query = query.copy() if query else {}
         query["sort"] = "_doc"
 
+    tracer = _get_tracer(client)
+    page = 0
+
     # initial search
-    resp = await client.search(
-        body=query, scroll=scroll, size=size, request_timeout=request_timeout, **kwargs
-    )
+    with start_span(
+        tracer, "elasticsearch.helpers.scan_page", {"elasticsearch.page": page}
+    ) as span:
+        resp = await client.search(
+            body=query,
+            scroll=scroll,
+            size=size,
+            request_timeout=request_timeout,
+            **kwargs
+        )
+        span.set_attribute("elasticsearch.hits", len(resp["hits"]["hits"]))
     scroll_id = resp.get("_scroll_id")
 
     try:
@@ -352,9 +1085,14 @@ async def async_scan(
                             resp["_shards"]["total"],
                         ),
                     )
-            resp = await client.scroll(
-                body={"scroll_id": scroll_id, "scroll": scroll}, **scroll_kwargs
-            )
+            page += 1
+            with start_span(
+                tracer, "elasticsearch.helpers.scan_page", {"elasticsearch.page": page}
+            ) as span:
+                resp = await client.scroll(
+                    body={"scroll_id": scroll_id, "scroll": scroll}, **scroll_kwargs
+                )
+                span.set_attribute("elasticsearch.hits", len(resp["hits"]["hits"]))
             scroll_id = resp.get("_scroll_id")
 
     finally:
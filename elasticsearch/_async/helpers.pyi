@@ -15,7 +15,9 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import os
 from typing import (
+    IO,
     AsyncGenerator,
     Optional,
     Union,
@@ -30,8 +32,11 @@ from typing import (
     Collection,
     Callable,
 )
+import asyncio
 import logging
+from concurrent.futures import Executor
 from .client import AsyncElasticsearch
+from ..helpers.batching import BulkIndexer
 from ..serializer import Serializer
 
 logger: logging.Logger
@@ -69,6 +74,19 @@ def async_streaming_bulk(
     *args: Any,
     **kwargs: Any
 ) -> AsyncGenerator[Tuple[bool, Any], None]: ...
+def _send_bulk_chunk(
+    client: AsyncElasticsearch,
+    bulk_data: Any,
+    bulk_actions: Any,
+    raise_on_error: bool,
+    raise_on_exception: bool,
+    max_retries: int,
+    initial_backoff: Union[float, int],
+    max_backoff: Union[float, int],
+    yield_ok: bool,
+    *args: Any,
+    **kwargs: Any
+) -> AsyncGenerator[Tuple[bool, Any], None]: ...
 async def async_bulk(
     client: AsyncElasticsearch,
     actions: Union[Iterable[Any], AsyncIterable[Any]],
@@ -76,6 +94,119 @@ async def async_bulk(
     *args: Any,
     **kwargs: Any
 ) -> Tuple[int, Union[int, List[Any]]]: ...
+
+class EventLoopLagMonitor(object):
+    interval: float
+    samples: int
+    total_lag: float
+    max_lag: float
+    last_lag: float
+    def __init__(self, interval: float = ...) -> None: ...
+    def reset(self) -> None: ...
+    @property
+    def running(self) -> bool: ...
+    def start(self) -> None: ...
+    async def stop(self) -> None: ...
+    async def _run(self) -> None: ...
+    def record(self, lag: float) -> None: ...
+    def stats(self) -> Dict[str, Union[int, float]]: ...
+    async def __aenter__(self) -> "EventLoopLagMonitor": ...
+    async def __aexit__(self, *_: Any) -> None: ...
+
+class AsyncBatchingClient(object):
+    client: AsyncElasticsearch
+    max_batch_size: int
+    max_wait: float
+    def __init__(
+        self,
+        client: AsyncElasticsearch,
+        max_batch_size: int = ...,
+        max_wait: float = ...,
+    ) -> None: ...
+    async def get(self, index: Any, id: Any, **kwargs: Any) -> Any: ...
+    def _flush_batch(
+        self, key: Tuple[Any, ...], batch: List[Tuple[Any, Any, "asyncio.Future[Any]"]]
+    ) -> None: ...
+    async def _send(
+        self, key: Tuple[Any, ...], batch: List[Tuple[Any, Any, "asyncio.Future[Any]"]]
+    ) -> None: ...
+    async def close(self) -> None: ...
+    async def __aenter__(self) -> "AsyncBatchingClient": ...
+    async def __aexit__(self, *_: Any) -> None: ...
+
+class AsyncBulkIndexer(BulkIndexer):
+    def _pending(self) -> int: ...
+    async def add(  # type: ignore
+        self,
+        action: Any,
+        callback: Optional[Callable[[bool, Dict[str, Any]], Any]] = ...,
+        block: bool = ...,
+        timeout: Optional[float] = ...,
+    ) -> "asyncio.Future[Dict[str, Any]]": ...
+    async def _run(self) -> None: ...  # type: ignore
+    async def _send(  # type: ignore
+        self,
+        bulk_data: List[Any],
+        bulk_actions: List[str],
+        futures: List[Tuple["asyncio.Future[Dict[str, Any]]", Any]],
+    ) -> None: ...
+    async def flush(self, timeout: Optional[float] = ...) -> bool: ...  # type: ignore
+    async def close(self) -> None: ...  # type: ignore
+    async def __aenter__(self) -> "AsyncBulkIndexer": ...
+    async def __aexit__(self, *_: Any) -> None: ...
+
+def _serialize_actions(
+    items: List[Any],
+    expand_action_callback: Callable[[Any], Tuple[Dict[str, Any], Optional[Any]]],
+    chunk_size: int,
+    max_chunk_bytes: int,
+    serializer: Serializer,
+) -> List[Tuple[List[Any], List[str]]]: ...
+def async_pipeline_bulk(
+    client: AsyncElasticsearch,
+    actions: Union[Iterable[Any], AsyncIterable[Any]],
+    chunk_size: int = ...,
+    max_chunk_bytes: int = ...,
+    queue_size: int = ...,
+    executor: Optional[Executor] = ...,
+    lag_monitor: Optional[EventLoopLagMonitor] = ...,
+    raise_on_error: bool = ...,
+    expand_action_callback: Callable[[Any], Tuple[Dict[str, Any], Optional[Any]]] = ...,
+    raise_on_exception: bool = ...,
+    max_retries: int = ...,
+    initial_backoff: Union[float, int] = ...,
+    max_backoff: Union[float, int] = ...,
+    yield_ok: bool = ...,
+    *args: Any,
+    **kwargs: Any
+) -> AsyncGenerator[Tuple[bool, Any], None]: ...
+def async_streaming_post_data(
+    client: AsyncElasticsearch,
+    job_id: str,
+    data: Union["os.PathLike[str]", IO[Any], Iterable[Any], AsyncIterable[Any]],
+    max_chunk_bytes: int = ...,
+    **kwargs: Any
+) -> AsyncGenerator[Dict[str, Any], None]: ...
+async def _process_msearch_chunk(
+    client: AsyncElasticsearch,
+    bulk_actions: List[str],
+    count: int,
+    raise_on_exception: bool,
+    **kwargs: Any
+) -> List[Tuple[bool, Dict[str, Any]]]: ...
+def async_multi_search(
+    client: AsyncElasticsearch,
+    searches: Union[
+        Iterable[Tuple[Optional[Union[str, Collection[str]]], Any]],
+        AsyncIterable[Tuple[Optional[Union[str, Collection[str]]], Any]],
+    ],
+    chunk_size: int = ...,
+    max_chunk_bytes: int = ...,
+    concurrency: int = ...,
+    max_concurrent_searches: Optional[int] = ...,
+    raise_on_exception: bool = ...,
+    **kwargs: Any
+) -> AsyncGenerator[Tuple[bool, Dict[str, Any]], None]: ...
 def async_scan(
     client: AsyncElasticsearch,
     query: Optional[Any] = ...,
@@ -23,11 +23,17 @@ import warnings
 from ._extra_imports import aiohttp_exceptions, aiohttp, yarl
 from .compat import get_running_loop
 from ..connection import Connection
-from ..compat import urlencode
+from ..connection.base import (
+    _FileBody,
+    _ResponseBuffer,
+    _StreamingBody,
+    _encode_query,
+)
 from ..exceptions import (
     ConnectionError,
     ConnectionTimeout,
     ImproperlyConfigured,
+    ResponseTooLargeError,
     SSLError,
 )
 
@@ -48,6 +54,38 @@ except ImportError:
     pass
 
 
+async def _aiter_body(body):
+    """
+    Iterate over the chunks of a streamed body asynchronously, consuming its
+    lines with ``async for`` if it was given an async iterator. Files are
+    read in the default executor.
+    """
+    if isinstance(body, _FileBody):
+        loop = get_running_loop()
+        chunks = iter(body)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        return
+
+    body.started = True
+    if hasattr(body.lines, "__aiter__"):
+        async for line in body.lines:
+            chunk = body.feed(line)
+            if chunk:
+                yield chunk
+    else:
+        for line in body.lines:
+            chunk = body.feed(line)
+            if chunk:
+                yield chunk
+    chunk = body.flush()
+    if chunk:
+        yield chunk
+
+
 class AsyncConnection(Connection):
     """Base class for Async HTTP connection implementations"""
 
@@ -66,6 +104,21 @@ class AsyncConnection(Connection):
     async def close(self):
         raise NotImplementedError()
 
+    async def warmup(self, count=1):
+        """
+        Open up to ``count`` keep-alive connections to the node ahead of the
+        first requests by sending ``count`` concurrent ``HEAD /`` requests.
+        The sockets (and their TLS sessions) stay in the pool afterwards,
+        bounded by the connection's pool size.
+
+        Returns the number of requests that succeeded.
+        """
+        results = await asyncio.gather(
+            *[self.perform_request("HEAD", "/") for _ in range(count)],
+            return_exceptions=True,
+        )
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
 
 class AIOHttpConnection(AsyncConnection):
     def __init__(
@@ -89,6 +142,10 @@ class AIOHttpConnection(AsyncConnection):
         api_key=None,
         opaque_id=None,
         loop=None,
+        connector=None,
+        limit_per_host=0,
+        keepalive_timeout=None,
+        ttl_dns_cache=10,
         **kwargs,
     ):
         """
@@ -126,6 +183,18 @@ class AIOHttpConnection(AsyncConnection):
         :arg opaque_id: Send this value in the 'X-Opaque-Id' HTTP header
             For tracing all requests made by this transport.
         :arg loop: asyncio Event Loop to use with aiohttp. This is set by default to the currently running loop.
+        :arg connector: an ``aiohttp.BaseConnector`` shared with other
+            connections, see ``shared_connector`` on
+            :class:`~elasticsearch.AsyncTransport`. The connection doesn't
+            close a connector it was given and ``maxsize``,
+            ``limit_per_host``, ``keepalive_timeout`` and ``ttl_dns_cache``
+            are ignored in favor of the connector's own settings.
+        :arg limit_per_host: maximum number of simultaneous sockets to the
+            same endpoint, 0 for no limit (default: 0)
+        :arg keepalive_timeout: seconds an idle socket is kept open in the
+            pool, defaults to aiohttp's default of 15 seconds.
+        :arg ttl_dns_cache: seconds a resolved DNS entry is cached, `None`
+            to cache forever (default: 10)
         """
 
         self.headers = {}
@@ -208,6 +277,26 @@ class AIOHttpConnection(AsyncConnection):
         self._limit = maxsize
         self._http_auth = http_auth
         self._ssl_context = ssl_context
+        self._connector = connector
+        self._connector_options = {
+            "limit_per_host": limit_per_host,
+            "ttl_dns_cache": ttl_dns_cache,
+        }
+        if keepalive_timeout is not None:
+            self._connector_options["keepalive_timeout"] = keepalive_timeout
+
+        # A shared connector isn't created with this connection's
+        # 'ssl_context' so the context is passed along with every request.
+        # A fingerprint replaces the context either way as aiohttp checks
+        # fingerprints on an unverified connection.
+        if connector is not None and ssl_context and not ssl_assert_fingerprint:
+            self._request_kwargs = {"ssl": ssl_context}
+        else:
+            self._request_kwargs = {"fingerprint": ssl_assert_fingerprint}
+
+        # 'aiohttp.ClientTimeout' is immutable so one instance per
+        # distinct timeout value is created and reused across requests.
+        self._client_timeouts = {}
 
     async def perform_request(
         self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None
@@ -219,7 +308,7 @@ class AIOHttpConnection(AsyncConnection):
         orig_body = body
         url_path = self.url_prefix + url
         if params:
-            query_string = urlencode(params)
+            query_string = _encode_query(params)
         else:
             query_string = ""
 
@@ -256,17 +345,24 @@ class AIOHttpConnection(AsyncConnection):
                 url = "%s?%s" % (url, query_string)
             url = self.host + url
 
-        timeout = aiohttp.ClientTimeout(
-            total=timeout if timeout is not None else self.timeout
+        timeout = self._get_client_timeout(
+            timeout if timeout is not None else self.timeout
         )
 
-        req_headers = self.headers.copy()
-        if headers:
-            req_headers.update(headers)
+        compress = self.http_compress and body
+        if headers or compress:
+            req_headers = self.headers.copy()
+            req_headers.update(headers or ())
+        else:
+            # aiohttp copies the headers it's given into a new
+            # CIMultiDict so the connection's headers can be used as-is.
+            req_headers = self.headers
 
-        if self.http_compress and body:
+        if compress:
             body = self._gzip_compress(body)
             req_headers["content-encoding"] = "gzip"
+        if isinstance(body, _StreamingBody):
+            body = _aiter_body(body)
 
         start = self.loop.time()
         try:
@@ -276,13 +372,13 @@ class AIOHttpConnection(AsyncConnection):
                 data=body,
                 headers=req_headers,
                 timeout=timeout,
-                fingerprint=self.ssl_assert_fingerprint,
+                **self._request_kwargs,
             ) as response:
                 if is_head:  # We actually called 'GET' so throw away the data.
                     await response.release()
                     raw_data = ""
                 else:
-                    raw_data = await response.text()
+                    raw_data = await response.text(max_bytes=self.max_response_bytes)
                 duration = self.loop.time() - start
 
         # We want to reraise a cancellation.
@@ -290,14 +386,17 @@ class AIOHttpConnection(AsyncConnection):
             raise
 
         except Exception as e:
+            # 'url' is passed as-is, it's only turned into a string when logged.
             self.log_request_fail(
                 method,
-                str(url),
+                url,
                 url_path,
                 orig_body,
                 self.loop.time() - start,
                 exception=e,
             )
+            if isinstance(e, ResponseTooLargeError):
+                raise
             if isinstance(e, aiohttp_exceptions.ServerFingerprintMismatch):
                 raise SSLError("N/A", str(e), e)
             if isinstance(
@@ -314,7 +413,7 @@ class AIOHttpConnection(AsyncConnection):
         if not (200 <= response.status < 300) and response.status not in ignore:
             self.log_request_fail(
                 method,
-                str(url),
+                url,
                 url_path,
                 orig_body,
                 duration,
@@ -324,11 +423,23 @@ class AIOHttpConnection(AsyncConnection):
             self._raise_error(response.status, raw_data)
 
         self.log_request_success(
-            method, str(url), url_path, orig_body, response.status, raw_data, duration
+            method, url, url_path, orig_body, response.status, raw_data, duration
         )
 
         return response.status, response.headers, raw_data
 
+    def _get_client_timeout(self, total):
+        try:
+            return self._client_timeouts[total]
+        except KeyError:
+            # Don't let arbitrary per-request timeouts grow the cache unbounded.
+            if len(self._client_timeouts) >= 16:
+                self._client_timeouts.clear()
+            client_timeout = self._client_timeouts[total] = aiohttp.ClientTimeout(
+                total=total
+            )
+            return client_timeout
+
     async def close(self):
         """
         Explicitly closes connection
@@ -343,21 +454,49 @@ class AIOHttpConnection(AsyncConnection):
         """
         if self.loop is None:
             self.loop = get_running_loop()
+        connector = self._connector
+        if connector is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                use_dns_cache=True,
+                ssl=self._ssl_context,
+                **self._connector_options,
+            )
         self.session = aiohttp.ClientSession(
             headers=self.headers,
             auto_decompress=True,
             loop=self.loop,
             cookie_jar=aiohttp.DummyCookieJar(),
             response_class=ESClientResponse,
-            connector=aiohttp.TCPConnector(
-                limit=self._limit, use_dns_cache=True, ssl=self._ssl_context
-            ),
+            connector=connector,
+            connector_owner=self._connector is None,
         )
 
 
 class ESClientResponse(aiohttp.ClientResponse):
-    async def text(self, encoding=None, errors="strict"):
+    async def text(self, encoding=None, errors="strict", max_bytes=None):
         if self._body is None:
-            await self.read()
+            await self.read_body(max_bytes)
 
         return self._body.decode("utf-8", "surrogatepass")
+
+    async def read_body(self, max_bytes=None):
+        """
+        Read the body. Given ``max_bytes`` it is read in chunks into a buffer
+        preallocated from the ``Content-Length`` header, raising
+        :class:`~elasticsearch.ResponseTooLargeError` once more than
+        ``max_bytes`` are received.
+        """
+        if max_bytes is None:
+            return await self.read()
+
+        try:
+            buffer = _ResponseBuffer(self.headers.get("content-length"), max_bytes)
+            async for chunk in self.content.iter_chunked(_ResponseBuffer.chunk_size):
+                buffer.write(chunk)
+        except BaseException:
+            # don't hand a connection with unread data back to the pool.
+            self.close()
+            raise
+        self._body = buffer.getvalue()
+        return self._body
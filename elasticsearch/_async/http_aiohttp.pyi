@@ -16,8 +16,11 @@
 #  under the License.
 
 from ._extra_imports import aiohttp  # type: ignore
-from typing import Optional, Mapping, Collection, Union, Any, Tuple
+from typing import Optional, Mapping, Collection, Union, Any, Tuple, AsyncIterator
 from ..connection import Connection
+from ..connection.base import _StreamingBody
+
+def _aiter_body(body: _StreamingBody) -> AsyncIterator[bytes]: ...
 
 class AsyncConnection(Connection):
     async def perform_request(  # type: ignore
@@ -31,6 +34,7 @@ class AsyncConnection(Connection):
         headers: Optional[Mapping[str, str]] = ...,
     ) -> Tuple[int, Mapping[str, str], str]: ...
     async def close(self) -> None: ...
+    async def warmup(self, count: int = ...) -> int: ...
 
 class AIOHttpConnection(AsyncConnection):
     session: Optional[aiohttp.ClientSession]
@@ -56,5 +60,9 @@ class AIOHttpConnection(AsyncConnection):
         api_key: Optional[Any] = ...,
         opaque_id: Optional[str] = ...,
         loop: Any = ...,
+        connector: Optional[aiohttp.BaseConnector] = ...,
+        limit_per_host: int = ...,
+        keepalive_timeout: Optional[float] = ...,
+        ttl_dns_cache: Optional[int] = ...,
         **kwargs: Any,
     ) -> None: ...
@@ -0,0 +1,91 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+
+from .http_aiohttp import AsyncConnection, _aiter_body
+from .compat import get_running_loop
+from ..connection.base import _StreamingBody
+from ..connection.http_httpx import HttpxHttpConnection, _import_httpx
+
+
+class AsyncHttpxHttpConnection(HttpxHttpConnection, AsyncConnection):
+    """
+    Connection class for ``AsyncElasticsearch`` using the `httpx` library
+    with HTTP/2 enabled. Accepts the same arguments as
+    :class:`~elasticsearch.connection.HttpxHttpConnection`.
+    """
+
+    def __init__(self, *args, loop=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loop = loop
+
+    def _create_client(self, **kwargs):
+        client = _import_httpx().AsyncClient(**kwargs)
+        if not self.http_compress:
+            # httpx adds its own 'accept-encoding' header by default.
+            client.headers.pop("accept-encoding", None)
+        return client
+
+    async def perform_request(
+        self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None
+    ):
+        if self.loop is None:
+            self.loop = get_running_loop()
+
+        orig_body = body
+        full_url, url_path, body, request_headers = self._prepare_request(
+            url, params, body, headers
+        )
+        if isinstance(body, _StreamingBody):
+            body = _aiter_body(body)
+
+        start = self.loop.time()
+        try:
+            response = await self.client.request(
+                method,
+                full_url,
+                content=body,
+                headers=request_headers,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+            duration = self.loop.time() - start
+
+        # We want to reraise a cancellation.
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            self.log_request_fail(
+                method,
+                full_url,
+                url_path,
+                orig_body,
+                self.loop.time() - start,
+                exception=e,
+            )
+            self._raise_connection_error(e)
+
+        return self._process_response(
+            method, full_url, url_path, orig_body, response, duration, ignore
+        )
+
+    async def close(self):
+        """
+        Explicitly closes connections
+        """
+        await self.client.aclose()
@@ -0,0 +1,36 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+from typing import Any, Optional, Mapping, Tuple, Collection, Union
+from .http_aiohttp import AsyncConnection
+from ..connection.http_httpx import HttpxHttpConnection
+
+class AsyncHttpxHttpConnection(HttpxHttpConnection, AsyncConnection):
+    loop: Any
+    def __init__(self, *args: Any, loop: Any = ..., **kwargs: Any) -> None: ...
+    async def perform_request(  # type: ignore
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = ...,
+        body: Optional[bytes] = ...,
+        timeout: Optional[Union[int, float]] = ...,
+        ignore: Collection[int] = ...,
+        headers: Optional[Mapping[str, str]] = ...,
+    ) -> Tuple[int, Mapping[str, str], str]: ...
+    async def warmup(self, count: int = ...) -> int: ...  # type: ignore
+    async def close(self) -> None: ...  # type: ignore
@@ -19,13 +19,17 @@ import asyncio
 import logging
 from itertools import chain
 import sys
+import time
 
+from ._extra_imports import aiohttp
 from .compat import get_running_loop
 from .http_aiohttp import AIOHttpConnection
-from ..transport import Transport
+from ..transport import Transport, _is_sent_stream
+from .cache import _AsyncSingleFlight
+from ..metrics import ENDPOINT_PARAM
+from ..tracing import start_span
 from ..exceptions import (
     TransportError,
-    ConnectionTimeout,
     ConnectionError,
     SerializationError,
 )
@@ -44,7 +48,9 @@ class AsyncTransport(Transport):
 
     DEFAULT_CONNECTION_CLASS = AIOHttpConnection
 
-    def __init__(self, hosts, *args, sniff_on_start=False, **kwargs):
+    def __init__(
+        self, hosts, *args, sniff_on_start=False, shared_connector=None, **kwargs
+    ):
         """
         :arg hosts: list of dictionaries, each containing keyword arguments to
             create a `connection_class` instance
@@ -77,6 +83,32 @@ class AsyncTransport(Transport):
             don't support passing bodies with GET requests. If you set this to
             'POST' a POST method will be used instead, if to 'source' then the body
             will be serialized and passed as a query parameter `source`.
+        :arg retry_budget: optional :class:`~elasticsearch.RetryBudget`
+            instance limiting the number of retries to a fraction of the
+            requests over a sliding window. Can be shared between transports.
+        :arg circuit_breaker_class: optional
+            :class:`~elasticsearch.CircuitBreaker` subclass (or any callable
+            returning one) to instantiate for every connection. Connections
+            whose breaker is open are skipped when selecting a connection.
+        :arg metrics: optional :class:`~elasticsearch.Metrics` instance
+            recording latency histograms and counters of the API calls, nodes,
+            sniffing and (de)serialization. Can be shared between transports.
+        :arg tracer: optional :class:`~elasticsearch.Tracer` (like
+            :class:`~elasticsearch.OpenTelemetryTracer`) creating spans for
+            the API calls, their attempts and (de)serialization.
+        :arg response_cache: optional :class:`~elasticsearch.ResponseCache`
+            storing the responses of the API calls given a ``cache_ttl``. Can
+            be shared between transports talking to the same cluster.
+        :arg coalesce_requests: send concurrent identical read requests (``GET``
+            and ``HEAD`` requests and searches, counts and multi gets sent
+            with ``POST``) only once, the other callers wait for the response
+            and get their own copy of it.
+        :arg shared_connector: create a single ``aiohttp.TCPConnector``
+            shared by all connections instead of one per node, giving one DNS
+            cache and a global limit on open sockets. Either ``True`` or a
+            dict of ``aiohttp.TCPConnector`` options such as ``limit``,
+            ``limit_per_host``, ``keepalive_timeout`` and ``ttl_dns_cache``.
+            The connector is closed together with the transport.
 
         Any extra keyword arguments will be passed to the `connection_class`
         when creating and instance unless overridden by that connection's
@@ -85,10 +117,14 @@ class AsyncTransport(Transport):
         self.sniffing_task = None
         self.loop = None
         self._async_init_called = False
+        self._idle = None
+        self.shared_connector = shared_connector
+        self.connector = None
 
         super(AsyncTransport, self).__init__(
             *args, hosts=[], sniff_on_start=False, **kwargs
         )
+        self._single_flight = _AsyncSingleFlight()
 
         # Don't enable sniffing on Cloud instances.
         if kwargs.get("cloud_id", False):
@@ -113,6 +149,14 @@ class AsyncTransport(Transport):
         self.loop = get_running_loop()
         self.kwargs["loop"] = self.loop
 
+        # The connector has to be created within the running loop too.
+        if self.shared_connector:
+            options = {}
+            if self.shared_connector is not True:
+                options.update(self.shared_connector)
+            self.connector = aiohttp.TCPConnector(**options)
+            self.kwargs["connector"] = self.connector
+
         # Now that we have a loop we can create all our HTTP connections
         self.set_connections(self.hosts)
         self.seed_connections = list(self.connection_pool.connections[:])
@@ -215,7 +259,12 @@ class AsyncTransport(Transport):
         if not self.loop:
             return
 
-        node_info = await self._get_sniff_data(initial)
+        start = time.time()
+        try:
+            node_info = await self._get_sniff_data(initial)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_sniff(time.time() - start)
         hosts = list(filter(None, (self._get_host_info(n) for n in node_info)))
 
         # we weren't able to get any nodes, maybe using an incompatible
@@ -225,12 +274,12 @@ class AsyncTransport(Transport):
                 "N/A", "Unable to sniff hosts - no viable hosts found."
             )
 
-        # remember current live connections
-        orig_connections = self.connection_pool.connections[:]
+        orig_connections = [c for (c, _) in self.connection_pool.connection_opts]
         self.set_connections(hosts)
-        # close those connections that are not in use any more
-        for c in orig_connections:
-            if c not in self.connection_pool.connections:
+        # close those connections that are not in use any more, connections
+        # with in-flight requests are closed once the last one finishes
+        for c in self._removed_connections(orig_connections):
+            if self._close_when_idle(c):
                 await c.close()
 
     def create_sniff_task(self, initial=False):
@@ -257,6 +306,8 @@ class AsyncTransport(Transport):
         :arg connection: instance of :class:`~elasticsearch.Connection` that failed
         """
         self.connection_pool.mark_dead(connection)
+        if self.metrics is not None:
+            self.metrics.record_dead(connection.host)
         if self.sniff_on_connection_fail:
             self.create_sniff_task()
 
@@ -270,11 +321,17 @@ class AsyncTransport(Transport):
         return the data.
 
         If an exception was raised, mark the connection as failed and retry (up
-        to `max_retries` times).
+        to `max_retries` times and as long as the `retry_budget` allows).
 
         If the operation was successful and the connection used was previously
         marked as dead, mark it as live, resetting it's failure count.
 
+        If ``params`` contain a ``cache_ttl``, there is a ``response_cache``
+        and the request only reads data, the response is cached for that many
+        seconds.
+        Otherwise, with ``coalesce_requests`` enabled, identical read requests
+        made while one of them is in flight share its response.
+
         :arg method: HTTP method to use
         :arg url: absolute url (without host) to target
         :arg headers: dictionary of headers, will be handed over to the
@@ -286,59 +343,184 @@ class AsyncTransport(Transport):
         """
         await self._async_call()
 
-        method, params, body, ignore, timeout = self._resolve_request_args(
-            method, params, body
-        )
+        endpoint = cache_ttl = None
+        if params:
+            endpoint = params.pop(ENDPOINT_PARAM, None)
+            cache_ttl = params.pop("cache_ttl", None)
+        start = time.time() if self.metrics is not None else None
+        with start_span(
+            self.tracer,
+            endpoint or method,
+            {"db.system": "elasticsearch", "db.operation": endpoint, "url.path": url},
+        ) as span:
+            method, params, body, ignore, timeout = self._resolve_request_args(
+                method, params, body
+            )
+            span.set_attribute("http.request.method", method)
+            args = (
+                method,
+                url,
+                headers,
+                params,
+                body,
+                ignore,
+                timeout,
+                endpoint,
+                start,
+            )
+
+            cache_key = None
+            if (
+                cache_ttl is not None
+                and self.response_cache is not None
+                and self.response_cache.cacheable(method, url)
+            ):
+                cache_key = self.response_cache.make_key(
+                    method, url, params, body, headers, ignore
+                )
+            if cache_key is None:
+                coalesce_key = self._coalesce_key(
+                    method, url, params, body, headers, ignore
+                )
+                if coalesce_key is None:
+                    response = await self._send(*args)
+                else:
+                    response = await self._single_flight.do(
+                        coalesce_key, lambda: self._send(*args)
+                    )
+            else:
+                response = self.response_cache.get(cache_key)
+                if response is None:
+                    if self.response_cache.single_flight:
+                        response = await self._single_flight.do(
+                            cache_key,
+                            lambda: self._send_and_cache(cache_key, cache_ttl, args),
+                        )
+                    else:
+                        response = await self._send_and_cache(
+                            cache_key, cache_ttl, args
+                        )
+
+            return self._process_response(method, response, endpoint, start, body)
+
+    async def _send(
+        self, method, url, headers, params, body, ignore, timeout, endpoint, start
+    ):
+        """
+        Send a request, retrying it on other nodes if needed. Returns the
+        status, the mimetype and the raw body of the response.
+        """
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
 
         for attempt in range(self.max_retries + 1):
-            connection = self.get_connection()
+            with start_span(self.tracer, "elasticsearch.checkout"):
+                connection = self._checkout_connection()
+            attempt_start = time.time() if start is not None else None
+            recorded = False
 
             try:
-                status, headers, data = await connection.perform_request(
-                    method,
-                    url,
-                    params,
-                    body,
-                    headers=headers,
-                    ignore=ignore,
-                    timeout=timeout,
-                )
+                with start_span(
+                    self.tracer,
+                    "elasticsearch.request",
+                    {
+                        "elasticsearch.node": connection.host,
+                        "elasticsearch.attempt": attempt,
+                    },
+                ) as attempt_span:
+                    status, headers_response, data = await connection.perform_request(
+                        method,
+                        url,
+                        params,
+                        body,
+                        headers=headers,
+                        ignore=ignore,
+                        timeout=timeout,
+                    )
+                    attempt_span.set_attribute("http.response.status_code", status)
             except TransportError as e:
-                if method == "HEAD" and e.status_code == 404:
-                    return False
-
-                retry = False
-                if isinstance(e, ConnectionTimeout):
-                    retry = self.retry_on_timeout
-                elif isinstance(e, ConnectionError):
-                    retry = True
-                elif e.status_code in self.retry_on_status:
-                    retry = True
+                self._record_request_result(connection, e, attempt_start)
+                recorded = True
 
-                if retry:
-                    try:
-                        # only mark as dead if we are retrying
-                        self.mark_dead(connection)
-                    except TransportError:
-                        # If sniffing on failure, it could fail too. Catch the
-                        # exception not to interrupt the retries.
-                        pass
-                    # raise exception on last retry
-                    if attempt == self.max_retries:
-                        raise e
-                else:
+                if method == "HEAD" and e.status_code == 404:
+                    return 404, None, ""
+
+                # a streamed body can't be sent again, don't mark the
+                # connection as dead or spend the retry budget for it
+                if _is_sent_stream(body) or not self._should_retry(
+                    e, connection, attempt, endpoint
+                ):
+                    self._record_endpoint(endpoint, start, body, error=True)
                     raise e
 
             else:
                 # connection didn't fail, confirm it's live status
                 self.connection_pool.mark_live(connection)
+                self._record_request_result(connection, start=attempt_start)
+                recorded = True
+                return status, headers_response.get("content-type"), data
+
+            finally:
+                if not recorded and self.circuit_breaker_class is not None:
+                    # no response, free a probe slot of a half-open breaker
+                    self.get_circuit_breaker(connection).release()
+                if self._release_connection(connection):
+                    await connection.close()
+
+    async def _send_and_cache(self, cache_key, cache_ttl, args):
+        """
+        :meth:`_send` a request and store its response in ``response_cache``.
+        """
+        response = await self._send(*args)
+        size = len(response[2]) if response[2] else 0
+        self.response_cache.set(cache_key, response, cache_ttl, size + len(args[1]))
+        return response
 
-                if method == "HEAD":
-                    return 200 <= status < 300
+    async def warmup(self, connections_per_node=1):
+        """
+        Pre-open ``connections_per_node`` keep-alive connections to every live
+        node so the first requests don't pay for the TCP and TLS handshakes.
+        See :meth:`~elasticsearch.AIOHttpConnection.warmup`.
+
+        Returns a dict mapping each node's host to the number of warm-up
+        requests that succeeded.
+        """
+        await self._async_call()
+
+        connections = list(self.connection_pool.connections)
+        results = await asyncio.gather(
+            *[c.warmup(connections_per_node) for c in connections]
+        )
+        return {c.host: opened for c, opened in zip(connections, results)}
 
-                if data:
-                    data = self.deserializer.loads(data, headers.get("content-type"))
-                return data
+    def _release_connection(self, connection):
+        close = super(AsyncTransport, self)._release_connection(connection)
+        if not self._in_flight and self._idle is not None:
+            self._idle.set()
+        return close
+
+    async def drain(self, timeout=None):
+        """
+        Gracefully close the transport: wait for the in-flight requests to
+        finish and then close all connections.
+
+        :arg timeout: maximum number of seconds to wait for the in-flight
+            requests, wait forever if ``None``. Connections are closed even if
+            some requests haven't finished in time.
+
+        Returns ``True`` if all in-flight requests finished.
+        """
+        if self._in_flight:
+            self._idle = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._idle = None
+        drained = not self._in_flight
+        await self.close()
+        return drained
 
     async def close(self):
         """
@@ -353,3 +535,11 @@ class AsyncTransport(Transport):
             self.sniffing_task = None
         for connection in self.connection_pool.connections:
             await connection.close()
+
+        # connections removed by sniffing but still busy
+        close_pending, self._close_pending = self._close_pending, []
+        for connection in close_pending:
+            await connection.close()
+
+        if self.connector is not None:
+            await self.connector.close()
@@ -27,9 +27,14 @@ from typing import (
     List,
 )
 
+from ._extra_imports import aiohttp  # type: ignore
 from ..connection import Connection
 from ..connection_pool import ConnectionPool
 from ..serializer import Serializer, Deserializer
+from ..retry import RetryBudget, CircuitBreaker
+from ..metrics import Metrics
+from ..cache import ResponseCache
+from ..tracing import Tracer
 
 class AsyncTransport(object):
     DEFAULT_CONNECTION_CLASS: Type[Connection]
@@ -40,6 +45,15 @@ class AsyncTransport(object):
     retry_on_timeout: bool
     retry_on_status: Collection[int]
     send_get_body_as: str
+    retry_budget: Optional[RetryBudget]
+    circuit_breaker_class: Optional[Callable[[], CircuitBreaker]]
+    metrics: Optional[Metrics]
+    tracer: Optional[Tracer]
+    response_cache: Optional[ResponseCache]
+    coalesce_requests: bool
+    circuit_breakers: Dict[Connection, CircuitBreaker]
+    shared_connector: Optional[Union[bool, Mapping[str, Any]]]
+    connector: Optional[aiohttp.TCPConnector]
     serializer: Serializer
     connection_pool_class: Type[ConnectionPool]
     connection_class: Type[Connection]
@@ -73,11 +87,20 @@ class AsyncTransport(object):
         retry_on_status: Collection[int] = ...,
         retry_on_timeout: bool = ...,
         send_get_body_as: str = ...,
+        retry_budget: Optional[RetryBudget] = ...,
+        circuit_breaker_class: Optional[Callable[[], CircuitBreaker]] = ...,
+        metrics: Optional[Metrics] = ...,
+        tracer: Optional[Tracer] = ...,
+        response_cache: Optional[ResponseCache] = ...,
+        coalesce_requests: bool = ...,
+        shared_connector: Optional[Union[bool, Mapping[str, Any]]] = ...,
         **kwargs: Any
     ) -> None: ...
     def add_connection(self, host: Any) -> None: ...
     def set_connections(self, hosts: Collection[Any]) -> None: ...
     def get_connection(self) -> Connection: ...
+    def get_circuit_breaker(self, connection: Connection) -> CircuitBreaker: ...
+    def circuit_breaker_stats(self) -> Dict[str, Dict[str, Union[str, int]]]: ...
     def sniff_hosts(self, initial: bool = ...) -> None: ...
     def mark_dead(self, connection: Connection) -> None: ...
     async def perform_request(
@@ -88,4 +111,6 @@ class AsyncTransport(object):
         params: Optional[Mapping[str, Any]] = ...,
         body: Optional[Any] = ...,
     ) -> Union[bool, Any]: ...
+    async def warmup(self, connections_per_node: int = ...) -> Dict[str, int]: ...
+    async def drain(self, timeout: Optional[float] = ...) -> bool: ...
     async def close(self) -> None: ...
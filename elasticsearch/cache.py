@@ -0,0 +1,208 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# endpoints only reading data even though they are sent as POST
+CACHEABLE_POST_ENDPOINTS = frozenset(("_search", "_count", "_msearch", "_mget"))
+
+
+class _Call(object):
+    """ A function call in progress, see :class:`_SingleFlight`. """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class _SingleFlight(object):
+    """
+    Runs a function only once for all the concurrent calls sharing the same
+    key, the other callers wait for it and receive the same result or
+    exception. They run the function again if it was interrupted by a
+    ``BaseException`` like ``KeyboardInterrupt``.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            if call.done:
+                return call.result
+            # the call was interrupted (KeyboardInterrupt, ...), try again
+
+        try:
+            call.result = func()
+            call.done = True
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class ResponseCache(object):
+    """
+    Client-side cache of API responses used by
+    :class:`~elasticsearch.Transport` when passed as ``response_cache``.
+
+    Only read-only API calls given a ``cache_ttl`` (in seconds) are cached:
+    ``GET`` and ``HEAD`` requests and the ``_search``, ``_count``,
+    ``_msearch`` and ``_mget`` endpoints. Other requests are always sent::
+
+        es = Elasticsearch(response_cache=ResponseCache(max_bytes=32 * 1024 * 1024))
+        es.search(index="dashboards", body=query, cache_ttl=5)
+
+    Responses are keyed on the HTTP method, path, query parameters, headers
+    and a hash of the body. The raw response bodies are stored and
+    deserialized again on every hit so callers never share mutable results.
+    Entries expire after their ``cache_ttl`` and the least recently used ones
+    are evicted once the bodies take up more than ``max_bytes``.
+
+    The cache is thread-safe and can be shared between transports talking to
+    the same cluster.
+
+    :arg max_bytes: maximum total size of the cached response bodies
+    :arg single_flight: when a response isn't cached yet, let only one of the
+        concurrent identical calls send the request and have the others wait
+        for its response
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, single_flight=True):
+        self.max_bytes = max_bytes
+        self.single_flight = single_flight
+
+        # key -> (expires, size, response), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cacheable(method, url):
+        """
+        Whether the response of a request only reading data may be cached.
+        """
+        if method in ("GET", "HEAD"):
+            return True
+        return method == "POST" and url.rsplit("/", 1)[-1] in CACHEABLE_POST_ENDPOINTS
+
+    @staticmethod
+    def make_key(method, url, params=None, body=None, headers=None, ignore=()):
+        """
+        Build the cache key of a request. Returns ``None`` if the request
+        can't be cached because its parameters or body aren't hashable.
+        """
+        try:
+            key = (
+                method,
+                url,
+                tuple(sorted(params.items())) if params else (),
+                hashlib.sha1(body).digest() if body else None,
+                tuple(sorted(headers.items())) if headers else (),
+                tuple(ignore),
+            )
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key, now=None):
+        """
+        Return the cached response for ``key`` or ``None`` if there isn't one
+        or it has expired.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires, size, response = entry
+            if expires <= now:
+                self._bytes -= size
+                self._misses += 1
+                return None
+            # move to the most recently used end
+            self._entries[key] = entry
+            self._hits += 1
+            return response
+
+    def set(self, key, response, ttl, size, now=None):
+        """
+        Cache ``response`` for ``ttl`` seconds, evicting the least recently
+        used entries if needed. Responses larger than ``max_bytes`` aren't
+        cached.
+        """
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = now if now is not None else time.time()
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            while self._entries and self._bytes + size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+            self._entries[key] = (now + ttl, size, response)
+            self._bytes += size
+
+    def clear(self):
+        """
+        Remove all cached responses.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Return a dictionary describing the current state of the cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
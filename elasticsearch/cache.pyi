@@ -0,0 +1,69 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import threading
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+CACHEABLE_POST_ENDPOINTS: FrozenSet[str]
+
+class _Call(object):
+    event: threading.Event
+    done: bool
+    result: Any
+    error: Optional[Exception]
+    def __init__(self) -> None: ...
+
+class _SingleFlight(object):
+    def __init__(self) -> None: ...
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any: ...
+
+class ResponseCache(object):
+    max_bytes: int
+    single_flight: bool
+    def __init__(self, max_bytes: int = ..., single_flight: bool = ...) -> None: ...
+    @staticmethod
+    def cacheable(method: str, url: str) -> bool: ...
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = ...,
+        body: Optional[bytes] = ...,
+        headers: Optional[Mapping[str, str]] = ...,
+        ignore: Collection[int] = ...,
+    ) -> Optional[Tuple[Any, ...]]: ...
+    def get(self, key: Hashable, now: Optional[float] = ...) -> Any: ...
+    def set(
+        self,
+        key: Hashable,
+        response: Any,
+        ttl: float,
+        size: int,
+        now: Optional[float] = ...,
+    ) -> None: ...
+    def clear(self) -> None: ...
+    def stats(self) -> Dict[str, int]: ...
@@ -17,10 +17,15 @@
 
 from __future__ import unicode_literals
 
+import re
+import sys
 import weakref
 from datetime import date, datetime
 from functools import wraps
 from ..compat import string_types, quote, PY2, unquote, urlparse
+from ..connection.base import _FileBody, _StreamingBody, _is_file
+from ..metrics import ENDPOINT_PARAM
+from ..transport import Transport
 
 # parts of URL to be omitted
 SKIP_IN_PATH = (None, "", b"", [], ())
@@ -103,6 +108,45 @@ def _escape(value):
     return str(value)
 
 
+# path segments made only of characters that ``quote(..., b",*")`` leaves alone
+_SAFE_PATH_SEGMENT = re.compile(r"^[A-Za-z0-9_.,*-]+\Z").match
+
+# quoted path segments, cleared once it reaches the size limit
+_PATH_CACHE = {}
+_PATH_CACHE_SIZE = 512
+if PY2:
+    _PATH_TEXT_TYPES = frozenset((str, unicode))  # noqa: F821
+else:
+    _PATH_TEXT_TYPES = frozenset((str,))
+
+
+def _quote_path_segment(part):
+    """
+    Escape and quote a single part of a URL path. Index names and ids that
+    don't need quoting are returned as they are, other values are cached.
+    """
+    cls = type(part)
+    if cls in _PATH_TEXT_TYPES:
+        if _SAFE_PATH_SEGMENT(part):
+            return part
+    elif cls is int:
+        return str(part)
+    elif cls not in _ESCAPE_CACHE_TYPES:
+        # preserve ',' and '*' in url for nicer URLs in logs
+        return quote(_escape(part), b",*")
+
+    key = (cls, part)
+    try:
+        return _PATH_CACHE[key]
+    except KeyError:
+        pass
+    quoted = quote(_escape(part), b",*")
+    if len(_PATH_CACHE) >= _PATH_CACHE_SIZE:
+        _PATH_CACHE.clear()
+    _PATH_CACHE[key] = quoted
+    return quoted
+
+
 def _make_path(*parts):
     """
     Create a URL string from parts, omit all `None` values and empty strings.
@@ -110,16 +154,100 @@ def _make_path(*parts):
     """
     # TODO: maybe only allow some parts to be lists/tuples ?
     return "/" + "/".join(
-        # preserve ',' and '*' in url for nicer URLs in logs
-        quote(_escape(p), b",*")
-        for p in parts
-        if p not in SKIP_IN_PATH
+        [_quote_path_segment(p) for p in parts if p not in SKIP_IN_PATH]
     )
 
 
 # parameters that apply to all methods
 GLOBAL_PARAMS = ("pretty", "human", "error_trace", "format", "filter_path")
 
+# parameters passed on to the transport as they are, without escaping
+UNESCAPED_PARAMS = frozenset(("ignore", "request_timeout", "cache_ttl"))
+
+# parameters taken out of ``params`` by the API methods or the transport, the
+# caller's ``params`` are copied if they contain one of them
+CONSUMED_PARAMS = UNESCAPED_PARAMS | frozenset(("from_", "doc_type"))
+
+# escaped values of query parameters, cleared once it reaches the size limit.
+# Only strings of up to _ESCAPE_CACHE_MAX_LENGTH characters are cached, long
+# queries or lists of ids are rarely repeated
+_ESCAPE_CACHE = {}
+_ESCAPE_CACHE_SIZE = 1024
+_ESCAPE_CACHE_MAX_LENGTH = 64
+if PY2:
+    _ESCAPE_CACHE_TYPES = frozenset((str, unicode, bool, int, long))  # noqa: F821
+else:
+    _ESCAPE_CACHE_TYPES = frozenset((str, bool, int))
+
+
+def _escape_param(value):
+    """
+    :func:`_escape` a query parameter value, caching the result for short
+    strings, booleans and integers since the same few values are passed over
+    and over.
+    """
+    cls = type(value)
+    if cls not in _ESCAPE_CACHE_TYPES or (
+        cls in _PATH_TEXT_TYPES and len(value) > _ESCAPE_CACHE_MAX_LENGTH
+    ):
+        return _escape(value)
+
+    # include the type so that True and 1 don't share an entry
+    key = (cls, value)
+    try:
+        return _ESCAPE_CACHE[key]
+    except KeyError:
+        pass
+    escaped = _escape(value)
+    if len(_ESCAPE_CACHE) >= _ESCAPE_CACHE_SIZE:
+        _ESCAPE_CACHE.clear()
+    _ESCAPE_CACHE[key] = escaped
+    return escaped
+
+
+def _process_params(kwargs, accepted, endpoint=None):
+    """
+    Pop ``params``, ``headers``, ``opaque_id`` and the ``accepted`` query
+    parameters from the keyword arguments of an API method and add the
+    ``endpoint`` name for the transport. Returns the ``params`` and ``headers``
+    dicts, the caller's ``params`` are only copied once something needs to be
+    added to them or if they hold :data:`CONSUMED_PARAMS`.
+    """
+    params = kwargs.pop("params", None)
+    if not params:
+        params, copied = {}, True
+    elif CONSUMED_PARAMS.isdisjoint(params):
+        copied = False
+    else:
+        params, copied = params.copy(), True
+    headers = kwargs.pop("headers", None)
+    headers = {k.lower(): v for k, v in headers.items()} if headers else {}
+
+    if kwargs:
+        if "opaque_id" in kwargs:
+            headers["x-opaque-id"] = kwargs.pop("opaque_id")
+
+        # only look at the arguments actually passed
+        for p in list(kwargs):
+            if p in accepted:
+                v = kwargs.pop(p)
+                if v is None:
+                    continue
+                v = _escape_param(v)
+            elif p in UNESCAPED_PARAMS:
+                v = kwargs.pop(p)
+            else:
+                continue
+            if not copied:
+                params, copied = params.copy(), True
+            params[p] = v
+
+    if endpoint is not None:
+        if not copied:
+            params = params.copy()
+        params[ENDPOINT_PARAM] = endpoint
+    return params, headers
+
 
 def query_params(*es_query_params):
     """
@@ -128,27 +256,35 @@ def query_params(*es_query_params):
     """
 
     def _wrapper(func):
+        # name of the API endpoint reported to metrics and tracing, like
+        # ``search`` or ``indices.create``
+        namespace = func.__module__.rsplit(".", 1)[-1]
+        endpoint = (
+            func.__name__ if namespace == "client" else namespace + "." + func.__name__
+        )
+        accepted = frozenset(es_query_params + GLOBAL_PARAMS)
+
         @wraps(func)
         def _wrapped(*args, **kwargs):
-            params = (kwargs.pop("params", None) or {}).copy()
-            headers = {
-                k.lower(): v
-                for k, v in (kwargs.pop("headers", None) or {}).copy().items()
-            }
-
-            if "opaque_id" in kwargs:
-                headers["x-opaque-id"] = kwargs.pop("opaque_id")
-
-            for p in es_query_params + GLOBAL_PARAMS:
-                if p in kwargs:
-                    v = kwargs.pop(p)
-                    if v is not None:
-                        params[p] = _escape(v)
-
-            # don't treat ignore, request_timeout, and opaque_id as other params to avoid escaping
-            for p in ("ignore", "request_timeout"):
-                if p in kwargs:
-                    params[p] = kwargs.pop(p)
+            transport = getattr(args[0], "transport", None)
+            # custom or mocked transports don't know about spans and would
+            # send the endpoint name to Elasticsearch as a query parameter
+            if not isinstance(transport, Transport):
+                params, headers = _process_params(kwargs, accepted)
+                return func(*args, params=params, headers=headers, **kwargs)
+
+            tracer = transport.tracer
+            if tracer is None:
+                params, headers = _process_params(
+                    kwargs,
+                    accepted,
+                    endpoint if transport.metrics is not None else None,
+                )
+            else:
+                with tracer.start_span(
+                    "elasticsearch.query_params", {"db.operation": endpoint}
+                ):
+                    params, headers = _process_params(kwargs, accepted, endpoint)
             return func(*args, params=params, headers=headers, **kwargs)
 
         return _wrapped
@@ -157,6 +293,20 @@ def query_params(*es_query_params):
 
 
 def _bulk_body(serializer, body):
+    # paths and files are sent from disk as they are
+    if _is_file(body):
+        return _FileBody(body)
+
+    if hasattr(body, "__aiter__") and not hasattr(body, "__iter__"):
+        raise TypeError(
+            "Async iterables can only be sent by AsyncElasticsearch, "
+            "pass an iterable or a list instead"
+        )
+
+    # iterators and generators are serialized lazily as they are sent
+    if not isinstance(body, string_types) and iter(body) is body:
+        return _StreamingBody(serializer, body)
+
     # if not passed in a string, serialize items and join by newline
     if not isinstance(body, string_types):
         body = "\n".join(map(serializer.dumps, body))
@@ -180,6 +330,61 @@ class NamespacedClient(object):
         return self.client.transport
 
 
+class _LazyNamespace(object):
+    """
+    Descriptor creating a namespaced client (like ``client.indices``) the first
+    time it's accessed on a client instance, which is also when its module
+    gets imported. The namespaced client is then stored on the instance so
+    later lookups don't go through the descriptor.
+    """
+
+    def __init__(self, package, name, class_name):
+        self.module = package + "." + name
+        self.name = name
+        self.class_name = class_name
+
+    def load(self):
+        # __import__ rather than importlib so the import shows in -X importtime
+        module = __import__(str(self.module), fromlist=[str(self.class_name)])
+        return getattr(module, self.class_name)
+
+    def __get__(self, client, owner):
+        if client is None:
+            return self
+        namespace = client.__dict__[self.name] = self.load()(client)
+        return namespace
+
+
+def _lazy_namespace_classes(client_class, module_globals):
+    """
+    Make the namespaced client classes of ``client_class`` (like
+    ``IndicesClient``) importable from its module without importing all of
+    them upfront. Returns the module's ``__getattr__`` (PEP 562), Python
+    versions before 3.7 don't support it so the classes are imported right
+    away instead.
+    """
+    namespaces = dict(
+        (ns.class_name, ns)
+        for ns in vars(client_class).values()
+        if isinstance(ns, _LazyNamespace)
+    )
+
+    def __getattr__(name):
+        try:
+            namespace = namespaces[name]
+        except KeyError:
+            raise AttributeError(
+                "module %r has no attribute %r" % (module_globals["__name__"], name)
+            )
+        cls = module_globals[name] = namespace.load()
+        return cls
+
+    if sys.version_info < (3, 7):
+        for name in namespaces:
+            __getattr__(name)
+    return __getattr__
+
+
 class AddonClient(NamespacedClient):
     @classmethod
     def infect_client(cls, client):
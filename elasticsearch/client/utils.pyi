@@ -17,7 +17,9 @@
 
 from __future__ import unicode_literals
 
+import os
 from typing import (
+    IO,
     Collection,
     Any,
     Optional,
@@ -27,8 +29,12 @@ from typing import (
     Tuple,
     Callable,
     TypeVar,
+    Type,
+    FrozenSet,
+    Iterable,
 )
 from ..client import Elasticsearch
+from ..connection.base import _StreamingBody
 from ..serializer import Serializer
 from ..transport import Transport
 
@@ -39,19 +45,39 @@ def _normalize_hosts(
     hosts: Optional[Union[str, Collection[Union[str, Dict[str, Any]]]]]
 ) -> List[Dict[str, Any]]: ...
 def _escape(value: Any) -> str: ...
+def _quote_path_segment(part: Any) -> str: ...
 def _make_path(*parts: Any) -> str: ...
 
 GLOBAL_PARAMS: Tuple[str, ...]
+UNESCAPED_PARAMS: FrozenSet[str]
+CONSUMED_PARAMS: FrozenSet[str]
 
+def _escape_param(value: Any) -> Union[str, bytes]: ...
+def _process_params(
+    kwargs: Dict[str, Any], accepted: FrozenSet[str], endpoint: Optional[str] = ...
+) -> Tuple[Dict[str, Any], Dict[str, str]]: ...
 def query_params(
     *es_query_params: str,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]: ...
 def _bulk_body(
-    serializer: Serializer, body: Union[str, bytes, Collection[Any]]
-) -> str: ...
+    serializer: Serializer,
+    body: Union[str, bytes, "os.PathLike[str]", IO[Any], Iterable[Any]],
+) -> Union[str, bytes, _StreamingBody]: ...
 
 class NamespacedClient:
     client: Elasticsearch
     def __init__(self, client: Elasticsearch) -> None: ...
     @property
     def transport(self) -> Transport: ...
+
+class _LazyNamespace(object):
+    module: str
+    name: str
+    class_name: str
+    def __init__(self, package: str, name: str, class_name: str) -> None: ...
+    def load(self) -> Type[Any]: ...
+    def __get__(self, client: Any, owner: Type[Any]) -> Any: ...
+
+def _lazy_namespace_classes(
+    client_class: Type[Any], module_globals: Dict[str, Any]
+) -> Callable[[str], Type[Any]]: ...
@@ -24,13 +24,13 @@ if PY2:
     from urllib import quote_plus, quote, urlencode, unquote
     from urlparse import urlparse
     from itertools import imap as map
-    from Queue import Queue
+    from Queue import Queue, Full
 else:
     string_types = str, bytes
     from urllib.parse import quote, quote_plus, urlencode, urlparse, unquote
 
     map = map
-    from queue import Queue
+    from queue import Queue, Full
 
 try:
     from collections.abs import Mapping
@@ -47,5 +47,6 @@ __all__ = [
     "urlparse",
     "map",
     "Queue",
+    "Full",
     "Mapping",
 ]
@@ -30,7 +30,7 @@ if sys.version_info[0] == 2:
     )
     from urlparse import urlparse as urlparse
     from itertools import imap as map
-    from Queue import Queue as Queue
+    from Queue import Queue as Queue, Full as Full
 else:
     from urllib.parse import (
         quote as quote,
@@ -41,4 +41,4 @@ else:
     )
 
     map = map
-    from queue import Queue as Queue
+    from queue import Queue as Queue, Full as Full
@@ -17,11 +17,13 @@
 
 from .base import Connection
 from .http_requests import RequestsHttpConnection
+from .http_httpx import HttpxHttpConnection
 from .http_urllib3 import Urllib3HttpConnection, create_ssl_context
 
 __all__ = [
     "Connection",
     "RequestsHttpConnection",
+    "HttpxHttpConnection",
     "Urllib3HttpConnection",
     "create_ssl_context",
 ]
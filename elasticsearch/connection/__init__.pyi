@@ -17,6 +17,7 @@
 
 from .base import Connection as Connection
 from .http_requests import RequestsHttpConnection as RequestsHttpConnection
+from .http_httpx import HttpxHttpConnection as HttpxHttpConnection
 from .http_urllib3 import (
     Urllib3HttpConnection as Urllib3HttpConnection,
     create_ssl_context as create_ssl_context,
@@ -19,7 +19,9 @@ import logging
 import binascii
 import gzip
 import io
+import mmap
 import re
+import zlib
 from platform import python_version
 import warnings
 
@@ -31,10 +33,12 @@ except ImportError:
 from ..exceptions import (
     TransportError,
     ImproperlyConfigured,
+    ResponseTooLargeError,
     ElasticsearchDeprecationWarning,
     HTTP_EXCEPTIONS,
 )
 from .. import __versionstr__
+from ..compat import PY2, urlencode
 
 logger = logging.getLogger("elasticsearch")
 
@@ -48,6 +52,262 @@ if not _tracer_already_configured:
 _WARNING_RE = re.compile(r"\"([^\"]*)\"")
 
 
+def _decode_body(body):
+    # body has already been serialized to utf-8, deserialize it for logging
+    try:
+        return body.decode("utf-8", "ignore")
+    except AttributeError:
+        return body
+
+
+# encoded query strings, cleared once it reaches the size limit
+_QUERY_STRING_CACHE = {}
+_QUERY_STRING_CACHE_SIZE = 256
+
+
+def _encode_query(params):
+    """
+    ``urlencode`` the query parameters of a request. The same few combinations
+    of parameters are used over and over so the query strings are cached.
+    """
+    try:
+        key = tuple(params.items())
+        return _QUERY_STRING_CACHE[key]
+    except TypeError:
+        # unhashable values, like lists passed via ``params``
+        return urlencode(params)
+    except KeyError:
+        pass
+    query_string = urlencode(params)
+    if len(_QUERY_STRING_CACHE) >= _QUERY_STRING_CACHE_SIZE:
+        _QUERY_STRING_CACHE.clear()
+    _QUERY_STRING_CACHE[key] = query_string
+    return query_string
+
+
+class _LazyBody(object):
+    """Wraps a request body for logging, it is only decoded
+    if a handler actually formats the log record.
+    """
+
+    __slots__ = ("body",)
+
+    def __init__(self, body):
+        self.body = body
+
+    def __str__(self):
+        body = _decode_body(self.body)
+        if PY2 and isinstance(body, type(u"")):
+            return body.encode("utf-8")
+        return str(body)
+
+
+def _encode_line(serializer, line):
+    """Serialize a line of an NDJSON body into bytes ending with a newline."""
+    if not isinstance(line, bytes):
+        line = serializer.dumps(line)
+        if not isinstance(line, bytes):
+            line = line.encode("utf-8", "surrogatepass")
+    if not line.endswith(b"\n"):
+        line += b"\n"
+    return line
+
+
+def _is_file(body):
+    """Whether ``body`` is a path or a file object to be read from disk."""
+    return hasattr(body, "__fspath__") or hasattr(body, "read")
+
+
+def _open_file(body):
+    """
+    Return a file object for a path or a file object, and whether it has
+    been opened here and so must be closed by the caller.
+    """
+    if hasattr(body, "__fspath__"):
+        return open(body.__fspath__(), "rb"), True
+    return body, False
+
+
+def _mmap_file(f):
+    """
+    Memory-map a file opened in binary mode, ``None`` if that's not possible
+    like for text files, pipes, sockets, empty or in-memory files.
+    """
+    if "b" not in getattr(f, "mode", ""):
+        return None
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, EnvironmentError, ValueError):
+        return None
+
+
+def _read_file(body, block_size):
+    """
+    Read a path or a file object from its current position in blocks of
+    ``block_size`` bytes, memory-mapped when possible.
+    """
+    f, close = _open_file(body)
+    try:
+        mapped = _mmap_file(f)
+        if mapped is not None:
+            try:
+                for pos in range(f.tell(), len(mapped), block_size):
+                    yield mapped[pos : pos + block_size]
+            finally:
+                mapped.close()
+            return
+
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            if not isinstance(block, bytes):
+                block = block.encode("utf-8", "surrogatepass")
+            yield block
+    finally:
+        if close:
+            f.close()
+
+
+class _StreamingBody(object):
+    """A request body of NDJSON lines given as an iterator, like the actions
+    of a ``bulk`` request. Lines are serialized as the body is sent with
+    chunked transfer-encoding, so it's never held in memory as a whole and
+    can only be sent once.
+    """
+
+    #: approximate size of the chunks the body is sent in
+    chunk_size = 64 * 1024
+
+    def __init__(self, serializer, lines):
+        self.serializer = serializer
+        self.lines = lines
+        self.compressor = None
+        # set once the first line has been consumed
+        self.started = False
+        # number of bytes sent so far, before compression
+        self.size = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def __str__(self):
+        return "<streamed body of %d bytes>" % self.size
+
+    def __iter__(self):
+        self.started = True
+        for line in self.lines:
+            chunk = self.feed(line)
+            if chunk:
+                yield chunk
+        chunk = self.flush()
+        if chunk:
+            yield chunk
+
+    def gzip(self):
+        """Compress the chunks with gzip as they are sent."""
+        self.compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def feed(self, line):
+        """Add a line, returning the next chunk to send once there's enough."""
+        line = _encode_line(self.serializer, line)
+        self._buffer.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.chunk_size:
+            return self._take()
+        return None
+
+    def flush(self):
+        """Return the last chunk to send."""
+        chunk = self._take()
+        if self.compressor is not None:
+            chunk += self.compressor.flush()
+        return chunk
+
+    def _take(self):
+        chunk = b"".join(self._buffer)
+        self._buffer, self._buffered = [], 0
+        return self._process(chunk)
+
+    def _process(self, data):
+        # count and compress the data about to be sent
+        self.size += len(data)
+        if self.compressor is not None:
+            return self.compressor.compress(data)
+        return data
+
+
+class _FileBody(_StreamingBody):
+    """A request body read from a path or a file object, like a log file sent
+    to ``ml.post_data``. It's sent as is in blocks of ``chunk_size`` bytes,
+    memory-mapped when possible, followed by a newline if it doesn't end with
+    one. Files opened from a path are closed once sent.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(self, file):
+        super(_FileBody, self).__init__(None, None)
+        self.file = file
+
+    def __iter__(self):
+        self.started = True
+        last = b"\n"
+        for block in _read_file(self.file, self.chunk_size):
+            last = block[-1:]
+            chunk = self._process(block)
+            if chunk:
+                yield chunk
+        # NDJSON bodies must end with a newline
+        chunk = self._process(b"" if last == b"\n" else b"\n")
+        if self.compressor is not None:
+            chunk += self.compressor.flush()
+        if chunk:
+            yield chunk
+
+
+class _ResponseBuffer(object):
+    """Collects a response body that is read in chunks into a ``bytearray``
+    preallocated from the ``Content-Length`` header, raising
+    :class:`~elasticsearch.ResponseTooLargeError` once more than ``max_bytes``
+    are received.
+    """
+
+    __slots__ = ("buffer", "size", "max_bytes")
+
+    #: size of the chunks the body is read in
+    chunk_size = 64 * 1024
+
+    def __init__(self, content_length, max_bytes):
+        try:
+            content_length = int(content_length or 0)
+        except ValueError:
+            content_length = 0
+        self.max_bytes = max_bytes
+        self._check_size(content_length)
+
+        self.buffer = bytearray(content_length)
+        self.size = 0
+
+    def _check_size(self, size):
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise ResponseTooLargeError(
+                "N/A",
+                "Response body is larger than max_response_bytes (%d)" % self.max_bytes,
+            )
+
+    def write(self, chunk):
+        end = self.size + len(chunk)
+        self._check_size(end)
+        # grows the buffer if the body is larger than 'Content-Length' says,
+        # which is the case for compressed responses.
+        self.buffer[self.size : end] = chunk
+        self.size = end
+
+    def getvalue(self):
+        del self.buffer[self.size :]
+        return self.buffer
+
+
 class Connection(object):
     """
     Class responsible for maintaining a connection to an Elasticsearch node. It
@@ -65,8 +325,19 @@ class Connection(object):
     :arg cloud_id: The Cloud ID from ElasticCloud. Convenient way to connect to cloud instances.
     :arg opaque_id: Send this value in the 'X-Opaque-Id' HTTP header
         For tracing all requests made by this transport.
+    :arg max_response_bytes: raise
+        :class:`~elasticsearch.ResponseTooLargeError` instead of reading
+        response bodies larger than this many bytes (default: no limit)
     """
 
+    #: number of requests currently being sent through this connection by the
+    #: :class:`~elasticsearch.Transport`
+    in_flight = 0
+
+    #: set once the :class:`~elasticsearch.Transport` removed the connection
+    #: from its pool and closed it, no new requests may use it
+    retired = False
+
     def __init__(
         self,
         host="localhost",
@@ -79,6 +350,7 @@ class Connection(object):
         cloud_id=None,
         api_key=None,
         opaque_id=None,
+        max_response_bytes=None,
         **kwargs
     ):
 
@@ -144,6 +416,7 @@ class Connection(object):
             url_prefix = "/" + url_prefix.strip("/")
         self.url_prefix = url_prefix
         self.timeout = timeout
+        self.max_response_bytes = max_response_bytes
 
     def __repr__(self):
         return "<%s: %s>" % (self.__class__.__name__, self.host)
@@ -157,6 +430,9 @@ class Connection(object):
         return id(self)
 
     def _gzip_compress(self, body):
+        if isinstance(body, _StreamingBody):
+            body.gzip()
+            return body
         buf = io.BytesIO()
         with gzip.GzipFile(fileobj=buf, mode="wb") as f:
             f.write(body)
@@ -203,6 +479,8 @@ class Connection(object):
         if not tracer.isEnabledFor(logging.INFO) or not tracer.handlers:
             return
 
+        body = _decode_body(body)
+
         # include pretty in trace curls
         path = path.replace("?", "?pretty&", 1) if "?" in path else path + "?pretty"
         if self.url_prefix:
@@ -235,25 +513,43 @@ class Connection(object):
     ):
         raise NotImplementedError()
 
+    def close(self):
+        """
+        Explicitly closes connection
+        """
+        pass
+
+    def warmup(self, count=1):
+        """
+        Open connections to the node ahead of the first requests so they
+        don't pay for the TCP and TLS handshakes. Sequential requests share
+        a single socket so this sends one ``HEAD /`` request regardless of
+        ``count``, subclasses able to open sockets in parallel override it.
+
+        Returns the number of connections that were opened.
+        """
+        try:
+            self.perform_request("HEAD", "/")
+        except TransportError:
+            return 0
+        return 1
+
     def log_request_success(
         self, method, full_url, path, body, status_code, response, duration
     ):
         """ Log a successful API call.  """
-        #  TODO: optionally pass in params instead of full_url and do urlencode only when needed
-
-        # body has already been serialized to utf-8, deserialize it for logging
-        # TODO: find a better way to avoid (de)encoding the body back and forth
-        if body:
-            try:
-                body = body.decode("utf-8", "ignore")
-            except AttributeError:
-                pass
-
-        logger.info(
-            "%s %s [status:%s request:%.3fs]", method, full_url, status_code, duration
-        )
-        logger.debug("> %s", body)
-        logger.debug("< %s", response)
+        if logger.isEnabledFor(logging.INFO):
+            # 'full_url' may be None, then it's only built when it's logged.
+            logger.info(
+                "%s %s [status:%s request:%.3fs]",
+                method,
+                full_url or self.host + path,
+                status_code,
+                duration,
+            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("> %s", _LazyBody(body))
+            logger.debug("< %s", response)
 
         self._log_trace(method, path, body, status_code, response, duration)
 
@@ -272,28 +568,22 @@ class Connection(object):
         # do not log 404s on HEAD requests
         if method == "HEAD" and status_code == 404:
             return
-        logger.warning(
-            "%s %s [status:%s request:%.3fs]",
-            method,
-            full_url,
-            status_code or "N/A",
-            duration,
-            exc_info=exception is not None,
-        )
-
-        # body has already been serialized to utf-8, deserialize it for logging
-        # TODO: find a better way to avoid (de)encoding the body back and forth
-        if body:
-            try:
-                body = body.decode("utf-8", "ignore")
-            except AttributeError:
-                pass
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "%s %s [status:%s request:%.3fs]",
+                method,
+                full_url or self.host + path,
+                status_code or "N/A",
+                duration,
+                exc_info=exception is not None,
+            )
 
-        logger.debug("> %s", body)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("> %s", _LazyBody(body))
 
         self._log_trace(method, path, body, status_code, response, duration)
 
-        if response is not None:
+        if response is not None and logger.isEnabledFor(logging.DEBUG):
             logger.debug("< %s", response)
 
     def _raise_error(self, status_code, raw_data):
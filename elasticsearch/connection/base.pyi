@@ -16,8 +16,11 @@
 #  under the License.
 
 import logging
+import mmap
+import os
 
 from typing import (
+    IO,
     Union,
     Optional,
     Mapping,
@@ -29,11 +32,63 @@ from typing import (
     Any,
     AnyStr,
     Collection,
+    Iterable,
+    Iterator,
+    AsyncIterable,
 )
+from ..serializer import Serializer
 
 logger: logging.Logger
 tracer: logging.Logger
 
+def _decode_body(body: Any) -> Any: ...
+def _encode_query(params: Mapping[str, Any]) -> str: ...
+def _encode_line(serializer: Serializer, line: Any) -> bytes: ...
+def _is_file(body: Any) -> bool: ...
+def _open_file(body: Union["os.PathLike[str]", IO[Any]]) -> Tuple[IO[Any], bool]: ...
+def _mmap_file(f: IO[Any]) -> Optional[mmap.mmap]: ...
+def _read_file(
+    body: Union["os.PathLike[str]", IO[Any]], block_size: int
+) -> Iterator[bytes]: ...
+
+class _LazyBody(object):
+    body: Any
+    def __init__(self, body: Any) -> None: ...
+    def __str__(self) -> str: ...
+
+class _StreamingBody(object):
+    chunk_size: int
+    serializer: Serializer
+    lines: Union[Iterable[Any], AsyncIterable[Any]]
+    compressor: Any
+    started: bool
+    size: int
+    def __init__(
+        self, serializer: Serializer, lines: Union[Iterable[Any], AsyncIterable[Any]]
+    ) -> None: ...
+    def __str__(self) -> str: ...
+    def __iter__(self) -> Iterator[bytes]: ...
+    def gzip(self) -> None: ...
+    def feed(self, line: Any) -> Optional[bytes]: ...
+    def flush(self) -> bytes: ...
+    def _take(self) -> bytes: ...
+    def _process(self, data: bytes) -> bytes: ...
+
+class _FileBody(_StreamingBody):
+    file: Union["os.PathLike[str]", IO[Any]]
+    def __init__(self, file: Union["os.PathLike[str]", IO[Any]]) -> None: ...
+
+class _ResponseBuffer(object):
+    buffer: bytearray
+    size: int
+    max_bytes: Optional[int]
+    def __init__(
+        self, content_length: Optional[Union[str, int]], max_bytes: Optional[int]
+    ) -> None: ...
+    def _check_size(self, size: int) -> None: ...
+    def write(self, chunk: bytes) -> None: ...
+    def getvalue(self) -> bytearray: ...
+
 class Connection(object):
     headers: Dict[str, str]
     use_ssl: bool
@@ -44,6 +99,9 @@ class Connection(object):
     host: str
     url_prefix: str
     timeout: Optional[Union[float, int]]
+    in_flight: int
+    retired: bool
+    max_response_bytes: Optional[int]
     def __init__(
         self,
         host: str = ...,
@@ -56,12 +114,15 @@ class Connection(object):
         cloud_id: Optional[str] = ...,
         api_key: Optional[Union[Tuple[str, str], List[str], str]] = ...,
         opaque_id: Optional[str] = ...,
+        max_response_bytes: Optional[int] = ...,
         **kwargs: Any
     ) -> None: ...
     def __repr__(self) -> str: ...
     def __eq__(self, other: object) -> bool: ...
     def __hash__(self) -> int: ...
-    def _gzip_compress(self, body: bytes) -> bytes: ...
+    def _gzip_compress(
+        self, body: Union[bytes, _StreamingBody]
+    ) -> Union[bytes, _StreamingBody]: ...
     def _raise_warnings(self, warning_headers: Sequence[str]) -> None: ...
     def _pretty_json(self, data: Any) -> str: ...
     def _log_trace(
@@ -86,7 +147,7 @@ class Connection(object):
     def log_request_success(
         self,
         method: str,
-        full_url: str,
+        full_url: Optional[str],
         path: str,
         body: Optional[bytes],
         status_code: int,
@@ -96,7 +157,7 @@ class Connection(object):
     def log_request_fail(
         self,
         method: str,
-        full_url: str,
+        full_url: Optional[str],
         path: str,
         body: Optional[bytes],
         duration: float,
@@ -0,0 +1,321 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import os
+import ssl
+import time
+import warnings
+
+import urllib3  # type: ignore
+
+from .base import Connection, _encode_query
+from ..exceptions import (
+    ConnectionError,
+    ImproperlyConfigured,
+    ConnectionTimeout,
+    SSLError,
+)
+
+# httpx is slow to import, it's only loaded once a connection is created
+httpx = None
+
+
+def _import_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError:
+            return None
+        httpx = module
+    return httpx
+
+
+# sentinel value for `verify_certs` and `ssl_show_warn`.
+# This is used to detect if a user is passing in a value
+# for SSL kwargs if also using an SSLContext.
+VERIFY_CERTS_DEFAULT = object()
+SSL_SHOW_WARN_DEFAULT = object()
+
+CA_CERTS = None
+
+try:
+    import certifi
+
+    CA_CERTS = certifi.where()
+except ImportError:
+    pass
+
+
+def _is_ssl_error(e):
+    """Walks the exception chain looking for an ``ssl.SSLError``, httpx
+    wraps the original error raised during the TLS handshake.
+    """
+    seen = set()
+    while e is not None and id(e) not in seen:
+        if isinstance(e, ssl.SSLError):
+            return True
+        seen.add(id(e))
+        e = getattr(e, "__cause__", None) or getattr(e, "__context__", None)
+    return False
+
+
+class HttpxHttpConnection(Connection):
+    """
+    Connection using the `httpx` library with HTTP/2 enabled. Concurrent
+    requests to a node are multiplexed as streams over a single connection
+    instead of each needing a socket of its own. Requires ``httpx[http2]``.
+
+    :arg host: hostname of the node (default: localhost)
+    :arg port: port to use (integer, default: 9200)
+    :arg url_prefix: optional url prefix for elasticsearch
+    :arg timeout: default timeout in seconds (float, default: 10)
+    :arg http_auth: optional http auth information as either ':' separated
+        string or a tuple
+    :arg use_ssl: use ssl for the connection if `True`
+    :arg verify_certs: whether to verify SSL certificates
+    :arg ssl_show_warn: show warning when verify certs is disabled
+    :arg ca_certs: optional path to CA bundle.
+    :arg client_cert: path to the file containing the private key and the
+        certificate, or cert only if using client_key
+    :arg client_key: path to the file containing the private key if using
+        separate cert and key files (client_cert will contain only the cert)
+    :arg ssl_context: an ``ssl.SSLContext`` to use instead of building one
+        from the other SSL related arguments
+    :arg http2: negotiate HTTP/2 with the node (default: `True`). HTTP/2 is
+        only negotiated over TLS, plain http connections use HTTP/1.1.
+    :arg maxsize: the maximum number of connections which will be kept open
+        to this host. With HTTP/2 a single connection is usually enough.
+    :arg headers: any custom http headers to be add to requests
+    :arg http_compress: Use gzip compression
+    :arg cloud_id: The Cloud ID from ElasticCloud. Convenient way to connect to cloud instances.
+        Other host connection params will be ignored.
+    :arg api_key: optional API Key authentication as either base64 encoded string or a tuple.
+    :arg opaque_id: Send this value in the 'X-Opaque-Id' HTTP header
+        For tracing all requests made by this transport.
+    """
+
+    def __init__(
+        self,
+        host="localhost",
+        port=None,
+        http_auth=None,
+        use_ssl=False,
+        verify_certs=VERIFY_CERTS_DEFAULT,
+        ssl_show_warn=SSL_SHOW_WARN_DEFAULT,
+        ca_certs=None,
+        client_cert=None,
+        client_key=None,
+        ssl_context=None,
+        http2=True,
+        maxsize=10,
+        headers=None,
+        http_compress=None,
+        cloud_id=None,
+        api_key=None,
+        opaque_id=None,
+        **kwargs
+    ):
+        if _import_httpx() is None:
+            raise ImproperlyConfigured(
+                "Please install httpx[http2] to use %s." % self.__class__.__name__
+            )
+
+        self.headers = {}
+
+        super(HttpxHttpConnection, self).__init__(
+            host=host,
+            port=port,
+            use_ssl=use_ssl,
+            headers=headers,
+            http_compress=http_compress,
+            cloud_id=cloud_id,
+            api_key=api_key,
+            opaque_id=opaque_id,
+            **kwargs
+        )
+
+        if http_auth is not None:
+            if isinstance(http_auth, (tuple, list)):
+                http_auth = ":".join(http_auth)
+            self.headers.update(urllib3.make_headers(basic_auth=http_auth))
+
+        # if providing an SSL context, raise error if any other SSL related flag is used
+        if ssl_context and (
+            (verify_certs is not VERIFY_CERTS_DEFAULT)
+            or (ssl_show_warn is not SSL_SHOW_WARN_DEFAULT)
+            or ca_certs
+            or client_cert
+            or client_key
+        ):
+            warnings.warn(
+                "When using `ssl_context`, all other SSL related kwargs are ignored"
+            )
+
+        if self.use_ssl and ssl_context is None:
+            ssl_context = self._create_ssl_context(
+                verify_certs=(
+                    True if verify_certs is VERIFY_CERTS_DEFAULT else verify_certs
+                ),
+                ssl_show_warn=(
+                    True if ssl_show_warn is SSL_SHOW_WARN_DEFAULT else ssl_show_warn
+                ),
+                ca_certs=ca_certs,
+                client_cert=client_cert,
+                client_key=client_key,
+            )
+
+        self.base_url = "%s%s" % (self.host, self.url_prefix)
+        self.http2 = http2
+        self.client = self._create_client(
+            http2=http2,
+            verify=ssl_context if ssl_context is not None else True,
+            limits=httpx.Limits(
+                max_connections=maxsize, max_keepalive_connections=maxsize
+            ),
+            timeout=self.timeout,
+        )
+
+    def _create_ssl_context(
+        self, verify_certs, ssl_show_warn, ca_certs, client_cert, client_key
+    ):
+        ssl_context = ssl.create_default_context()
+        if verify_certs:
+            ca_certs = CA_CERTS if ca_certs is None else ca_certs
+            if not ca_certs:
+                raise ImproperlyConfigured(
+                    "Root certificates are missing for certificate "
+                    "validation. Either pass them in using the ca_certs parameter or "
+                    "install certifi to use it automatically."
+                )
+            if os.path.isfile(ca_certs):
+                ssl_context.load_verify_locations(cafile=ca_certs)
+            elif os.path.isdir(ca_certs):
+                ssl_context.load_verify_locations(capath=ca_certs)
+            else:
+                raise ImproperlyConfigured("ca_certs parameter is not a path")
+        else:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            if ssl_show_warn:
+                warnings.warn(
+                    "Connecting to %s using SSL with verify_certs=False is insecure."
+                    % self.host
+                )
+
+        if client_cert:
+            ssl_context.load_cert_chain(client_cert, client_key)
+        return ssl_context
+
+    def _create_client(self, **kwargs):
+        """Creates the ``httpx`` client, overridden by the async connection."""
+        client = httpx.Client(**kwargs)
+        if not self.http_compress:
+            # httpx adds its own 'accept-encoding' header by default.
+            client.headers.pop("accept-encoding", None)
+        return client
+
+    def _prepare_request(self, url, params, body, headers):
+        url_path = self.url_prefix + url
+        if params:
+            url_path = "%s?%s" % (url_path, _encode_query(params))
+        full_url = self.host + url_path
+
+        request_headers = self.headers.copy()
+        if headers:
+            request_headers.update(headers)
+        if self.http_compress and body:
+            body = self._gzip_compress(body)
+            request_headers["content-encoding"] = "gzip"
+        return full_url, url_path, body, request_headers
+
+    def _raise_connection_error(self, e):
+        if isinstance(e, httpx.TimeoutException):
+            raise ConnectionTimeout("TIMEOUT", str(e), e)
+        if _is_ssl_error(e):
+            raise SSLError("N/A", str(e), e)
+        raise ConnectionError("N/A", str(e), e)
+
+    def _process_response(
+        self, method, full_url, url_path, orig_body, response, duration, ignore
+    ):
+        raw_data = response.content.decode("utf-8", "surrogatepass")
+
+        # raise warnings if any from the 'Warnings' header.
+        self._raise_warnings(response.headers.get_list("warning"))
+
+        # raise errors based on http status codes, let the client handle those if needed
+        if (
+            not (200 <= response.status_code < 300)
+            and response.status_code not in ignore
+        ):
+            self.log_request_fail(
+                method,
+                full_url,
+                url_path,
+                orig_body,
+                duration,
+                response.status_code,
+                raw_data,
+            )
+            self._raise_error(response.status_code, raw_data)
+
+        self.log_request_success(
+            method,
+            full_url,
+            url_path,
+            orig_body,
+            response.status_code,
+            raw_data,
+            duration,
+        )
+
+        return response.status_code, response.headers, raw_data
+
+    def perform_request(
+        self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None
+    ):
+        orig_body = body
+        full_url, url_path, body, request_headers = self._prepare_request(
+            url, params, body, headers
+        )
+
+        start = time.time()
+        try:
+            response = self.client.request(
+                method,
+                full_url,
+                content=body,
+                headers=request_headers,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+            duration = time.time() - start
+        except Exception as e:
+            self.log_request_fail(
+                method, full_url, url_path, orig_body, time.time() - start, exception=e
+            )
+            self._raise_connection_error(e)
+
+        return self._process_response(
+            method, full_url, url_path, orig_body, response, duration, ignore
+        )
+
+    def close(self):
+        """
+        Explicitly closes connections
+        """
+        self.client.close()
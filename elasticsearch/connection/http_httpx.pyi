@@ -0,0 +1,95 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import ssl
+from typing import Any, Optional, Mapping, Tuple, Collection, Union
+from .base import Connection
+
+httpx: Any
+
+def _import_httpx() -> Any: ...
+
+VERIFY_CERTS_DEFAULT: object
+SSL_SHOW_WARN_DEFAULT: object
+CA_CERTS: Optional[str]
+
+def _is_ssl_error(e: Optional[BaseException]) -> bool: ...
+
+class HttpxHttpConnection(Connection):
+    client: Any
+    base_url: str
+    http2: bool
+    def __init__(
+        self,
+        host: str = ...,
+        port: Optional[int] = ...,
+        http_auth: Optional[Any] = ...,
+        use_ssl: bool = ...,
+        verify_certs: bool = ...,
+        ssl_show_warn: bool = ...,
+        ca_certs: Optional[Any] = ...,
+        client_cert: Optional[Any] = ...,
+        client_key: Optional[Any] = ...,
+        ssl_context: Optional[ssl.SSLContext] = ...,
+        http2: bool = ...,
+        maxsize: int = ...,
+        headers: Optional[Mapping[str, str]] = ...,
+        http_compress: Optional[bool] = ...,
+        cloud_id: Optional[str] = ...,
+        api_key: Optional[Any] = ...,
+        opaque_id: Optional[str] = ...,
+        **kwargs: Any
+    ) -> None: ...
+    def _create_ssl_context(
+        self,
+        verify_certs: bool,
+        ssl_show_warn: bool,
+        ca_certs: Optional[str],
+        client_cert: Optional[str],
+        client_key: Optional[str],
+    ) -> ssl.SSLContext: ...
+    def _create_client(self, **kwargs: Any) -> Any: ...
+    def _prepare_request(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        body: Optional[bytes],
+        headers: Optional[Mapping[str, str]],
+    ) -> Tuple[str, str, Optional[bytes], Mapping[str, str]]: ...
+    def _raise_connection_error(self, e: Exception) -> None: ...
+    def _process_response(
+        self,
+        method: str,
+        full_url: str,
+        url_path: str,
+        orig_body: Optional[bytes],
+        response: Any,
+        duration: float,
+        ignore: Collection[int],
+    ) -> Tuple[int, Mapping[str, str], str]: ...
+    def perform_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = ...,
+        body: Optional[bytes] = ...,
+        timeout: Optional[Union[int, float]] = ...,
+        ignore: Collection[int] = ...,
+        headers: Optional[Mapping[str, str]] = ...,
+    ) -> Tuple[int, Mapping[str, str], str]: ...
+    def warmup(self, count: int = ...) -> int: ...
+    def close(self) -> None: ...
@@ -25,14 +25,15 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
-from .base import Connection
+from .base import Connection, _ResponseBuffer, _encode_query
 from ..exceptions import (
     ConnectionError,
     ImproperlyConfigured,
     ConnectionTimeout,
+    ResponseTooLargeError,
     SSLError,
 )
-from ..compat import urlencode, string_types
+from ..compat import string_types
 
 
 class RequestsHttpConnection(Connection):
@@ -142,7 +143,7 @@ class RequestsHttpConnection(Connection):
         url = self.base_url + url
         headers = headers or {}
         if params:
-            url = "%s?%s" % (url, urlencode(params or {}))
+            url = "%s?%s" % (url, _encode_query(params))
 
         orig_body = body
         if self.http_compress and body:
@@ -157,10 +158,17 @@ class RequestsHttpConnection(Connection):
         )
         send_kwargs = {"timeout": timeout or self.timeout}
         send_kwargs.update(settings)
+        # bodies are only streamed when their size has to be checked.
+        if self.max_response_bytes is not None:
+            send_kwargs["stream"] = True
         try:
             response = self.session.send(prepared_request, **send_kwargs)
+            if self.max_response_bytes is None:
+                data = response.content
+            else:
+                data = self._read_response(response)
             duration = time.time() - start
-            raw_data = response.content.decode("utf-8", "surrogatepass")
+            raw_data = data.decode("utf-8", "surrogatepass")
         except Exception as e:
             self.log_request_fail(
                 method,
@@ -170,6 +178,8 @@ class RequestsHttpConnection(Connection):
                 time.time() - start,
                 exception=e,
             )
+            if isinstance(e, ResponseTooLargeError):
+                raise
             if isinstance(e, requests.exceptions.SSLError):
                 raise SSLError("N/A", str(e), e)
             if isinstance(e, requests.Timeout):
@@ -210,6 +220,22 @@ class RequestsHttpConnection(Connection):
 
         return response.status_code, response.headers, raw_data
 
+    def _read_response(self, response):
+        """
+        Read the body of a streamed response, enforcing ``max_response_bytes``.
+        """
+        try:
+            buffer = _ResponseBuffer(
+                response.headers.get("content-length"), self.max_response_bytes
+            )
+            for chunk in response.iter_content(_ResponseBuffer.chunk_size):
+                buffer.write(chunk)
+        finally:
+            # closes the connection instead of releasing it to the pool
+            # if the body wasn't read completely.
+            response.close()
+        return buffer.getvalue()
+
     @property
     def headers(self):
         return self.session.headers
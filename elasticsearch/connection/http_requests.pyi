@@ -39,3 +39,6 @@ class RequestsHttpConnection(Connection):
         opaque_id: Optional[str] = ...,
         **kwargs: Any
     ) -> None: ...
+    def _read_response(self, response: requests.Response) -> bytearray: ...
+    def warmup(self, count: int = ...) -> int: ...
+    def close(self) -> None: ...
@@ -16,20 +16,22 @@
 #  under the License.
 
 import time
+import socket
 import ssl
+import threading
 import urllib3  # type: ignore
 from urllib3.exceptions import ReadTimeoutError, SSLError as UrllibSSLError  # type: ignore
 from urllib3.util.retry import Retry  # type: ignore
 import warnings
 
-from .base import Connection
+from .base import Connection, _ResponseBuffer, _StreamingBody, _encode_query
 from ..exceptions import (
     ConnectionError,
     ImproperlyConfigured,
     ConnectionTimeout,
+    ResponseTooLargeError,
     SSLError,
 )
-from ..compat import urlencode
 
 # sentinel value for `verify_certs` and `ssl_show_warn`.
 # This is used to detect if a user is passing in a value
@@ -37,6 +39,9 @@ from ..compat import urlencode
 VERIFY_CERTS_DEFAULT = object()
 SSL_SHOW_WARN_DEFAULT = object()
 
+# Retries are handled by the Transport, urllib3 must never retry on its own.
+NO_RETRIES = Retry(False)
+
 CA_CERTS = None
 
 try:
@@ -47,18 +52,100 @@ except ImportError:
     pass
 
 
-def create_ssl_context(**kwargs):
+# TLS sessions can only be resumed on Python 3.7+ where the socket class
+# of an SSLContext can be replaced.
+HAS_TLS_SESSION_REUSE = hasattr(getattr(ssl, "SSLContext", None), "sslsocket_class")
+
+
+def create_ssl_context(session_reuse=False, **kwargs):
     """
     A helper function around creating an SSL context
 
     https://docs.python.org/3/library/ssl.html#context-creation
 
     Accepts kwargs in the same manner as `create_default_context`.
+
+    :arg session_reuse: return a :class:`TLSSessionContext` resuming the TLS
+        session of previous sockets to a server on new sockets. Pass the
+        context to all connections as ``ssl_context``.
     """
-    ctx = ssl.create_default_context(**kwargs)
+    if not session_reuse:
+        return ssl.create_default_context(**kwargs)
+
+    if not HAS_TLS_SESSION_REUSE:
+        raise ImproperlyConfigured("TLS session reuse requires Python 3.7 or later")
+    purpose = kwargs.pop("purpose", ssl.Purpose.SERVER_AUTH)
+    if purpose != ssl.Purpose.SERVER_AUTH:
+        raise ImproperlyConfigured("TLS sessions can only be reused by clients")
+    ctx = TLSSessionContext(ssl.PROTOCOL_TLS_CLIENT)
+    if any(kwargs.values()):
+        ctx.load_verify_locations(**kwargs)
+    else:
+        ctx.load_default_certs(purpose)
     return ctx
 
 
+if HAS_TLS_SESSION_REUSE:
+
+    class _TLSSessionSocket(ssl.SSLSocket):
+        def close(self):
+            # The session is only complete once the server's session ticket
+            # has been read (TLS 1.3), so it's saved again before closing.
+            self.context._save_session(self)
+            super(_TLSSessionSocket, self).close()
+
+    class TLSSessionContext(ssl.SSLContext):
+        """
+        ``ssl.SSLContext`` remembering the TLS session of every server it
+        connected to. New sockets to the same server resume that session with
+        an abbreviated handshake which skips the certificate exchange and, on
+        TLS 1.2, a round-trip. Create it with
+        ``create_ssl_context(session_reuse=True)``.
+        """
+
+        sslsocket_class = _TLSSessionSocket
+
+        def __init__(self, *args, **kwargs):
+            self._sessions = {}
+
+        def _session_key(self, sock, server_hostname):
+            try:
+                return server_hostname, sock.getpeername()
+            except (socket.error, ValueError):
+                return None
+
+        def _save_session(self, sock):
+            session = sock.session
+            if session is not None and not sock.server_side:
+                key = self._session_key(sock, sock.server_hostname)
+                if key is not None:
+                    self._sessions[key] = session
+
+        def wrap_socket(
+            self,
+            sock,
+            server_side=False,
+            do_handshake_on_connect=True,
+            suppress_ragged_eofs=True,
+            server_hostname=None,
+            session=None,
+        ):
+            if session is None and not server_side:
+                key = self._session_key(sock, server_hostname)
+                session = self._sessions.get(key) if key is not None else None
+            ssl_sock = super(TLSSessionContext, self).wrap_socket(
+                sock,
+                server_side=server_side,
+                do_handshake_on_connect=do_handshake_on_connect,
+                suppress_ragged_eofs=suppress_ragged_eofs,
+                server_hostname=server_hostname,
+                session=session,
+            )
+            if not server_side and do_handshake_on_connect:
+                self._save_session(ssl_sock)
+            return ssl_sock
+
+
 class Urllib3HttpConnection(Connection):
     """
     Default connection class using the `urllib3` library and the http protocol.
@@ -94,6 +181,10 @@ class Urllib3HttpConnection(Connection):
     :arg api_key: optional API Key authentication as either base64 encoded string or a tuple.
     :arg opaque_id: Send this value in the 'X-Opaque-Id' HTTP header
         For tracing all requests made by this transport.
+
+    New sockets only resume the TLS session of earlier ones when
+    ``ssl_context`` is created with ``create_ssl_context(session_reuse=True)``,
+    urllib3 creates a new context for every socket otherwise.
     """
 
     def __init__(
@@ -217,8 +308,7 @@ class Urllib3HttpConnection(Connection):
     ):
         url = self.url_prefix + url
         if params:
-            url = "%s?%s" % (url, urlencode(params))
-        full_url = self.host + url
+            url = "%s?%s" % (url, _encode_query(params))
 
         start = time.time()
         orig_body = body
@@ -235,22 +325,41 @@ class Urllib3HttpConnection(Connection):
             if not isinstance(method, str):
                 method = method.encode("utf-8")
 
-            request_headers = self.headers.copy()
-            request_headers.update(headers or ())
+            compress = self.http_compress and body
+            if headers or compress:
+                request_headers = self.headers.copy()
+                request_headers.update(headers or ())
+            else:
+                # urllib3 never modifies the headers it's given so the
+                # connection's headers can be sent as they are.
+                request_headers = self.headers
 
-            if self.http_compress and body:
+            if compress:
                 body = self._gzip_compress(body)
                 request_headers["content-encoding"] = "gzip"
+            if isinstance(body, _StreamingBody):
+                kw["chunked"] = True
 
+            # response bodies are only streamed when their size has to be checked.
+            preload_content = self.max_response_bytes is None
             response = self.pool.urlopen(
-                method, url, body, retries=Retry(False), headers=request_headers, **kw
+                method,
+                url,
+                body,
+                retries=NO_RETRIES,
+                headers=request_headers,
+                preload_content=preload_content,
+                **kw
             )
+            data = response.data if preload_content else self._read_response(response)
             duration = time.time() - start
-            raw_data = response.data.decode("utf-8", "surrogatepass")
+            raw_data = data.decode("utf-8", "surrogatepass")
         except Exception as e:
             self.log_request_fail(
-                method, full_url, url, orig_body, time.time() - start, exception=e
+                method, None, url, orig_body, time.time() - start, exception=e
             )
+            if isinstance(e, ResponseTooLargeError):
+                raise
             if isinstance(e, UrllibSSLError):
                 raise SSLError("N/A", str(e), e)
             if isinstance(e, ReadTimeoutError):
@@ -264,16 +373,73 @@ class Urllib3HttpConnection(Connection):
         # raise errors based on http status codes, let the client handle those if needed
         if not (200 <= response.status < 300) and response.status not in ignore:
             self.log_request_fail(
-                method, full_url, url, orig_body, duration, response.status, raw_data
+                method, None, url, orig_body, duration, response.status, raw_data
             )
             self._raise_error(response.status, raw_data)
 
         self.log_request_success(
-            method, full_url, url, orig_body, response.status, raw_data, duration
+            method, None, url, orig_body, response.status, raw_data, duration
         )
 
         return response.status, response.getheaders(), raw_data
 
+    def _read_response(self, response):
+        """
+        Read the body of a response that wasn't preloaded, enforcing
+        ``max_response_bytes``.
+        """
+        try:
+            buffer = _ResponseBuffer(
+                response.headers.get("content-length"), self.max_response_bytes
+            )
+            for chunk in response.stream(_ResponseBuffer.chunk_size):
+                buffer.write(chunk)
+        except Exception:
+            # don't hand a connection with unread data back to the pool.
+            response.close()
+            raise
+        finally:
+            response.release_conn()
+        return buffer.getvalue()
+
+    def warmup(self, count=1):
+        """
+        Open up to ``count`` sockets to the node in parallel, bounded by
+        ``maxsize``, and put them in the pool after sending a ``HEAD /``
+        request on each. Sockets already in the pool are counted.
+
+        Returns the number of open sockets.
+        """
+        count = min(count, self.pool.pool.maxsize)
+        conns = [self.pool._get_conn() for _ in range(count)]
+
+        def _connect(conn):
+            if conn.sock is None:
+                # A request is sent on the new socket rather than only
+                # connecting it: the TLS 1.3 session tickets sent by the
+                # server after the handshake would otherwise be unread and
+                # make urllib3 consider the idle socket dropped.
+                try:
+                    conn.request("HEAD", self.url_prefix + "/", headers=self.headers)
+                    conn.getresponse().read()
+                except Exception:
+                    conn.close()
+
+        threads = [threading.Thread(target=_connect, args=(c,)) for c in conns[1:]]
+        for thread in threads:
+            thread.start()
+        if conns:
+            _connect(conns[0])
+        for thread in threads:
+            thread.join()
+
+        opened = 0
+        for conn in conns:
+            if conn.sock is not None:
+                opened += 1
+            self.pool._put_conn(conn)
+        return opened
+
     def close(self):
         """
         Explicitly closes connection
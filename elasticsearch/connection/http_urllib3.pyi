@@ -15,17 +15,41 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import socket
 import ssl
-from typing import Optional, Mapping, Any, Union
+from typing import Optional, Mapping, Any, Union, Dict, Tuple
 import urllib3  # type: ignore
 from .base import Connection
 
+HAS_TLS_SESSION_REUSE: bool
+
 def create_ssl_context(
+    session_reuse: bool = ...,
     cafile: Any = ...,
     capath: Any = ...,
     cadata: Any = ...,
 ) -> ssl.SSLContext: ...
 
+class _TLSSessionSocket(ssl.SSLSocket):
+    def close(self) -> None: ...
+
+class TLSSessionContext(ssl.SSLContext):
+    _sessions: Dict[Tuple[Union[str, bytes, None], Any], ssl.SSLSession]
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+    def _session_key(
+        self, sock: socket.socket, server_hostname: Union[str, bytes, None]
+    ) -> Optional[Tuple[Union[str, bytes, None], Any]]: ...
+    def _save_session(self, sock: ssl.SSLSocket) -> None: ...
+    def wrap_socket(
+        self,
+        sock: socket.socket,
+        server_side: bool = ...,
+        do_handshake_on_connect: bool = ...,
+        suppress_ragged_eofs: bool = ...,
+        server_hostname: Union[str, bytes, None] = ...,
+        session: Optional[ssl.SSLSession] = ...,
+    ) -> ssl.SSLSocket: ...
+
 class Urllib3HttpConnection(Connection):
     pool: urllib3.HTTPConnectionPool
     def __init__(
@@ -53,3 +77,6 @@ class Urllib3HttpConnection(Connection):
         opaque_id: Optional[str] = ...,
         **kwargs: Any
     ) -> None: ...
+    def _read_response(self, response: urllib3.HTTPResponse) -> bytearray: ...
+    def warmup(self, count: int = ...) -> int: ...
+    def close(self) -> None: ...
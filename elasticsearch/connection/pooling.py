@@ -15,12 +15,12 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
-from .base import Connection
+import threading
+import time
+from collections import deque
 
-try:
-    import queue
-except ImportError:
-    import Queue as queue  # type: ignore
+from .base import Connection
+from ..exceptions import ConnectionError, ConnectionTimeout
 
 
 class PoolingConnection(Connection):
@@ -29,26 +29,187 @@ class PoolingConnection(Connection):
     safety and no capacity for connection pooling. To use this just implement a
     ``_make_connection`` method that constructs a new connection and returns
     it.
+
+    The pool opens at most ``maxsize`` connections. When all of them are in
+    use ``_get_connection`` blocks until one is released. Free connections
+    are handed out most recently used first so the ones left idle for more
+    than ``idle_timeout`` seconds are closed. Override
+    ``_is_connection_usable`` to health check a connection before it's
+    handed out and ``_close_connection`` to close one.
+
+    :arg maxsize: the maximum number of connections kept open to the node
+        (default: 10)
+    :arg pool_timeout: seconds to wait for a free connection before raising
+        :class:`~elasticsearch.ConnectionTimeout`, wait forever if ``None``
+        (default: ``None``)
+    :arg idle_timeout: seconds after which an unused connection is closed,
+        never if ``None`` (default: 60)
     """
 
     def __init__(self, *args, **kwargs):
-        self._free_connections = queue.Queue()
+        self.maxsize = kwargs.pop("maxsize", 10)
+        self.pool_timeout = kwargs.pop("pool_timeout", None)
+        self.idle_timeout = kwargs.pop("idle_timeout", 60)
+
+        # free connections as (connection, last used) pairs, the most
+        # recently used one last.
+        self._free_connections = deque()
+        self._pool_cond = threading.Condition(threading.Lock())
+        self._pool_closed = False
+        self._pool_stats = {
+            "connections": 0,
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "discarded": 0,
+            "waited": 0,
+            "timed_out": 0,
+        }
         super(PoolingConnection, self).__init__(*args, **kwargs)
 
     def _make_connection(self):
         raise NotImplementedError
 
+    def _is_connection_usable(self, con):
+        """
+        Health check of a free connection before it's handed out, unusable
+        connections are closed and replaced.
+        """
+        return True
+
+    def _close_connection(self, con):
+        close = getattr(con, "close", None)
+        if close is not None:
+            close()
+
     def _get_connection(self):
-        try:
-            return self._free_connections.get_nowait()
-        except queue.Empty:
-            return self._make_connection()
+        deadline = None
+        if self.pool_timeout is not None:
+            deadline = time.time() + self.pool_timeout
+
+        while True:
+            expired = []
+            try:
+                con = self._checkout(deadline, expired)
+            finally:
+                for expired_con in expired:
+                    self._close_connection(expired_con)
+
+            if con is None:
+                try:
+                    return self._make_connection()
+                except Exception:
+                    self._remove_connection()
+                    raise
+
+            if self._is_connection_usable(con):
+                with self._pool_cond:
+                    self._pool_stats["reused"] += 1
+                return con
+
+            self._release_connection(con, discard=True)
 
-    def _release_connection(self, con):
-        self._free_connections.put(con)
+    def _checkout(self, deadline, expired):
+        """
+        Take a free connection from the pool or return ``None`` when a new
+        one can be made, waiting until ``deadline`` if neither is possible.
+        """
+        waited = False
+        with self._pool_cond:
+            while True:
+                if self._pool_closed:
+                    raise ConnectionError(
+                        "N/A",
+                        "The connection pool is closed",
+                        "The connection pool is closed",
+                    )
+                expired.extend(self._evict_idle())
+                if self._free_connections:
+                    return self._free_connections.pop()[0]
+                if self._pool_stats["connections"] < self.maxsize:
+                    self._pool_stats["connections"] += 1
+                    self._pool_stats["created"] += 1
+                    return None
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._pool_stats["timed_out"] += 1
+                        msg = (
+                            "Timed out waiting for a free connection (maxsize=%d)"
+                            % self.maxsize
+                        )
+                        raise ConnectionTimeout("TIMEOUT", msg, msg)
+                if not waited:
+                    waited = True
+                    self._pool_stats["waited"] += 1
+                self._pool_cond.wait(remaining)
+
+    def _release_connection(self, con, discard=False):
+        """
+        Return a connection to the pool, or close it if ``discard`` is set
+        because it's broken or the pool was closed in the meantime.
+        """
+        with self._pool_cond:
+            if not (discard or self._pool_closed):
+                self._free_connections.append((con, time.time()))
+                self._pool_cond.notify()
+                return
+            if discard:
+                self._pool_stats["discarded"] += 1
+        self._remove_connection()
+        self._close_connection(con)
+
+    def _remove_connection(self):
+        with self._pool_cond:
+            self._pool_stats["connections"] -= 1
+            self._pool_cond.notify()
+
+    def _evict_idle(self, now=None):
+        """
+        Remove the connections unused for more than ``idle_timeout`` seconds
+        from the pool and return them to be closed. Must be called with the
+        pool's lock held.
+        """
+        expired = []
+        if self.idle_timeout is None:
+            return expired
+        now = now if now is not None else time.time()
+        while (
+            self._free_connections
+            and now - self._free_connections[0][1] > self.idle_timeout
+        ):
+            expired.append(self._free_connections.popleft()[0])
+        self._pool_stats["connections"] -= len(expired)
+        self._pool_stats["evicted"] += len(expired)
+        return expired
+
+    def pool_stats(self):
+        """
+        Return a dictionary describing the pool: the number of open
+        connections and how many of them are idle or in use, as well as
+        counters of connections created, reused, evicted for being idle
+        and discarded as unusable, and of how often callers had to wait for
+        a free connection or timed out doing so.
+        """
+        with self._pool_cond:
+            stats = dict(self._pool_stats)
+            stats["maxsize"] = self.maxsize
+            stats["idle"] = len(self._free_connections)
+            stats["in_use"] = stats["connections"] - stats["idle"]
+            return stats
 
     def close(self):
         """
-        Explicitly close connection
+        Explicitly close connection. Idle connections are closed right away,
+        the ones in use once they're released.
         """
-        pass
+        with self._pool_cond:
+            self._pool_closed = True
+            free = [con for con, _ in self._free_connections]
+            self._free_connections.clear()
+            self._pool_stats["connections"] -= len(free)
+            self._pool_cond.notify_all()
+        for con in free:
+            self._close_connection(con)
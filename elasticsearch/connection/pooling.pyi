@@ -15,10 +15,26 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import threading
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from .base import Connection
 
 class PoolingConnection(Connection):
-    def _make_connection(self) -> Connection: ...
-    def _get_connection(self) -> Connection: ...
-    def _release_connection(self, con: Connection) -> None: ...
+    maxsize: int
+    pool_timeout: Optional[float]
+    idle_timeout: Optional[float]
+    _free_connections: Deque[Tuple[Any, float]]
+    _pool_cond: threading.Condition
+    _pool_closed: bool
+    _pool_stats: Dict[str, int]
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+    def _make_connection(self) -> Any: ...
+    def _is_connection_usable(self, con: Any) -> bool: ...
+    def _close_connection(self, con: Any) -> None: ...
+    def _get_connection(self) -> Any: ...
+    def _checkout(self, deadline: Optional[float], expired: List[Any]) -> Any: ...
+    def _release_connection(self, con: Any, discard: bool = ...) -> None: ...
+    def _remove_connection(self) -> None: ...
+    def _evict_idle(self, now: Optional[float] = ...) -> List[Any]: ...
+    def pool_stats(self) -> Dict[str, int]: ...
     def close(self) -> None: ...
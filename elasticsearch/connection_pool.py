@@ -143,7 +143,11 @@ class ConnectionPool(object):
         # PriorityQueue for thread safety and ease of timeout management
         self.dead = PriorityQueue(len(self.connections))
         self.dead_count = {}
+        # guards the live list and the dead queue against update_connections
+        # running in another thread
+        self._lock = threading.Lock()
 
+        self.randomize_hosts = randomize_hosts
         if randomize_hosts:
             # randomize the connection list to avoid all clients hitting same node
             # after startup/restart
@@ -155,6 +159,61 @@ class ConnectionPool(object):
 
         self.selector = selector_class(dict(connections))
 
+    def update_connections(self, connections):
+        """
+        Update the pool in place with a new set of connections, typically
+        after sniffing. Connections present both before and after keep their
+        live/dead state, fail counts and the selector keeps its position; new
+        connections are added to the live pool. Returns the list of
+        connections that were removed so that the caller can close them.
+
+        :arg connections: list of tuples containing the
+            :class:`~elasticsearch.Connection` instance and it's options
+        """
+        if not connections:
+            raise ImproperlyConfigured(
+                "No defined connections, you need to " "specify at least one host."
+            )
+        with self._lock:
+            kept = set(id(c) for (c, opts) in connections)
+            removed = [c for (c, opts) in self.connection_opts if id(c) not in kept]
+
+            # carry over the dead connections that are still part of the pool
+            dead = []
+            while True:
+                try:
+                    timeout, connection = self.dead.get(block=False)
+                except Empty:
+                    break
+                if id(connection) in kept:
+                    dead.append((timeout, connection))
+            self.dead = PriorityQueue(len(connections))
+            for item in dead:
+                self.dead.put(item)
+
+            dead_ids = set(id(c) for (_, c) in dead)
+            live = [c for c in self.connections if id(c) in kept]
+            live_ids = set(id(c) for c in live)
+            for connection, opts in connections:
+                if id(connection) in live_ids or id(connection) in dead_ids:
+                    continue
+                # new connection, insert it at a random position to avoid dog
+                # piling
+                position = (
+                    random.randint(0, len(live)) if self.randomize_hosts else len(live)
+                )
+                live.insert(position, connection)
+                live_ids.add(id(connection))
+
+            for connection in removed:
+                self.dead_count.pop(connection, None)
+
+            self.connection_opts = connections
+            self.connections = live
+            self.orig_connections = tuple(c for (c, opts) in connections)
+            self.selector.connection_opts = dict(connections)
+        return removed
+
     def mark_dead(self, connection, now=None):
         """
         Mark the connection as dead (failed). Remove it from the live pool and
@@ -164,20 +223,27 @@ class ConnectionPool(object):
         """
         # allow inject for testing purposes
         now = now if now else time.time()
-        try:
-            self.connections.remove(connection)
-        except ValueError:
+        with self._lock:
+            try:
+                self.connections.remove(connection)
+            except ValueError:
+                removed = False
+            else:
+                removed = True
+                dead_count = self.dead_count.get(connection, 0) + 1
+                self.dead_count[connection] = dead_count
+                timeout = self.dead_timeout * 2 ** min(
+                    dead_count - 1, self.timeout_cutoff
+                )
+                self.dead.put((now + timeout, connection))
+
+        if not removed:
             logger.info(
                 "Attempted to remove %r, but it does not exist in the connection pool.",
                 connection,
             )
             # connection not alive or another thread marked it already, ignore
-            return
         else:
-            dead_count = self.dead_count.get(connection, 0) + 1
-            self.dead_count[connection] = dead_count
-            timeout = self.dead_timeout * 2 ** min(dead_count - 1, self.timeout_cutoff)
-            self.dead.put((now + timeout, connection))
             logger.warning(
                 "Connection %r has failed for %i times in a row, putting on %i second timeout.",
                 connection,
@@ -220,23 +286,28 @@ class ConnectionPool(object):
                 return random.choice(self.orig_connections)
             return
 
-        try:
-            # retrieve a connection to check
-            timeout, connection = self.dead.get(block=False)
-        except Empty:
-            # other thread has been faster and the queue is now empty. If we
-            # are forced, return a connection at random again.
+        with self._lock:
+            try:
+                # retrieve a connection to check
+                timeout, connection = self.dead.get(block=False)
+            except Empty:
+                # other thread has been faster and the queue is now empty. If
+                # we are forced, return a connection at random again.
+                connection = None
+            else:
+                if not force and timeout > time.time():
+                    # return it back if not eligible and not forced
+                    self.dead.put((timeout, connection))
+                    return
+
+                # either we were forced or the connection is elligible to be
+                # retried
+                self.connections.append(connection)
+
+        if connection is None:
             if force:
                 return random.choice(self.orig_connections)
             return
-
-        if not force and timeout > time.time():
-            # return it back if not eligible and not forced
-            self.dead.put((timeout, connection))
-            return
-
-        # either we were forced or the connection is elligible to be retried
-        self.connections.append(connection)
         logger.info("Resurrecting connection %r (force=%s).", connection, force)
         return connection
 
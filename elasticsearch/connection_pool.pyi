@@ -16,6 +16,7 @@
 #  under the License.
 
 import logging
+import threading
 from typing import Sequence, Optional, Type, Any, Union, List, Tuple, Dict
 from .connection import Connection
 
@@ -40,9 +41,11 @@ class ConnectionPool(object):
     orig_connections: Tuple[Connection, ...]
     dead: PriorityQueue
     dead_count: Dict[Connection, int]
+    _lock: threading.Lock
     dead_timeout: float
     timeout_cutoff: int
     selector: ConnectionSelector
+    randomize_hosts: bool
     def __init__(
         self,
         connections: Sequence[Tuple[Connection, Any]],
@@ -52,6 +55,9 @@ class ConnectionPool(object):
         randomize_hosts: bool = ...,
         **kwargs: Any
     ) -> None: ...
+    def update_connections(
+        self, connections: Sequence[Tuple[Connection, Any]]
+    ) -> List[Connection]: ...
     def mark_dead(self, connection: Connection, now: Optional[float] = ...) -> None: ...
     def mark_live(self, connection: Connection) -> None: ...
     def resurrect(self, force: bool = ...) -> Optional[Connection]: ...
@@ -26,6 +26,7 @@ __all__ = [
     "ConnectionError",
     "SSLError",
     "ConnectionTimeout",
+    "ResponseTooLargeError",
     "AuthenticationException",
     "AuthorizationException",
 ]
@@ -133,6 +134,14 @@ class ConnectionTimeout(ConnectionError):
         )
 
 
+class ResponseTooLargeError(TransportError):
+    """
+    The response body exceeded the ``max_response_bytes`` limit of the
+    connection. The rest of the response isn't read and the underlying
+    connection is closed.
+    """
+
+
 class NotFoundError(TransportError):
     """ Exception representing a 404 status code. """
 
@@ -38,6 +38,7 @@ class SSLError(ConnectionError): ...
 class ConnectionTimeout(ConnectionError):
     def __str__(self) -> str: ...
 
+class ResponseTooLargeError(TransportError): ...
 class NotFoundError(TransportError): ...
 class ConflictError(TransportError): ...
 class RequestError(TransportError): ...
@@ -18,8 +18,9 @@
 import sys
 from .errors import BulkIndexError, ScanError
 from .actions import expand_action, streaming_bulk, bulk, parallel_bulk
-from .actions import scan, reindex
+from .actions import multi_search, streaming_post_data, scan, reindex
 from .actions import _chunk_actions, _process_bulk_chunk
+from .batching import BatchingClient, BulkFuture, BulkIndexer
 
 __all__ = [
     "BulkIndexError",
@@ -28,10 +29,15 @@ __all__ = [
     "streaming_bulk",
     "bulk",
     "parallel_bulk",
+    "multi_search",
+    "streaming_post_data",
     "scan",
     "reindex",
     "_chunk_actions",
     "_process_bulk_chunk",
+    "BatchingClient",
+    "BulkFuture",
+    "BulkIndexer",
 ]
 
 
@@ -45,8 +51,25 @@ try:
         async_bulk,
         async_reindex,
         async_streaming_bulk,
+        async_pipeline_bulk,
+        async_multi_search,
+        async_streaming_post_data,
+        EventLoopLagMonitor,
+        AsyncBatchingClient,
+        AsyncBulkIndexer,
     )
 
-    __all__ += ["async_scan", "async_bulk", "async_reindex", "async_streaming_bulk"]
+    __all__ += [
+        "async_scan",
+        "async_bulk",
+        "async_reindex",
+        "async_streaming_bulk",
+        "async_pipeline_bulk",
+        "async_multi_search",
+        "async_streaming_post_data",
+        "EventLoopLagMonitor",
+        "AsyncBatchingClient",
+        "AsyncBulkIndexer",
+    ]
 except (ImportError, SyntaxError):
     pass
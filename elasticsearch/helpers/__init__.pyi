@@ -22,11 +22,18 @@ from .actions import (
     streaming_bulk as streaming_bulk,
     bulk as bulk,
     parallel_bulk as parallel_bulk,
+    multi_search as multi_search,
+    streaming_post_data as streaming_post_data,
     scan as scan,
     reindex as reindex,
     _chunk_actions as _chunk_actions,
     _process_bulk_chunk as _process_bulk_chunk,
 )
+from .batching import (
+    BatchingClient as BatchingClient,
+    BulkFuture as BulkFuture,
+    BulkIndexer as BulkIndexer,
+)
 
 try:
     # Asyncio only supported on Python 3.6+
@@ -38,6 +45,12 @@ try:
         async_bulk as async_bulk,
         async_reindex as async_reindex,
         async_streaming_bulk as async_streaming_bulk,
+        async_pipeline_bulk as async_pipeline_bulk,
+        async_multi_search as async_multi_search,
+        async_streaming_post_data as async_streaming_post_data,
+        EventLoopLagMonitor as EventLoopLagMonitor,
+        AsyncBatchingClient as AsyncBatchingClient,
+        AsyncBulkIndexer as AsyncBulkIndexer,
     )
 except (ImportError, SyntaxError):
     pass
@@ -20,6 +20,8 @@ import time
 
 from ..exceptions import TransportError
 from ..compat import map, string_types, Queue, Mapping
+from ..connection.base import _encode_line, _is_file, _mmap_file, _open_file
+from ..tracing import start_span
 
 from .errors import ScanError, BulkIndexError
 
@@ -109,8 +111,12 @@ class _ActionChunker:
         self.bulk_data = []
 
     def feed(self, action, data):
-        ret = None
-        raw_data, raw_action = data, action
+        return self.feed_serialized(action, data, *self.serialize(action, data))
+
+    def serialize(self, action, data):
+        """
+        Serialize an action and its data line, returns them with their size.
+        """
         action = self.serializer.dumps(action)
         # +1 to account for the trailing new line character
         cur_size = len(action.encode("utf-8")) + 1
@@ -118,6 +124,14 @@ class _ActionChunker:
         if data is not None:
             data = self.serializer.dumps(data)
             cur_size += len(data.encode("utf-8")) + 1
+        return action, data, cur_size
+
+    def feed_serialized(self, raw_action, raw_data, action, data, cur_size):
+        """
+        Add an action already passed through :meth:`serialize`, returns the
+        previous chunk if it is full.
+        """
+        ret = None
 
         # full chunk, send it and start a new one
         if self.bulk_actions and (
@@ -144,9 +158,18 @@ class _ActionChunker:
         if self.bulk_actions:
             ret = (self.bulk_data, self.bulk_actions)
             self.bulk_actions, self.bulk_data = [], []
+            self.size, self.action_count = 0, 0
         return ret
 
 
+def _get_tracer(client):
+    """
+    Return the tracer of the client's transport, ``None`` if tracing is
+    disabled.
+    """
+    return getattr(getattr(client, "transport", None), "tracer", None)
+
+
 def _chunk_actions(actions, chunk_size, max_chunk_bytes, serializer):
     """
     Split actions into chunks by number or size, serialize them into strings in
@@ -231,8 +254,14 @@ def _process_bulk_chunk(
     Send a bulk request to elasticsearch and process the output.
     """
     try:
-        # send the actual request
-        resp = client.bulk("\n".join(bulk_actions) + "\n", *args, **kwargs)
+        with start_span(
+            _get_tracer(client),
+            "elasticsearch.helpers.bulk_chunk",
+            {"elasticsearch.bulk.actions": len(bulk_data)},
+        ) as span:
+            # send the actual request
+            resp = client.bulk("\n".join(bulk_actions) + "\n", *args, **kwargs)
+            span.set_attribute("elasticsearch.bulk.errors", resp.get("errors"))
     except TransportError as e:
         gen = _process_bulk_chunk_error(
             error=e,
@@ -399,6 +428,26 @@ def bulk(client, actions, stats_only=False, *args, **kwargs):
     return success, failed if stats_only else errors
 
 
+def _blocking_pool(thread_count, queue_size):
+    """
+    Return a ``ThreadPool`` of ``thread_count`` threads whose ``imap`` stops
+    consuming its input while ``queue_size`` tasks are waiting.
+    """
+    # Avoid importing multiprocessing unless a parallel helper is used
+    # to avoid exceptions on restricted environments like App Engine
+    from multiprocessing.pool import ThreadPool
+
+    class BlockingPool(ThreadPool):
+        def _setup_queues(self):
+            super(BlockingPool, self)._setup_queues()  # type: ignore
+            # The queue must be at least the size of the number of threads to
+            # prevent hanging when inserting sentinel values during teardown.
+            self._inqueue = Queue(max(queue_size, thread_count))
+            self._quick_put = self._inqueue.put
+
+    return BlockingPool(thread_count)
+
+
 def parallel_bulk(
     client,
     actions,
@@ -428,21 +477,8 @@ def parallel_bulk(
     :arg queue_size: size of the task queue between the main thread (producing
         chunks to send) and the processing threads.
     """
-    # Avoid importing multiprocessing unless parallel_bulk is used
-    # to avoid exceptions on restricted environments like App Engine
-    from multiprocessing.pool import ThreadPool
-
     actions = map(expand_action_callback, actions)
-
-    class BlockingPool(ThreadPool):
-        def _setup_queues(self):
-            super(BlockingPool, self)._setup_queues()  # type: ignore
-            # The queue must be at least the size of the number of threads to
-            # prevent hanging when inserting sentinel values during teardown.
-            self._inqueue = Queue(max(queue_size, thread_count))
-            self._quick_put = self._inqueue.put
-
-    pool = BlockingPool(thread_count)
+    pool = _blocking_pool(thread_count, queue_size)
 
     try:
         for result in pool.imap(
@@ -463,6 +499,215 @@ def parallel_bulk(
         pool.join()
 
 
+def _msearch_header(index):
+    return {} if index is None else {"index": index}
+
+
+def _process_msearch_chunk_success(resp):
+    return [("error" not in response, response) for response in resp["responses"]]
+
+
+def _process_msearch_chunk_error(error, count, raise_on_exception=True):
+    if raise_on_exception:
+        raise error
+
+    # mark all the searches in the chunk as failed
+    err_message = str(error)
+    return [
+        (False, {"error": err_message, "status": error.status_code, "exception": error})
+        for _ in range(count)
+    ]
+
+
+def _process_msearch_chunk(client, bulk_actions, count, raise_on_exception, **kwargs):
+    """
+    Send a msearch request to elasticsearch and return ``(ok, response)`` for
+    every search.
+    """
+    try:
+        with start_span(
+            _get_tracer(client),
+            "elasticsearch.helpers.msearch_chunk",
+            {"elasticsearch.msearch.searches": count},
+        ):
+            resp = client.msearch(body=bulk_actions, **kwargs)
+    except TransportError as e:
+        return _process_msearch_chunk_error(e, count, raise_on_exception)
+    return _process_msearch_chunk_success(resp)
+
+
+def _msearch_concurrency(concurrency, max_concurrent_searches, kwargs):
+    """
+    Split ``max_concurrent_searches`` among the ``msearch`` requests sent at
+    once, returning the number of requests to send at once.
+    """
+    if max_concurrent_searches is None:
+        return concurrency
+    concurrency = max(1, min(concurrency, max_concurrent_searches))
+    kwargs["max_concurrent_searches"] = max(1, max_concurrent_searches // concurrency)
+    return concurrency
+
+
+def multi_search(
+    client,
+    searches,
+    chunk_size=100,
+    max_chunk_bytes=10 * 1024 * 1024,
+    thread_count=4,
+    queue_size=4,
+    max_concurrent_searches=None,
+    raise_on_exception=True,
+    **kwargs
+):
+    """
+    Run many searches with the :meth:`~elasticsearch.Elasticsearch.msearch`
+    api and yield ``(ok, response)`` for every search, in the order they were
+    passed in. ``ok`` is ``False`` for searches that failed, the response is
+    then the error returned by elasticsearch::
+
+        searches = ((index, {"query": {"term": {"user": u}}}) for u in users)
+        for ok, response in multi_search(es, searches, thread_count=8):
+            if ok:
+                print(response["hits"]["total"])
+
+    The searches are sent in chunks of ``chunk_size`` searches or
+    ``max_chunk_bytes`` bytes, ``thread_count`` chunks at once.
+
+    :arg client: instance of :class:`~elasticsearch.Elasticsearch` to use
+    :arg searches: iterable of ``(index, body)`` pairs, ``index`` can be a
+        name, a list of names or ``None`` for the default ``index`` passed
+        as a keyword argument
+    :arg chunk_size: number of searches in one ``msearch`` request (default: 100)
+    :arg max_chunk_bytes: the maximum size of the request in bytes (default: 10MB)
+    :arg thread_count: size of the threadpool to use for the ``msearch`` requests
+    :arg queue_size: size of the task queue between the main thread (producing
+        chunks to send) and the processing threads.
+    :arg max_concurrent_searches: maximum number of searches executed at once
+        by elasticsearch, across all the ``msearch`` requests in flight. Caps
+        ``thread_count`` and is split between the requests.
+    :arg raise_on_exception: if ``False`` then don't propagate exceptions from
+        call to ``msearch`` and just report the searches that failed as failed.
+
+    Any additional keyword arguments will be passed to
+    :meth:`~elasticsearch.Elasticsearch.msearch`.
+    """
+    thread_count = _msearch_concurrency(thread_count, max_concurrent_searches, kwargs)
+    chunks = _chunk_actions(
+        ((_msearch_header(index), body) for index, body in searches),
+        chunk_size,
+        max_chunk_bytes,
+        client.transport.serializer,
+    )
+    pool = _blocking_pool(thread_count, queue_size)
+
+    try:
+        for result in pool.imap(
+            lambda chunk: _process_msearch_chunk(
+                client, chunk[1], len(chunk[0]), raise_on_exception, **kwargs
+            ),
+            chunks,
+        ):
+            for item in result:
+                yield item
+
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _split_buffer(buf, pos, max_chunk_bytes):
+    """
+    Split a buffer, like a memory-mapped file, into chunks of whole lines of
+    at most ``max_chunk_bytes`` unless a single line is larger.
+    """
+    size = len(buf)
+    while pos < size:
+        end = pos + max_chunk_bytes
+        if end < size:
+            cut = buf.rfind(b"\n", pos, end)
+            if cut == -1:
+                # a single line larger than max_chunk_bytes
+                cut = buf.find(b"\n", end)
+            end = size if cut == -1 else cut + 1
+        yield buf[pos:end]
+        pos = end
+
+
+def _split_lines(lines, max_chunk_bytes, serializer):
+    """
+    Serialize lines and join them into chunks of at most ``max_chunk_bytes``
+    unless a single line is larger.
+    """
+    chunk, size = [], 0
+    for line in lines:
+        line = _encode_line(serializer, line)
+        if chunk and size + len(line) > max_chunk_bytes:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line)
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _post_data_chunks(data, max_chunk_bytes, serializer):
+    """
+    Split a path, a file object or an iterable of lines into chunks of whole
+    lines of at most ``max_chunk_bytes``. Files are memory-mapped when
+    possible.
+    """
+    if not _is_file(data):
+        for chunk in _split_lines(data, max_chunk_bytes, serializer):
+            yield chunk
+        return
+
+    f, close = _open_file(data)
+    try:
+        mapped = _mmap_file(f)
+        if mapped is None:
+            for chunk in _split_lines(f, max_chunk_bytes, serializer):
+                yield chunk
+            return
+        try:
+            for chunk in _split_buffer(mapped, f.tell(), max_chunk_bytes):
+                yield chunk
+        finally:
+            mapped.close()
+    finally:
+        if close:
+            f.close()
+
+
+def streaming_post_data(
+    client, job_id, data, max_chunk_bytes=10 * 1024 * 1024, **kwargs
+):
+    """
+    Send data of any size to an anomaly detection job with
+    :meth:`~elasticsearch.client.MlClient.post_data`, split into sequential
+    requests of whole lines of at most ``max_chunk_bytes`` each. Yields the
+    response of every request, with the counts of the data processed so far::
+
+        for counts in streaming_post_data(es, "my-job", pathlib.Path("app.log")):
+            print(counts["processed_record_count"])
+
+    Files are memory-mapped when possible and only one chunk is held in
+    memory at a time.
+
+    :arg client: instance of :class:`~elasticsearch.Elasticsearch` to use
+    :arg job_id: the name of the job receiving the data
+    :arg data: a path (``os.PathLike``), a file object or an iterable of
+        lines or documents
+    :arg max_chunk_bytes: the maximum size of a request in bytes (default:
+        10MB), must stay below ``http.max_content_length`` of the cluster.
+        Only a single line larger than that is sent in a larger request.
+
+    Any additional keyword arguments will be passed to
+    :meth:`~elasticsearch.client.MlClient.post_data`.
+    """
+    for chunk in _post_data_chunks(data, max_chunk_bytes, client.transport.serializer):
+        yield client.ml.post_data(job_id, body=chunk, **kwargs)
+
+
 def scan(
     client,
     query=None,
@@ -520,10 +765,21 @@ def scan(
         query = query.copy() if query else {}
         query["sort"] = "_doc"
 
+    tracer = _get_tracer(client)
+    page = 0
+
     # initial search
-    resp = client.search(
-        body=query, scroll=scroll, size=size, request_timeout=request_timeout, **kwargs
-    )
+    with start_span(
+        tracer, "elasticsearch.helpers.scan_page", {"elasticsearch.page": page}
+    ) as span:
+        resp = client.search(
+            body=query,
+            scroll=scroll,
+            size=size,
+            request_timeout=request_timeout,
+            **kwargs
+        )
+        span.set_attribute("elasticsearch.hits", len(resp["hits"]["hits"]))
     scroll_id = resp.get("_scroll_id")
 
     try:
@@ -551,9 +807,14 @@ def scan(
                             resp["_shards"]["total"],
                         ),
                     )
-            resp = client.scroll(
-                body={"scroll_id": scroll_id, "scroll": scroll}, **scroll_kwargs
-            )
+            page += 1
+            with start_span(
+                tracer, "elasticsearch.helpers.scan_page", {"elasticsearch.page": page}
+            ) as span:
+                resp = client.scroll(
+                    body={"scroll_id": scroll_id, "scroll": scroll}, **scroll_kwargs
+                )
+                span.set_attribute("elasticsearch.hits", len(resp["hits"]["hits"]))
             scroll_id = resp.get("_scroll_id")
 
     finally:
@@ -15,7 +15,10 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import os
 from typing import (
+    IO,
+    Iterator,
     Generator,
     Optional,
     Union,
@@ -81,6 +84,51 @@ def parallel_bulk(
     *args: Any,
     **kwargs: Any
 ) -> Generator[Tuple[bool, Any], None, None]: ...
+def _blocking_pool(thread_count: int, queue_size: int) -> Any: ...
+def _msearch_header(index: Optional[Union[str, Collection[str]]]) -> Dict[str, Any]: ...
+def _process_msearch_chunk_success(
+    resp: Mapping[str, Any]
+) -> List[Tuple[bool, Dict[str, Any]]]: ...
+def _process_msearch_chunk_error(
+    error: Exception, count: int, raise_on_exception: bool = ...
+) -> List[Tuple[bool, Dict[str, Any]]]: ...
+def _process_msearch_chunk(
+    client: Elasticsearch,
+    bulk_actions: List[str],
+    count: int,
+    raise_on_exception: bool,
+    **kwargs: Any
+) -> List[Tuple[bool, Dict[str, Any]]]: ...
+def _msearch_concurrency(
+    concurrency: int, max_concurrent_searches: Optional[int], kwargs: Dict[str, Any]
+) -> int: ...
+def multi_search(
+    client: Elasticsearch,
+    searches: Iterable[Tuple[Optional[Union[str, Collection[str]]], Any]],
+    chunk_size: int = ...,
+    max_chunk_bytes: int = ...,
+    thread_count: int = ...,
+    queue_size: int = ...,
+    max_concurrent_searches: Optional[int] = ...,
+    raise_on_exception: bool = ...,
+    **kwargs: Any
+) -> Generator[Tuple[bool, Dict[str, Any]], None, None]: ...
+def _split_buffer(buf: Any, pos: int, max_chunk_bytes: int) -> Iterator[bytes]: ...
+def _split_lines(
+    lines: Iterable[Any], max_chunk_bytes: int, serializer: Serializer
+) -> Iterator[bytes]: ...
+def _post_data_chunks(
+    data: Union["os.PathLike[str]", IO[Any], Iterable[Any]],
+    max_chunk_bytes: int,
+    serializer: Serializer,
+) -> Generator[bytes, None, None]: ...
+def streaming_post_data(
+    client: Elasticsearch,
+    job_id: str,
+    data: Union["os.PathLike[str]", IO[Any], Iterable[Any]],
+    max_chunk_bytes: int = ...,
+    **kwargs: Any
+) -> Generator[Dict[str, Any], None, None]: ...
 def scan(
     client: Elasticsearch,
     query: Optional[Any] = ...,
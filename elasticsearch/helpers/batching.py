@@ -0,0 +1,566 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import logging
+import threading
+import time
+from collections import deque
+
+from ..compat import Full
+from ..exceptions import (
+    HTTP_EXCEPTIONS,
+    NotFoundError,
+    SerializationError,
+    TransportError,
+)
+from .actions import _ActionChunker, _process_bulk_chunk, expand_action
+from .errors import BulkIndexError
+
+logger = logging.getLogger("elasticsearch.helpers")
+
+# parameters of ``get`` that ``mget`` accepts for a whole batch
+BATCHED_GET_PARAMS = frozenset(
+    (
+        "_source",
+        "_source_excludes",
+        "_source_includes",
+        "preference",
+        "realtime",
+        "refresh",
+        "routing",
+        "stored_fields",
+    )
+)
+
+
+def _batch_key(kwargs):
+    """
+    Key of the batch a ``get`` call with ``kwargs`` belongs to, ``None`` if it
+    can't be batched.
+    """
+    key = []
+    for name, value in sorted(kwargs.items()):
+        if name not in BATCHED_GET_PARAMS:
+            return None
+        if isinstance(value, list):
+            value = tuple(value)
+        key.append((name, value))
+    key = tuple(key)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _get_result(doc, serializer):
+    """
+    Turn a document returned by ``mget`` into the return value of ``get``, or
+    the exception ``get`` would have raised.
+    """
+    error = doc.get("error")
+    if error is not None:
+        error_type, status = error, doc.get("status")
+        if isinstance(error, dict):
+            error_type = error.get("type")
+            status = status or error.get("status")
+        if status is None and error_type == "index_not_found_exception":
+            status = 404
+        info = {"error": error}
+        if status is None:
+            status = "N/A"
+        else:
+            info["status"] = status
+        return HTTP_EXCEPTIONS.get(status, TransportError)(status, error_type, info)
+    if not doc.get("found", True):
+        return NotFoundError(404, serializer.dumps(doc), doc)
+    return doc
+
+
+def _get_results(resp, count, serializer):
+    """
+    :func:`_get_result` of every document of an ``mget`` response for
+    ``count`` ids.
+    """
+    docs = resp["docs"]
+    if len(docs) != count:
+        raise SerializationError(
+            "mget returned %d documents for %d ids" % (len(docs), count)
+        )
+    return [_get_result(doc, serializer) for doc in docs]
+
+
+class _PendingGet(object):
+    """ A ``get`` call waiting for its batch to be sent. """
+
+    def __init__(self, index, id):
+        self.index = index
+        self.id = id
+        self.result = None
+        self.error = None
+        self.event = threading.Event()
+
+    def resolve(self, result):
+        if isinstance(result, Exception):
+            self.error = result
+        else:
+            self.result = result
+        self.event.set()
+
+
+class BatchingClient(object):
+    """
+    Sends concurrent ``get`` calls from many threads as a single ``mget``.
+
+    Every :meth:`get` waits up to ``max_wait`` seconds for other calls with the
+    same parameters to join its batch, a batch is sent as soon as it holds
+    ``max_batch_size`` documents. Each call returns its own document or raises
+    the same exception as :meth:`~elasticsearch.Elasticsearch.get` would, like
+    :class:`~elasticsearch.NotFoundError` for missing documents::
+
+        batching = BatchingClient(es, max_wait=0.002)
+
+        def handle_request(user_id):
+            user = batching.get(index="users", id=user_id)
+
+        batching.close()
+
+    :arg client: instance of :class:`~elasticsearch.Elasticsearch` to use
+    :arg max_batch_size: maximum number of documents per ``mget`` request
+    :arg max_wait: maximum number of seconds a call waits for its batch to
+        fill up
+    """
+
+    def __init__(self, client, max_batch_size=100, max_wait=0.005):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # batch key -> (deadline, [pending gets])
+        self._batches = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def get(self, index, id, **kwargs):
+        """
+        Return a document like :meth:`~elasticsearch.Elasticsearch.get`. Calls
+        with parameters ``mget`` doesn't support (like ``version``) are sent
+        on their own right away.
+        """
+        key = _batch_key(kwargs)
+        if key is not None:
+            pending = self._enqueue(key, index, id)
+            if pending is not None:
+                pending.event.wait()
+                if pending.error is not None:
+                    raise pending.error
+                return pending.result
+        return self.client.get(index=index, id=id, **kwargs)
+
+    def _enqueue(self, key, index, id):
+        """
+        Add a ``get`` call to its batch, sending the batch if it is full.
+        Returns ``None`` once the client has been closed.
+        """
+        pending = _PendingGet(index, id)
+        with self._cond:
+            if self._closed:
+                return None
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = self._batches[key] = (time.time() + self.max_wait, [])
+                self._start_flusher()
+                self._cond.notify()
+            batch[1].append(pending)
+            full = len(batch[1]) >= self.max_batch_size
+            if full:
+                del self._batches[key]
+
+        if full:
+            self._send(key, batch[1])
+        return pending
+
+    def _start_flusher(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_flusher)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run_flusher(self):
+        while True:
+            with self._cond:
+                while not self._batches and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._batches:
+                    return
+                now = time.time()
+                due = [
+                    k for k, (deadline, _) in self._batches.items() if deadline <= now
+                ]
+                if not due and not self._closed:
+                    self._cond.wait(
+                        min(deadline for deadline, _ in self._batches.values()) - now
+                    )
+                    continue
+                if self._closed:
+                    due = list(self._batches)
+                batches = [(key, self._batches.pop(key)[1]) for key in due]
+
+            for key, pending in batches:
+                self._send(key, pending)
+
+    def _send(self, key, pending):
+        """
+        Send a batch of ``get`` calls as a single ``mget`` and resolve them.
+        """
+        docs = [{"_index": p.index, "_id": p.id} for p in pending]
+        try:
+            resp = self.client.mget(body={"docs": docs}, **dict(key))
+            results = _get_results(resp, len(pending), self.client.transport.serializer)
+        except Exception as e:
+            # fail every call rather than leave any of them waiting
+            results = [e] * len(pending)
+
+        for p, result in zip(pending, results):
+            p.resolve(result)
+
+    def close(self):
+        """
+        Send the pending batches right away and stop the flusher thread. Any
+        later calls are sent on their own.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def _bulk_item_result(ok, item):
+    """
+    The result of a single bulk action: the item itself or a
+    :class:`~elasticsearch.helpers.BulkIndexError` if it failed.
+    """
+    if ok:
+        return item
+    return BulkIndexError("1 document(s) failed to index.", [item])
+
+
+def _complete_results(results, count, error=None):
+    """
+    The ``(ok, item)`` results of a chunk of ``count`` actions, failing the
+    actions without a result with ``error`` so none of them is left waiting.
+    """
+    results = results[:count]
+    if len(results) < count:
+        if error is None:
+            item = {"error": "No item for the action in the bulk response."}
+        else:
+            item = {"error": str(error), "exception": error}
+        results.extend([(False, item)] * (count - len(results)))
+    return results
+
+
+class BulkFuture(object):
+    """
+    The outcome of an action added to a :class:`BulkIndexer`, available once
+    the chunk containing the action has been sent.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._event = threading.Event()
+        self._ok = None
+        self._item = None
+
+    def done(self):
+        """ Whether the action has been sent yet. """
+        return self._event.is_set()
+
+    def result(self):
+        """
+        Wait for the action to be sent and return its item from the ``bulk``
+        response, like ``{"index": {"_id": "1", "status": 201, ...}}``.
+        Raises :class:`~elasticsearch.helpers.BulkIndexError` if it failed.
+        """
+        self._event.wait()
+        result = _bulk_item_result(self._ok, self._item)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _resolve(self, ok, item):
+        self._ok, self._item = ok, item
+        self._event.set()
+        if self.callback is not None:
+            try:
+                self.callback(ok, item)
+            except Exception:
+                logger.exception("Error in bulk indexer callback")
+
+
+class BulkIndexer(object):
+    """
+    Long-lived indexer batching single actions from any number of threads
+    into ``bulk`` requests, like the ``BulkProcessor`` of the Java client.
+
+    Actions have the same format as for :func:`streaming_bulk`. They are
+    serialized as they are added and sent by a background thread once
+    ``chunk_size`` actions or ``max_chunk_bytes`` are reached, or
+    ``flush_interval`` seconds after the first action of a chunk. Every
+    :meth:`add` returns a :class:`BulkFuture` and calls ``callback(ok,
+    item)`` once its chunk has been sent::
+
+        def on_result(ok, item):
+            if not ok:
+                logger.error("failed to index: %r", item)
+
+        with BulkIndexer(es, flush_interval=0.5, callback=on_result) as indexer:
+            for event in events:
+                indexer.add({"_index": "events", "_source": event})
+
+    At most ``max_pending`` actions are kept in memory until their chunk has
+    been sent, :meth:`add` blocks (or raises ``queue.Full``) beyond that.
+
+    :arg client: instance of :class:`~elasticsearch.Elasticsearch` to use
+    :arg chunk_size: number of docs in one chunk sent to es
+    :arg max_chunk_bytes: the maximum size of the request in bytes
+    :arg flush_interval: maximum number of seconds an action waits for its
+        chunk to fill up
+    :arg max_pending: maximum number of actions added but not sent yet
+    :arg callback: default function called with ``(ok, item)`` for every
+        action once it has been sent
+    :arg expand_action_callback: callback executed on each action passed in,
+        should return a tuple containing the action line and the data line
+        (`None` if data line should be omitted).
+
+    Any additional keyword arguments will be passed to
+    :meth:`~elasticsearch.Elasticsearch.bulk`.
+    """
+
+    def __init__(
+        self,
+        client,
+        chunk_size=500,
+        max_chunk_bytes=10 * 1024 * 1024,
+        flush_interval=1.0,
+        max_pending=10000,
+        callback=None,
+        expand_action_callback=expand_action,
+        **kwargs
+    ):
+        self.client = client
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.callback = callback
+        self.expand_action_callback = expand_action_callback
+        self.kwargs = kwargs
+
+        self._chunker = _ActionChunker(
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            serializer=client.transport.serializer,
+        )
+        # futures of the actions in the chunker and the time of the first one
+        self._futures = []
+        self._chunk_started = None
+        # chunks waiting to be sent as (bulk_data, bulk_actions, futures)
+        self._ready = deque()
+        self._added = 0
+        self._sent = 0
+        self._failed = 0
+        self._chunks = 0
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def add(self, action, callback=None, block=True, timeout=None):
+        """
+        Add an action, returning its :class:`BulkFuture`.
+
+        :arg action: the action or document, see :func:`streaming_bulk`
+        :arg callback: called with ``(ok, item)`` once the action has been
+            sent instead of the indexer's ``callback``
+        :arg block: wait for room when ``max_pending`` actions are pending,
+            raise ``queue.Full`` right away if ``False``
+        :arg timeout: maximum number of seconds to wait for room before
+            raising ``queue.Full``
+        """
+        action, data = self.expand_action_callback(action)
+        # serialize outside of the lock so concurrent adds don't wait on it
+        serialized = self._chunker.serialize(action, data)
+        future = BulkFuture(callback or self.callback)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The BulkIndexer has been closed.")
+            if self._added - self._sent - self._failed >= self.max_pending:
+                if not block:
+                    raise Full
+                deadline = None if timeout is None else time.time() + timeout
+                while self._added - self._sent - self._failed >= self.max_pending:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise Full
+                    self._cond.wait(remaining)
+
+            ret = self._chunker.feed_serialized(action, data, *serialized)
+            if ret:
+                self._ready.append(ret + (self._futures,))
+                self._futures = []
+            if not self._futures:
+                self._chunk_started = time.time()
+            self._futures.append(future)
+            self._added += 1
+            if self._chunker.action_count >= self.chunk_size:
+                self._end_chunk()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify_all()
+        return future
+
+    def index(self, index, document, id=None, **kwargs):
+        """ Add an ``index`` action for ``document``, see :meth:`add`. """
+        action = dict(kwargs, _index=index, _source=document)
+        if id is not None:
+            action["_id"] = id
+        return self.add(action)
+
+    def update(self, index, id, body):
+        """ Add an ``update`` action with ``body`` (like ``{"doc": {...}}``). """
+        return self.add(dict(body, _op_type="update", _index=index, _id=id))
+
+    def delete(self, index, id):
+        """ Add a ``delete`` action, see :meth:`add`. """
+        return self.add({"_op_type": "delete", "_index": index, "_id": id})
+
+    def _end_chunk(self):
+        # called with the lock held
+        ret = self._chunker.flush()
+        if ret:
+            self._ready.append(ret + (self._futures,))
+            self._futures = []
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    if self._futures and (
+                        self._closed
+                        or time.time() >= self._chunk_started + self.flush_interval
+                    ):
+                        self._end_chunk()
+                    elif self._closed:
+                        return
+                    else:
+                        self._cond.wait(
+                            self._chunk_started + self.flush_interval - time.time()
+                            if self._futures
+                            else None
+                        )
+                bulk_data, bulk_actions, futures = self._ready.popleft()
+
+            self._send(bulk_data, bulk_actions, futures)
+
+    def _send(self, bulk_data, bulk_actions, futures):
+        results = []
+        error = None
+        try:
+            for result in _process_bulk_chunk(
+                self.client,
+                bulk_actions,
+                bulk_data,
+                raise_on_exception=False,
+                raise_on_error=False,
+                **self.kwargs
+            ):
+                results.append(result)
+        except Exception as e:
+            # not a TransportError, fail the remaining actions with it
+            logger.exception("Failed to send bulk request")
+            error = e
+        results = _complete_results(results, len(futures), error)
+
+        failed = sum(1 for ok, _ in results if not ok)
+        with self._cond:
+            self._chunks += 1
+            self._sent += len(results) - failed
+            self._failed += failed
+            self._cond.notify_all()
+        for future, (ok, item) in zip(futures, results):
+            future._resolve(ok, item)
+
+    def flush(self, timeout=None):
+        """
+        Send all the actions added so far and wait for them. Returns ``False``
+        if they weren't all sent within ``timeout`` seconds.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            target = self._added
+            self._end_chunk()
+            self._cond.notify_all()
+            while self._sent + self._failed < target:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self):
+        """
+        Send all pending actions and stop the background thread. No actions
+        can be added afterwards.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def stats(self):
+        """
+        Return a dict with the number of ``pending``, ``sent`` and ``failed``
+        actions and the number of ``chunks`` sent so far.
+        """
+        with self._cond:
+            return {
+                "pending": self._added - self._sent - self._failed,
+                "sent": self._sent,
+                "failed": self._failed,
+                "chunks": self._chunks,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
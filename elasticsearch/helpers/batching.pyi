@@ -0,0 +1,132 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import logging
+import threading
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+from ..client import Elasticsearch
+from ..serializer import Serializer
+
+logger: logging.Logger
+
+BATCHED_GET_PARAMS: FrozenSet[str]
+
+def _batch_key(kwargs: Mapping[str, Any]) -> Optional[Tuple[Tuple[str, Any], ...]]: ...
+def _get_result(doc: Mapping[str, Any], serializer: Serializer) -> Any: ...
+def _get_results(
+    resp: Mapping[str, Any], count: int, serializer: Serializer
+) -> List[Any]: ...
+
+class _PendingGet(object):
+    index: Any
+    id: Any
+    result: Any
+    error: Optional[Exception]
+    event: threading.Event
+    def __init__(self, index: Any, id: Any) -> None: ...
+    def resolve(self, result: Union[Exception, Any]) -> None: ...
+
+class BatchingClient(object):
+    client: Elasticsearch
+    max_batch_size: int
+    max_wait: float
+    def __init__(
+        self, client: Elasticsearch, max_batch_size: int = ..., max_wait: float = ...
+    ) -> None: ...
+    def get(self, index: Any, id: Any, **kwargs: Any) -> Any: ...
+    def _enqueue(
+        self, key: Tuple[Tuple[str, Any], ...], index: Any, id: Any
+    ) -> Optional[_PendingGet]: ...
+    def _start_flusher(self) -> None: ...
+    def _run_flusher(self) -> None: ...
+    def _send(
+        self, key: Tuple[Tuple[str, Any], ...], pending: List[_PendingGet]
+    ) -> None: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> "BatchingClient": ...
+    def __exit__(self, *_: Any) -> None: ...
+
+def _bulk_item_result(ok: bool, item: Dict[str, Any]) -> Any: ...
+def _complete_results(
+    results: List[Tuple[bool, Dict[str, Any]]],
+    count: int,
+    error: Optional[Exception] = ...,
+) -> List[Tuple[bool, Dict[str, Any]]]: ...
+
+class BulkFuture(object):
+    callback: Optional[Callable[[bool, Dict[str, Any]], Any]]
+    def __init__(
+        self, callback: Optional[Callable[[bool, Dict[str, Any]], Any]] = ...
+    ) -> None: ...
+    def done(self) -> bool: ...
+    def result(self) -> Dict[str, Any]: ...
+    def _resolve(self, ok: bool, item: Dict[str, Any]) -> None: ...
+
+class BulkIndexer(object):
+    client: Elasticsearch
+    chunk_size: int
+    flush_interval: float
+    max_pending: int
+    callback: Optional[Callable[[bool, Dict[str, Any]], Any]]
+    expand_action_callback: Callable[[Any], Tuple[Dict[str, Any], Optional[Any]]]
+    kwargs: Any
+    def __init__(
+        self,
+        client: Elasticsearch,
+        chunk_size: int = ...,
+        max_chunk_bytes: int = ...,
+        flush_interval: float = ...,
+        max_pending: int = ...,
+        callback: Optional[Callable[[bool, Dict[str, Any]], Any]] = ...,
+        expand_action_callback: Callable[
+            [Any], Tuple[Dict[str, Any], Optional[Any]]
+        ] = ...,
+        **kwargs: Any
+    ) -> None: ...
+    def add(
+        self,
+        action: Any,
+        callback: Optional[Callable[[bool, Dict[str, Any]], Any]] = ...,
+        block: bool = ...,
+        timeout: Optional[float] = ...,
+    ) -> BulkFuture: ...
+    def index(
+        self, index: Any, document: Any, id: Optional[Any] = ..., **kwargs: Any
+    ) -> BulkFuture: ...
+    def update(self, index: Any, id: Any, body: Mapping[str, Any]) -> BulkFuture: ...
+    def delete(self, index: Any, id: Any) -> BulkFuture: ...
+    def _end_chunk(self) -> None: ...
+    def _run(self) -> None: ...
+    def _send(
+        self, bulk_data: List[Any], bulk_actions: List[str], futures: List[BulkFuture]
+    ) -> None: ...
+    def flush(self, timeout: Optional[float] = ...) -> bool: ...
+    def close(self) -> None: ...
+    def stats(self) -> Dict[str, int]: ...
+    def __enter__(self) -> "BulkIndexer": ...
+    def __exit__(self, *_: Any) -> None: ...
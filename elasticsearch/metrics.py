@@ -0,0 +1,364 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import threading
+from bisect import bisect_left
+
+# key under which ``query_params`` passes the name of the API endpoint to
+# the transport when metrics are enabled, it's never sent to Elasticsearch.
+ENDPOINT_PARAM = "__elasticsearch_endpoint"
+
+# default upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram(object):
+    """
+    Histogram of durations in seconds over fixed buckets. Observations above
+    the last bucket are only counted in the implicit ``+Inf`` bucket.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """
+        Estimate the ``q`` quantile (between 0 and 1) as the upper bound of
+        the bucket it falls in, ``max`` for the ``+Inf`` bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            cumulative.append((bound, seen))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": cumulative,
+        }
+
+
+class Metrics(object):
+    """
+    Collects metrics of the requests performed by a
+    :class:`~elasticsearch.Transport` when passed to it as ``metrics``:
+
+    * for every API endpoint (like ``search`` or ``indices.create``): a
+      latency histogram of the calls including retries, the number of calls,
+      errors and retries and the bytes sent and received.
+    * for every node: a latency histogram of the requests sent to it, the
+      number of requests and errors and how often it was marked dead.
+    * latency histograms of sniffing, serializing request bodies and
+      deserializing responses.
+
+    Requests performed through ``transport.perform_request`` directly are
+    recorded under the ``other`` endpoint. A transport without metrics
+    doesn't measure anything.
+
+    Use :meth:`snapshot` to inspect the metrics or export them with
+    :meth:`to_prometheus` and :meth:`to_statsd`. The object is thread-safe and
+    can be shared between several transports.
+
+    :arg buckets: upper bounds of the histogram buckets in seconds
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all the collected metrics.
+        """
+        with self._lock:
+            self._endpoints = {}
+            self._nodes = {}
+            self._sniff = Histogram(self.buckets)
+            self._serialize = Histogram(self.buckets)
+            self._deserialize = Histogram(self.buckets)
+
+    def _endpoint(self, endpoint):
+        try:
+            return self._endpoints[endpoint]
+        except KeyError:
+            stats = self._endpoints[endpoint] = {
+                "duration": Histogram(self.buckets),
+                "requests": 0,
+                "errors": 0,
+                "retries": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+            }
+            return stats
+
+    def _node(self, node):
+        try:
+            return self._nodes[node]
+        except KeyError:
+            stats = self._nodes[node] = {
+                "duration": Histogram(self.buckets),
+                "requests": 0,
+                "errors": 0,
+                "dead": 0,
+            }
+            return stats
+
+    def record_request(
+        self, endpoint, duration, bytes_sent=0, bytes_received=0, error=False
+    ):
+        """
+        Record a call to an API endpoint, including all its retries.
+        """
+        with self._lock:
+            stats = self._endpoint(endpoint or "other")
+            stats["duration"].observe(duration)
+            stats["requests"] += 1
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            if error:
+                stats["errors"] += 1
+
+    def record_node_request(self, node, duration, error=False):
+        """
+        Record a single request sent to a node.
+        """
+        with self._lock:
+            stats = self._node(node)
+            stats["duration"].observe(duration)
+            stats["requests"] += 1
+            if error:
+                stats["errors"] += 1
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint or "other")["retries"] += 1
+
+    def record_dead(self, node):
+        with self._lock:
+            self._node(node)["dead"] += 1
+
+    def record_sniff(self, duration):
+        with self._lock:
+            self._sniff.observe(duration)
+
+    def record_serialize(self, duration):
+        with self._lock:
+            self._serialize.observe(duration)
+
+    def record_deserialize(self, duration):
+        with self._lock:
+            self._deserialize.observe(duration)
+
+    def snapshot(self):
+        """
+        Return a dictionary with all the collected metrics, histograms are
+        represented by their count, sum, max, estimated percentiles and
+        cumulative ``(upper bound, count)`` buckets.
+        """
+
+        def _snapshot(stats):
+            stats = dict(stats)
+            stats["duration"] = stats["duration"].snapshot()
+            return stats
+
+        with self._lock:
+            return {
+                "endpoints": dict(
+                    (name, _snapshot(s)) for name, s in self._endpoints.items()
+                ),
+                "nodes": dict((node, _snapshot(s)) for node, s in self._nodes.items()),
+                "sniff": self._sniff.snapshot(),
+                "serialize": self._serialize.snapshot(),
+                "deserialize": self._deserialize.snapshot(),
+            }
+
+    def to_prometheus(self, prefix="elasticsearch_client"):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def _labels(labels):
+            return ",".join(
+                '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                for k, v in labels
+            )
+
+        def _header(name, kind, help):
+            lines.append("# HELP %s_%s %s" % (prefix, name, help))
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+
+        def _histogram(name, help, histograms):
+            _header(name, "histogram", help)
+            for labels, histogram in histograms:
+                for bound, count in histogram["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        "%s_%s_bucket{%s} %d"
+                        % (prefix, name, _labels(labels + [("le", le)]), count)
+                    )
+                label_str = "{%s}" % _labels(labels) if labels else ""
+                lines.append(
+                    "%s_%s_sum%s %r" % (prefix, name, label_str, histogram["sum"])
+                )
+                lines.append(
+                    "%s_%s_count%s %d" % (prefix, name, label_str, histogram["count"])
+                )
+
+        def _counter(name, help, label, stats, key):
+            _header(name, "counter", help)
+            for value in sorted(stats):
+                lines.append(
+                    "%s_%s{%s} %d"
+                    % (prefix, name, _labels([(label, value)]), stats[value][key])
+                )
+
+        endpoints, nodes = snapshot["endpoints"], snapshot["nodes"]
+        _histogram(
+            "request_duration_seconds",
+            "Duration of API calls including retries.",
+            [([("endpoint", e)], endpoints[e]["duration"]) for e in sorted(endpoints)],
+        )
+        _counter("requests_total", "API calls.", "endpoint", endpoints, "requests")
+        _counter(
+            "request_errors_total", "Failed API calls.", "endpoint", endpoints, "errors"
+        )
+        _counter("retries_total", "Retried requests.", "endpoint", endpoints, "retries")
+        _counter(
+            "sent_bytes_total",
+            "Bytes of request bodies sent.",
+            "endpoint",
+            endpoints,
+            "bytes_sent",
+        )
+        _counter(
+            "received_bytes_total",
+            "Bytes of response bodies received.",
+            "endpoint",
+            endpoints,
+            "bytes_received",
+        )
+        _histogram(
+            "node_request_duration_seconds",
+            "Duration of requests sent to a node.",
+            [([("node", n)], nodes[n]["duration"]) for n in sorted(nodes)],
+        )
+        _counter(
+            "node_requests_total", "Requests sent to a node.", "node", nodes, "requests"
+        )
+        _counter(
+            "node_errors_total", "Failed requests to a node.", "node", nodes, "errors"
+        )
+        _counter(
+            "node_marked_dead_total",
+            "Times a node was marked dead.",
+            "node",
+            nodes,
+            "dead",
+        )
+        for name, help in (
+            ("sniff", "Duration of sniffing the cluster's nodes."),
+            ("serialize", "Duration of serializing request bodies."),
+            ("deserialize", "Duration of deserializing responses."),
+        ):
+            _histogram("%s_duration_seconds" % name, help, [([], snapshot[name])])
+        return "\n".join(lines) + "\n"
+
+    def to_statsd(self, prefix="elasticsearch"):
+        """
+        Render the metrics as StatsD gauges, one ``name:value|g`` line per
+        metric. Counters are cumulative, durations are reported in
+        milliseconds as their count, mean, p50, p90, p99 and max.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def _name(value):
+            return "".join(c if c.isalnum() or c in "-_" else "_" for c in value)
+
+        def _histogram(name, histogram):
+            lines.append("%s.count:%d|g" % (name, histogram["count"]))
+            mean = histogram["sum"] / histogram["count"] if histogram["count"] else 0
+            for stat, value in (
+                ("mean", mean),
+                ("p50", histogram["p50"]),
+                ("p90", histogram["p90"]),
+                ("p99", histogram["p99"]),
+                ("max", histogram["max"]),
+            ):
+                lines.append("%s.%s:%.3f|g" % (name, stat, value * 1000))
+
+        for kind, groups in (
+            ("endpoint", snapshot["endpoints"]),
+            ("node", snapshot["nodes"]),
+        ):
+            for group in sorted(groups):
+                name = "%s.%s.%s" % (prefix, kind, _name(group))
+                for key, value in sorted(groups[group].items()):
+                    if key == "duration":
+                        _histogram("%s.duration" % name, value)
+                    else:
+                        lines.append("%s.%s:%d|g" % (name, key, value))
+        for name in ("sniff", "serialize", "deserialize"):
+            _histogram("%s.%s.duration" % (prefix, name), snapshot[name])
+        return lines
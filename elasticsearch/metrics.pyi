@@ -0,0 +1,58 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ENDPOINT_PARAM: str
+DEFAULT_BUCKETS: Tuple[float, ...]
+
+class Histogram(object):
+    buckets: Tuple[float, ...]
+    counts: List[int]
+    count: int
+    sum: float
+    max: float
+    def __init__(self, buckets: Tuple[float, ...] = ...) -> None: ...
+    def observe(self, value: float) -> None: ...
+    def percentile(self, q: float) -> float: ...
+    def snapshot(self) -> Dict[str, Any]: ...
+
+class Metrics(object):
+    buckets: Tuple[float, ...]
+    _lock: threading.Lock
+    def __init__(self, buckets: Sequence[float] = ...) -> None: ...
+    def reset(self) -> None: ...
+    def record_request(
+        self,
+        endpoint: Optional[str],
+        duration: float,
+        bytes_sent: int = ...,
+        bytes_received: int = ...,
+        error: bool = ...,
+    ) -> None: ...
+    def record_node_request(
+        self, node: str, duration: float, error: bool = ...
+    ) -> None: ...
+    def record_retry(self, endpoint: Optional[str]) -> None: ...
+    def record_dead(self, node: str) -> None: ...
+    def record_sniff(self, duration: float) -> None: ...
+    def record_serialize(self, duration: float) -> None: ...
+    def record_deserialize(self, duration: float) -> None: ...
+    def snapshot(self) -> Dict[str, Any]: ...
+    def to_prometheus(self, prefix: str = ...) -> str: ...
+    def to_statsd(self, prefix: str = ...) -> List[str]: ...
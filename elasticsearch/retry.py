@@ -0,0 +1,238 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger("elasticsearch")
+
+
+class RetryBudget(object):
+    """
+    Limits the number of retries a :class:`~elasticsearch.Transport` performs
+    to a fraction of the requests it has seen over a sliding window.
+
+    Without a budget every failing request is retried up to ``max_retries``
+    times, so during a partial outage the load on the cluster multiplies
+    exactly when it can least afford it. With a budget of ``ratio=0.1`` at most
+    one retry is allowed for every ten requests (plus ``min_retries`` per
+    window so that low-traffic clients can still retry).
+
+    The budget is thread-safe and can be shared between several transports.
+
+    :arg ratio: fraction of requests that may be retried within the window
+    :arg window: length of the sliding window in seconds
+    :arg min_retries: number of retries always allowed within the window
+        regardless of the request volume
+    """
+
+    def __init__(self, ratio=0.1, window=10, min_retries=10):
+        self.ratio = ratio
+        self.window = window
+        self.min_retries = min_retries
+
+        # buckets of [second, requests, retries], oldest first
+        self._buckets = deque()
+        self._requests = 0
+        self._retries = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, now):
+        second = int(now)
+        horizon = second - self.window
+        while self._buckets and self._buckets[0][0] <= horizon:
+            _, requests, retries = self._buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self, now=None):
+        """
+        Register a new (non-retry) request with the budget.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._bucket(now)[1] += 1
+            self._requests += 1
+
+    def acquire_retry(self, now=None):
+        """
+        Try to withdraw a single retry from the budget. Returns ``True`` if the
+        retry is allowed, ``False`` if the budget has been exhausted.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            bucket = self._bucket(now)
+            if self._retries >= self.min_retries + self.ratio * self._requests:
+                self._rejected += 1
+                return False
+            bucket[2] += 1
+            self._retries += 1
+            return True
+
+    def stats(self, now=None):
+        """
+        Return a dictionary describing the current state of the budget.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._bucket(now)
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "rejected": self._rejected,
+                "available": max(
+                    0,
+                    int(self.min_retries + self.ratio * self._requests) - self._retries,
+                ),
+            }
+
+
+class CircuitBreaker(object):
+    """
+    Per-connection circuit breaker used by :class:`~elasticsearch.Transport`
+    when ``circuit_breaker_class`` is set.
+
+    The breaker starts ``closed`` and lets all requests through. After
+    ``failure_threshold`` consecutive failures it opens and rejects all
+    requests for ``recovery_timeout`` seconds. After that it becomes
+    ``half_open`` and lets up to ``half_open_max_calls`` probe requests
+    through at a time; a successful probe closes the breaker again, a failed
+    one re-opens it.
+
+    :arg failure_threshold: number of consecutive failures that open the breaker
+    :arg recovery_timeout: number of seconds the breaker stays open before
+        allowing probe requests
+    :arg half_open_max_calls: number of concurrent probe requests allowed while
+        the breaker is half-open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probes = 0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _current_state(self, now):
+        if self._state == self.OPEN and now >= self._opened_at + self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def state(self, now=None):
+        """
+        Return the current state: ``"closed"``, ``"open"`` or ``"half_open"``.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return self._current_state(now)
+
+    def allow_request(self, now=None):
+        """
+        Return ``True`` if a request may be sent through this breaker. In the
+        half-open state this reserves one of the probe slots.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        """
+        Register a successful request, closing the breaker.
+        """
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit breaker %r closed.", self)
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def release(self):
+        """
+        Give back the probe slot reserved by :meth:`allow_request` for a
+        request that ended without a response, like one failing with an
+        unexpected exception or being cancelled.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self, now=None):
+        """
+        Register a failed request, opening the breaker if the failure threshold
+        has been reached or if a probe request failed.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._failures += 1
+            state = self._current_state(now)
+            if state == self.HALF_OPEN or (
+                state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = now
+                self._probes = 0
+                self._times_opened += 1
+                logger.warning(
+                    "Circuit breaker %r opened after %i consecutive failures.",
+                    self,
+                    self._failures,
+                )
+
+    def stats(self, now=None):
+        """
+        Return a dictionary describing the current state of the breaker.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return {
+                "state": self._current_state(now),
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+            }
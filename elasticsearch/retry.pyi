@@ -0,0 +1,52 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import logging
+from typing import Any, Dict, Optional, Union
+
+logger: logging.Logger
+
+class RetryBudget(object):
+    ratio: float
+    window: int
+    min_retries: int
+    def __init__(
+        self, ratio: float = ..., window: int = ..., min_retries: int = ...
+    ) -> None: ...
+    def record_request(self, now: Optional[float] = ...) -> None: ...
+    def acquire_retry(self, now: Optional[float] = ...) -> bool: ...
+    def stats(self, now: Optional[float] = ...) -> Dict[str, int]: ...
+
+class CircuitBreaker(object):
+    CLOSED: str
+    OPEN: str
+    HALF_OPEN: str
+    failure_threshold: int
+    recovery_timeout: float
+    half_open_max_calls: int
+    def __init__(
+        self,
+        failure_threshold: int = ...,
+        recovery_timeout: float = ...,
+        half_open_max_calls: int = ...,
+    ) -> None: ...
+    def state(self, now: Optional[float] = ...) -> str: ...
+    def allow_request(self, now: Optional[float] = ...) -> bool: ...
+    def record_success(self) -> None: ...
+    def release(self) -> None: ...
+    def record_failure(self, now: Optional[float] = ...) -> None: ...
+    def stats(self, now: Optional[float] = ...) -> Dict[str, Union[str, int]]: ...
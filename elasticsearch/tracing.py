@@ -0,0 +1,135 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+from .exceptions import ImproperlyConfigured
+
+try:
+    from opentelemetry import trace as otel_trace
+
+    OPENTELEMETRY_AVAILABLE = True
+except ImportError:
+    OPENTELEMETRY_AVAILABLE = False
+
+
+class Span(object):
+    """
+    A span covering one step of a request, used as a context manager. The
+    base class does nothing, exceptions raised within the span are propagated
+    untouched.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = Span()
+
+
+class Tracer(object):
+    """
+    Creates the spans of the requests performed by a
+    :class:`~elasticsearch.Transport` when passed to it as ``tracer``. The
+    following spans are started:
+
+    * ``elasticsearch.query_params`` while an API method processes its
+      arguments
+    * one span per API call named after the endpoint (like ``search`` or
+      ``indices.create``, the HTTP method for ``perform_request`` called
+      directly) containing:
+
+      * ``elasticsearch.serialize`` while serializing the body
+      * ``elasticsearch.checkout`` while selecting a connection
+      * ``elasticsearch.request`` for every attempt sent to a node, retries
+        included
+      * ``elasticsearch.deserialize`` while deserializing the response
+
+    * ``elasticsearch.helpers.bulk_chunk`` for every chunk sent by
+      :func:`~elasticsearch.helpers.streaming_bulk` and
+      ``elasticsearch.helpers.scan_page`` for every page fetched by
+      :func:`~elasticsearch.helpers.scan` (and their async variants)
+
+    The default implementation doesn't record anything, subclasses override
+    :meth:`start_span` to return their own :class:`Span`.
+    """
+
+    def start_span(self, name, attributes=None):
+        """
+        Return a new :class:`Span` which starts once entered.
+
+        :arg name: name of the span
+        :arg attributes: optional dict of attributes of the span
+        """
+        return NOOP_SPAN
+
+
+def start_span(tracer, name, attributes=None):
+    """
+    Start a span with ``tracer`` or return a no-op span if it's ``None``.
+    """
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start_span(name, attributes)
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, context):
+        self._context = context
+        self._span = None
+
+    def __enter__(self):
+        self._span = self._context.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._context.__exit__(exc_type, exc_value, traceback)
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self._span.set_attribute(key, value)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    :class:`Tracer` reporting the spans to OpenTelemetry. Spans are started as
+    the current span so they nest under the caller's span, exceptions are
+    recorded and mark the span as failed. Requires the ``opentelemetry-api``
+    package.
+
+    :arg tracer: OpenTelemetry tracer to use, defaults to
+        ``opentelemetry.trace.get_tracer("elasticsearch-py")``
+    """
+
+    def __init__(self, tracer=None):
+        if not OPENTELEMETRY_AVAILABLE:
+            raise ImproperlyConfigured(
+                "Please install opentelemetry-api to use OpenTelemetryTracer."
+            )
+        self.tracer = tracer or otel_trace.get_tracer("elasticsearch-py")
+
+    def start_span(self, name, attributes=None):
+        if attributes:
+            attributes = dict((k, v) for k, v in attributes.items() if v is not None)
+        return _OpenTelemetrySpan(
+            self.tracer.start_as_current_span(name, attributes=attributes)
+        )
@@ -0,0 +1,51 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+from types import TracebackType
+from typing import Any, ContextManager, Mapping, Optional, Type
+
+OPENTELEMETRY_AVAILABLE: bool
+
+class Span(object):
+    def __enter__(self) -> "Span": ...
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> bool: ...
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+NOOP_SPAN: Span
+
+class Tracer(object):
+    def start_span(
+        self, name: str, attributes: Optional[Mapping[str, Any]] = ...
+    ) -> Span: ...
+
+def start_span(
+    tracer: Optional[Tracer], name: str, attributes: Optional[Mapping[str, Any]] = ...
+) -> Span: ...
+
+class _OpenTelemetrySpan(Span):
+    _context: ContextManager[Any]
+    _span: Any
+    def __init__(self, context: ContextManager[Any]) -> None: ...
+
+class OpenTelemetryTracer(Tracer):
+    tracer: Any
+    def __init__(self, tracer: Optional[Any] = ...) -> None: ...
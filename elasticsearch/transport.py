@@ -15,12 +15,21 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import re
 import time
+import logging
+import threading
+from collections import deque
 from itertools import chain
 
 from .connection import Urllib3HttpConnection
+from .connection.base import _StreamingBody
 from .connection_pool import ConnectionPool, DummyConnectionPool, EmptyConnectionPool
 from .serializer import JSONSerializer, Deserializer, DEFAULT_SERIALIZERS
+from .compat import Queue
+from .cache import ResponseCache, _SingleFlight
+from .metrics import ENDPOINT_PARAM
+from .tracing import start_span
 from .exceptions import (
     ConnectionError,
     TransportError,
@@ -28,6 +37,37 @@ from .exceptions import (
     ConnectionTimeout,
 )
 
+logger = logging.getLogger("elasticsearch")
+
+# read-only APIs that are sent with POST, to coalesce with ``coalesce_requests``
+COALESCE_POST_PATHS = (
+    "/_search",
+    "/_count",
+    "/_mget",
+    "/_msearch",
+    "/_field_caps",
+    "/_search/template",
+    "/_msearch/template",
+)
+
+# read-only APIs that are sent with GET, other than getting a document
+COALESCE_GET_PATHS = COALESCE_POST_PATHS + (
+    "/_mapping",
+    "/_settings",
+    "/_stats",
+    "/_cluster/health",
+    "/_cluster/state",
+)
+_DOCUMENT_PATH = re.compile(r"^/[^/]+/(?:_doc|_source)/[^/]+\Z").match
+
+# query parameters, and their values, that tie a request to state kept by the
+# cluster or opt out of sharing results, these requests are never coalesced
+STATEFUL_PARAMS = {
+    "scroll": None,
+    "search_type": ("scan",),
+    "request_cache": ("false",),
+}
+
 
 def get_host_info(node_info, host):
     """
@@ -49,6 +89,35 @@ def get_host_info(node_info, host):
     return host
 
 
+def _host_key(host):
+    """
+    Hashable key identifying a host's connection options. Options that can't
+    be hashed fall back to their ``repr``.
+    """
+    try:
+        return frozenset(host.items())
+    except TypeError:
+        return repr(sorted(host.items(), key=lambda item: item[0]))
+
+
+def _body_size(body):
+    """
+    Size of a request body in bytes, as far as it has been sent for a
+    streamed body.
+    """
+    if isinstance(body, _StreamingBody):
+        return body.size
+    return len(body) if body else 0
+
+
+def _is_sent_stream(body):
+    """
+    Whether ``body`` is a streamed body that has (at least partly) been sent
+    and so can't be sent again to retry the request.
+    """
+    return isinstance(body, _StreamingBody) and body.started
+
+
 class Transport(object):
     """
     Encapsulation of transport-related to logic. Handles instantiation of the
@@ -59,6 +128,9 @@ class Transport(object):
 
     DEFAULT_CONNECTION_CLASS = Urllib3HttpConnection
 
+    #: maximum number of threads sending sniff requests in parallel
+    SNIFF_MAX_WORKERS = 8
+
     def __init__(
         self,
         hosts,
@@ -76,6 +148,12 @@ class Transport(object):
         retry_on_status=(502, 503, 504),
         retry_on_timeout=False,
         send_get_body_as="GET",
+        retry_budget=None,
+        circuit_breaker_class=None,
+        metrics=None,
+        tracer=None,
+        response_cache=None,
+        coalesce_requests=False,
         **kwargs
     ):
         """
@@ -88,8 +166,11 @@ class Transport(object):
             producing a list of arguments (same as `hosts` parameter)
         :arg sniff_on_start: flag indicating whether to obtain a list of nodes
             from the cluster at startup time
-        :arg sniffer_timeout: number of seconds between automatic sniffs
-        :arg sniff_on_connection_fail: flag controlling if connection failure triggers a sniff
+        :arg sniffer_timeout: number of seconds between automatic sniffs, the
+            sniff runs in a background thread while requests keep using the
+            current connection pool
+        :arg sniff_on_connection_fail: flag controlling if connection failure
+            triggers a sniff in a background thread
         :arg sniff_timeout: timeout used for the sniff request - it should be a
             fast api call and we are talking potentially to more nodes so we want
             to fail quickly. Not used during initial sniffing (if
@@ -110,6 +191,28 @@ class Transport(object):
             don't support passing bodies with GET requests. If you set this to
             'POST' a POST method will be used instead, if to 'source' then the body
             will be serialized and passed as a query parameter `source`.
+        :arg retry_budget: optional :class:`~elasticsearch.RetryBudget`
+            instance limiting the number of retries to a fraction of the
+            requests over a sliding window. Can be shared between transports.
+        :arg circuit_breaker_class: optional
+            :class:`~elasticsearch.CircuitBreaker` subclass (or any callable
+            returning one) to instantiate for every connection. Connections
+            whose breaker is open are skipped when selecting a connection.
+        :arg metrics: optional :class:`~elasticsearch.Metrics` instance
+            recording latency histograms and counters of the API calls, nodes,
+            sniffing and (de)serialization. Can be shared between transports.
+        :arg tracer: optional :class:`~elasticsearch.Tracer` (like
+            :class:`~elasticsearch.OpenTelemetryTracer`) creating spans for
+            the API calls, their attempts and (de)serialization.
+        :arg response_cache: optional :class:`~elasticsearch.ResponseCache`
+            storing the responses of the API calls given a ``cache_ttl``. Can
+            be shared between transports talking to the same cluster.
+        :arg coalesce_requests: send concurrent identical read requests
+            (``HEAD`` requests, getting documents, searches, counts, multi
+            gets, mappings, settings and stats) only once, the other callers
+            wait for the response and get their own copy of it. Scrolls and
+            searches of a point in time or with ``request_cache=false`` are
+            always sent.
 
         Any extra keyword arguments will be passed to the `connection_class`
         when creating and instance unless overridden by that connection's
@@ -132,6 +235,21 @@ class Transport(object):
         self.retry_on_timeout = retry_on_timeout
         self.retry_on_status = retry_on_status
         self.send_get_body_as = send_get_body_as
+        self.retry_budget = retry_budget
+        self.metrics = metrics
+        self.tracer = tracer
+        self.response_cache = response_cache
+        self.coalesce_requests = coalesce_requests
+        self._single_flight = _SingleFlight()
+
+        # circuit breakers, created lazily for each connection
+        self.circuit_breaker_class = circuit_breaker_class
+        self.circuit_breakers = {}
+
+        # number of in-flight requests and connections to close once idle
+        self._in_flight = 0
+        self._close_pending = []
+        self._in_flight_cond = threading.Condition()
 
         # data serializer
         self.serializer = serializer
@@ -169,6 +287,10 @@ class Transport(object):
         self.last_sniff = time.time()
         self.sniff_timeout = sniff_timeout
 
+        # only one background sniff at a time
+        self.sniffing_thread = None
+        self._sniff_lock = threading.Lock()
+
         # callback to construct host dict from data in /_cluster/nodes
         self.host_info_callback = host_info_callback
 
@@ -190,17 +312,23 @@ class Transport(object):
         Tries to identify unchanged hosts and re-use existing
         :class:`~elasticsearch.Connection` instances.
 
+        If the current connection pool is an instance of
+        ``connection_pool_class`` it is updated in place so that the health
+        information about unchanged hosts is preserved.
+
         :arg hosts: same as `__init__`
         """
+        # index the existing connections by their options to identify
+        # connections that haven't changed and can be kept around.
+        existing = {}
+        for (connection, old_host) in self.connection_pool.connection_opts:
+            existing.setdefault(_host_key(old_host), connection)
+
         # construct the connections
         def _create_connection(host):
-            # if this is not the initial setup look at the existing connection
-            # options and identify connections that haven't changed and can be
-            # kept around.
-            if hasattr(self, "connection_pool"):
-                for (connection, old_host) in self.connection_pool.connection_opts:
-                    if old_host == host:
-                        return connection
+            connection = existing.get(_host_key(host))
+            if connection is not None:
+                return connection
 
             # previously unseen params, create new connection
             kwargs = self.kwargs.copy()
@@ -212,22 +340,241 @@ class Transport(object):
         connections = list(zip(connections, hosts))
         if len(connections) == 1:
             self.connection_pool = DummyConnectionPool(connections)
+        elif type(self.connection_pool) is self.connection_pool_class:
+            self.connection_pool.update_connections(connections)
         else:
             # pass the hosts dicts to the connection pool to optionally extract parameters from
             self.connection_pool = self.connection_pool_class(
                 connections, **self.kwargs
             )
 
+        # forget the circuit breakers of connections that are gone
+        if self.circuit_breakers:
+            self.circuit_breakers = dict(
+                (c, self.circuit_breakers[c])
+                for c, _ in connections
+                if c in self.circuit_breakers
+            )
+
     def get_connection(self):
         """
         Retrieve a :class:`~elasticsearch.Connection` instance from the
         :class:`~elasticsearch.ConnectionPool` instance.
+
+        If ``sniffer_timeout`` has passed since the last sniff a background
+        sniff is started, the current pool is used in the meantime.
         """
         if self.sniffer_timeout:
             if time.time() >= self.last_sniff + self.sniffer_timeout:
-                self.sniff_hosts()
+                self.create_sniff_thread()
         return self.connection_pool.get_connection()
 
+    def create_sniff_thread(self):
+        """
+        Initiate sniffing in a background daemon thread. Make sure we only have
+        one sniff running at any given time, if one is already in progress it
+        is returned instead of starting a new one.
+
+        Requests keep using the current connection pool until the sniff
+        finishes and swaps in the new one.
+        """
+        with self._sniff_lock:
+            if self.sniffing_thread is None or not self.sniffing_thread.is_alive():
+                self.sniffing_thread = threading.Thread(
+                    target=self._sniff_in_background, name="elasticsearch-sniffer"
+                )
+                self.sniffing_thread.daemon = True
+                self.sniffing_thread.start()
+            return self.sniffing_thread
+
+    def _sniff_in_background(self):
+        try:
+            self.sniff_hosts()
+        except Exception:
+            # nobody is waiting for the result, keep using the current pool
+            logger.warning("Sniffing for new hosts failed.", exc_info=True)
+
+    def get_circuit_breaker(self, connection):
+        """
+        Return the :class:`~elasticsearch.CircuitBreaker` guarding the given
+        connection, creating it if needed. Only valid when
+        ``circuit_breaker_class`` is set.
+
+        :arg connection: instance of :class:`~elasticsearch.Connection`
+        """
+        try:
+            return self.circuit_breakers[connection]
+        except KeyError:
+            breaker = self.circuit_breakers[connection] = self.circuit_breaker_class()
+            return breaker
+
+    def circuit_breaker_stats(self):
+        """
+        Return the stats of all circuit breakers keyed by the connection's host.
+        """
+        return dict(
+            (connection.host, breaker.stats())
+            for connection, breaker in list(self.circuit_breakers.items())
+        )
+
+    def _get_request_connection(self):
+        """
+        Retrieve a connection for a request, skipping connections whose circuit
+        breaker currently rejects requests.
+        """
+        if self.circuit_breaker_class is None:
+            return self.get_connection()
+
+        # one extra attempt in case the pool resurrects a connection
+        for _ in range(len(self.connection_pool.connections) + 1):
+            connection = self.get_connection()
+            if self.get_circuit_breaker(connection).allow_request():
+                return connection
+        raise TransportError(
+            "N/A", "All connections are rejected by their circuit breakers."
+        )
+
+    def _record_request_result(self, connection, error=None, start=None):
+        """
+        Report the outcome of a request to the connection's circuit breaker
+        and, when ``start`` is given, to ``metrics``. Only connection errors
+        and ``retry_on_status`` responses count as failures, any other
+        response proves the node is reachable.
+        """
+        if self.circuit_breaker_class is None and start is None:
+            return
+
+        failed = error is not None and (
+            isinstance(error, ConnectionError)
+            or error.status_code in self.retry_on_status
+        )
+        if start is not None:
+            self.metrics.record_node_request(
+                connection.host, time.time() - start, failed
+            )
+        if self.circuit_breaker_class is None:
+            return
+
+        breaker = self.get_circuit_breaker(connection)
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _record_endpoint(self, endpoint, start, body, data=None, error=False):
+        """
+        Report a finished API call, including its retries, to ``metrics``.
+        Does nothing if ``start`` is ``None`` (metrics are disabled).
+        """
+        if start is None:
+            return
+        self.metrics.record_request(
+            endpoint,
+            time.time() - start,
+            _body_size(body),
+            len(data) if data else 0,
+            error,
+        )
+
+    def _deserialize(self, data, mimetype):
+        """
+        Deserialize a response body, timing it if metrics are enabled.
+        """
+        with start_span(self.tracer, "elasticsearch.deserialize"):
+            if self.metrics is None:
+                return self.deserializer.loads(data, mimetype)
+            start = time.time()
+            try:
+                return self.deserializer.loads(data, mimetype)
+            finally:
+                self.metrics.record_deserialize(time.time() - start)
+
+    def _checkout_connection(self):
+        """
+        Retrieve a connection for a request and register the request on it.
+        Connections closed by a concurrent sniff in the meantime are skipped.
+        """
+        while True:
+            connection = self._get_request_connection()
+            if self._acquire_connection(connection):
+                return connection
+            if self.circuit_breaker_class is not None:
+                self.get_circuit_breaker(connection).release()
+
+    def _acquire_connection(self, connection):
+        """
+        Register an in-flight request on the connection. Returns ``False`` if
+        the connection has been removed from the pool and closed already.
+        """
+        with self._in_flight_cond:
+            if connection.retired:
+                return False
+            connection.in_flight = getattr(connection, "in_flight", 0) + 1
+            self._in_flight += 1
+            return True
+
+    def _release_connection(self, connection):
+        """
+        Register the end of an in-flight request on the connection. Returns
+        ``True`` if the connection has been removed from the pool in the
+        meantime and should now be closed.
+        """
+        with self._in_flight_cond:
+            connection.in_flight -= 1
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._in_flight_cond.notify_all()
+            if not connection.in_flight:
+                for i, pending in enumerate(self._close_pending):
+                    if pending is connection:
+                        del self._close_pending[i]
+                        return True
+            return False
+
+    def _close_when_idle(self, connection):
+        """
+        Returns ``True`` if the connection has no in-flight requests and can
+        be closed right away, otherwise it will be closed once the last
+        request finishes.
+        """
+        with self._in_flight_cond:
+            if not getattr(connection, "in_flight", 0):
+                # requests that checked it out already must pick another one
+                connection.retired = True
+                return True
+            self._close_pending.append(connection)
+            return False
+
+    def _wait_for_in_flight(self, timeout):
+        """
+        Wait up to ``timeout`` seconds (forever if ``None``) for all in-flight
+        requests to finish. Returns ``True`` if there are none left.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._in_flight_cond:
+            while self._in_flight:
+                if deadline is None:
+                    self._in_flight_cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._in_flight_cond.wait(remaining)
+            return not self._in_flight
+
+    def _can_retry(self, attempt, endpoint=None):
+        """
+        Decide whether a failed request can be retried, withdrawing a retry
+        from the ``retry_budget`` if there is one.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if self.retry_budget is not None and not self.retry_budget.acquire_retry():
+            return False
+        if self.metrics is not None:
+            self.metrics.record_retry(endpoint)
+        return True
+
     def _get_sniff_data(self, initial=False):
         """
         Perform the request to get sniffing information. Returns a list of
@@ -247,21 +594,16 @@ class Transport(object):
             self.last_sniff = time.time()
             # go through all current connections as well as the
             # seed_connections for good measure
+            connections = []
             for c in chain(self.connection_pool.connections, self.seed_connections):
-                try:
-                    # use small timeout for the sniffing request, should be a fast api call
-                    _, headers, node_info = c.perform_request(
-                        "GET",
-                        "/_nodes/_all/http",
-                        timeout=self.sniff_timeout if not initial else None,
-                    )
-                    node_info = self.deserializer.loads(
-                        node_info, headers.get("content-type")
-                    )
-                    break
-                except (ConnectionError, SerializationError):
-                    pass
-            else:
+                if not any(c is other for other in connections):
+                    connections.append(c)
+
+            # use small timeout for the sniffing request, should be a fast api call
+            node_info = self._sniff_first_success(
+                connections, self.sniff_timeout if not initial else None
+            )
+            if node_info is None:
                 raise TransportError("N/A", "Unable to sniff hosts.")
         except Exception:
             # keep the previous value on error
@@ -270,6 +612,73 @@ class Transport(object):
 
         return list(node_info["nodes"].values())
 
+    def _sniff_request(self, connection, timeout):
+        """
+        Request the node information from a single connection. Returns ``None``
+        if the node couldn't be reached or returned garbage.
+        """
+        try:
+            _, headers, node_info = connection.perform_request(
+                "GET", "/_nodes/_all/http", timeout=timeout
+            )
+            return self.deserializer.loads(node_info, headers.get("content-type"))
+        except (ConnectionError, SerializationError):
+            return None
+
+    def _sniff_first_success(self, connections, timeout):
+        """
+        Send the sniff request to all the connections in parallel (using at
+        most ``SNIFF_MAX_WORKERS`` threads) and return the first successful
+        response, or ``None`` if all of them failed.
+
+        Once a response arrives no new requests are started, requests that
+        are already in flight are abandoned and their results discarded.
+        Unexpected errors are only raised if no node succeeds, the error of
+        the first of those nodes in ``connections`` is raised.
+        """
+        if not connections:
+            return None
+        if len(connections) == 1:
+            return self._sniff_request(connections[0], timeout)
+
+        pending = deque(enumerate(connections))
+        results = Queue()
+        finished = threading.Event()
+
+        def _worker():
+            while not finished.is_set():
+                try:
+                    i, c = pending.popleft()
+                except IndexError:
+                    return
+                try:
+                    node_info, error = self._sniff_request(c, timeout), None
+                except Exception as e:
+                    node_info, error = None, e
+                if node_info is not None:
+                    finished.set()
+                results.put((i, node_info, error))
+
+        for _ in range(min(len(connections), self.SNIFF_MAX_WORKERS)):
+            worker = threading.Thread(target=_worker, name="elasticsearch-sniff")
+            worker.daemon = True
+            worker.start()
+
+        errors = {}
+        try:
+            for _ in connections:
+                i, node_info, error = results.get()
+                if node_info is not None:
+                    return node_info
+                if error is not None:
+                    errors[i] = error
+        finally:
+            finished.set()
+
+        if errors:
+            raise errors[min(errors)]
+        return None
+
     def _get_host_info(self, host_info):
         host = {}
         address = host_info.get("http", {}).get("publish_address")
@@ -301,7 +710,12 @@ class Transport(object):
         :arg initial: flag indicating if this is during startup
             (``sniff_on_start``), ignore the ``sniff_timeout`` if ``True``
         """
-        node_info = self._get_sniff_data(initial)
+        start = time.time()
+        try:
+            node_info = self._get_sniff_data(initial)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_sniff(time.time() - start)
 
         hosts = list(filter(None, (self._get_host_info(n) for n in node_info)))
 
@@ -312,19 +726,43 @@ class Transport(object):
                 "N/A", "Unable to sniff hosts - no viable hosts found."
             )
 
+        orig_connections = [c for (c, _) in self.connection_pool.connection_opts]
         self.set_connections(hosts)
+        # close those connections that are not in use any more, connections
+        # with in-flight requests are closed once the last one finishes
+        for c in self._removed_connections(orig_connections):
+            if self._close_when_idle(c):
+                c.close()
+
+    def _removed_connections(self, orig_connections):
+        """
+        Return the connections from ``orig_connections`` that are no longer
+        part of the connection pool. Seed connections are never returned as
+        they are still used for sniffing.
+        """
+        in_use = set(
+            id(c)
+            for c in chain(
+                (c for (c, _) in self.connection_pool.connection_opts),
+                self.seed_connections,
+            )
+        )
+        return [c for c in orig_connections if id(c) not in in_use]
 
     def mark_dead(self, connection):
         """
         Mark a connection as dead (failed) in the connection pool. If sniffing
-        on failure is enabled this will initiate the sniffing process.
+        on failure is enabled this will initiate the sniffing process in a
+        background thread.
 
         :arg connection: instance of :class:`~elasticsearch.Connection` that failed
         """
         # mark as dead even when sniffing to avoid hitting this host during the sniff process
         self.connection_pool.mark_dead(connection)
+        if self.metrics is not None:
+            self.metrics.record_dead(connection.host)
         if self.sniff_on_connection_fail:
-            self.sniff_hosts()
+            self.create_sniff_thread()
 
     def perform_request(self, method, url, headers=None, params=None, body=None):
         """
@@ -333,11 +771,17 @@ class Transport(object):
         return the data.
 
         If an exception was raised, mark the connection as failed and retry (up
-        to `max_retries` times).
+        to `max_retries` times and as long as the `retry_budget` allows).
 
         If the operation was successful and the connection used was previously
         marked as dead, mark it as live, resetting it's failure count.
 
+        If ``params`` contain a ``cache_ttl``, there is a ``response_cache``
+        and the request only reads data, the response is cached for that many
+        seconds.
+        Otherwise, with ``coalesce_requests`` enabled, identical read requests
+        made while one of them is in flight share its response.
+
         :arg method: HTTP method to use
         :arg url: absolute url (without host) to target
         :arg headers: dictionary of headers, will be handed over to the
@@ -347,73 +791,282 @@ class Transport(object):
         :arg body: body of the request, will be serialized using serializer and
             passed to the connection
         """
-        method, params, body, ignore, timeout = self._resolve_request_args(
-            method, params, body
-        )
+        endpoint = cache_ttl = None
+        if params:
+            endpoint = params.pop(ENDPOINT_PARAM, None)
+            cache_ttl = params.pop("cache_ttl", None)
+        start = time.time() if self.metrics is not None else None
+        with start_span(
+            self.tracer,
+            endpoint or method,
+            {"db.system": "elasticsearch", "db.operation": endpoint, "url.path": url},
+        ) as span:
+            method, params, body, ignore, timeout = self._resolve_request_args(
+                method, params, body
+            )
+            span.set_attribute("http.request.method", method)
+            args = (
+                method,
+                url,
+                headers,
+                params,
+                body,
+                ignore,
+                timeout,
+                endpoint,
+                start,
+            )
+
+            cache_key = None
+            if (
+                cache_ttl is not None
+                and self.response_cache is not None
+                and self.response_cache.cacheable(method, url)
+            ):
+                cache_key = self.response_cache.make_key(
+                    method, url, params, body, headers, ignore
+                )
+            if cache_key is None:
+                coalesce_key = self._coalesce_key(
+                    method, url, params, body, headers, ignore
+                )
+                if coalesce_key is None:
+                    response = self._send(*args)
+                else:
+                    response = self._single_flight.do(
+                        coalesce_key, lambda: self._send(*args)
+                    )
+            else:
+                response = self.response_cache.get(cache_key)
+                if response is None:
+                    if self.response_cache.single_flight:
+                        response = self._single_flight.do(
+                            cache_key,
+                            lambda: self._send_and_cache(cache_key, cache_ttl, args),
+                        )
+                    else:
+                        response = self._send_and_cache(cache_key, cache_ttl, args)
+
+            return self._process_response(method, response, endpoint, start, body)
+
+    def _send(
+        self, method, url, headers, params, body, ignore, timeout, endpoint, start
+    ):
+        """
+        Send a request, retrying it on other nodes if needed. Returns the
+        status, the mimetype and the raw body of the response.
+        """
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
 
         for attempt in range(self.max_retries + 1):
-            connection = self.get_connection()
+            with start_span(self.tracer, "elasticsearch.checkout"):
+                connection = self._checkout_connection()
+            attempt_start = time.time() if start is not None else None
+            recorded = False
 
             try:
-                status, headers_response, data = connection.perform_request(
-                    method,
-                    url,
-                    params,
-                    body,
-                    headers=headers,
-                    ignore=ignore,
-                    timeout=timeout,
-                )
+                with start_span(
+                    self.tracer,
+                    "elasticsearch.request",
+                    {
+                        "elasticsearch.node": connection.host,
+                        "elasticsearch.attempt": attempt,
+                    },
+                ) as attempt_span:
+                    status, headers_response, data = connection.perform_request(
+                        method,
+                        url,
+                        params,
+                        body,
+                        headers=headers,
+                        ignore=ignore,
+                        timeout=timeout,
+                    )
+                    attempt_span.set_attribute("http.response.status_code", status)
 
             except TransportError as e:
+                self._record_request_result(connection, e, attempt_start)
+                recorded = True
+
                 if method == "HEAD" and e.status_code == 404:
-                    return False
-
-                retry = False
-                if isinstance(e, ConnectionTimeout):
-                    retry = self.retry_on_timeout
-                elif isinstance(e, ConnectionError):
-                    retry = True
-                elif e.status_code in self.retry_on_status:
-                    retry = True
-
-                if retry:
-                    try:
-                        # only mark as dead if we are retrying
-                        self.mark_dead(connection)
-                    except TransportError:
-                        # If sniffing on failure, it could fail too. Catch the
-                        # exception not to interrupt the retries.
-                        pass
-                    # raise exception on last retry
-                    if attempt == self.max_retries:
-                        raise e
-                else:
+                    return 404, None, ""
+
+                # a streamed body can't be sent again, don't mark the
+                # connection as dead or spend the retry budget for it
+                if _is_sent_stream(body) or not self._should_retry(
+                    e, connection, attempt, endpoint
+                ):
+                    self._record_endpoint(endpoint, start, body, error=True)
                     raise e
 
             else:
                 # connection didn't fail, confirm it's live status
                 self.connection_pool.mark_live(connection)
+                self._record_request_result(connection, start=attempt_start)
+                recorded = True
+                return status, headers_response.get("content-type"), data
+
+            finally:
+                if not recorded and self.circuit_breaker_class is not None:
+                    # no response, free a probe slot of a half-open breaker
+                    self.get_circuit_breaker(connection).release()
+                if self._release_connection(connection):
+                    connection.close()
+
+    def _send_and_cache(self, cache_key, cache_ttl, args):
+        """
+        :meth:`_send` a request and store its response in ``response_cache``.
+        """
+        response = self._send(*args)
+        size = len(response[2]) if response[2] else 0
+        self.response_cache.set(cache_key, response, cache_ttl, size + len(args[1]))
+        return response
 
-                if method == "HEAD":
-                    return 200 <= status < 300
+    def _coalesce_key(self, method, url, params, body, headers, ignore):
+        """
+        Return the key identifying a request for ``coalesce_requests`` or
+        ``None`` if it shouldn't be coalesced.
+        """
+        if not self.coalesce_requests:
+            return None
+        if method == "GET":
+            if url != "/" and not (
+                url.endswith(COALESCE_GET_PATHS) or _DOCUMENT_PATH(url)
+            ):
+                return None
+        elif method == "POST":
+            if not url.endswith(COALESCE_POST_PATHS):
+                return None
+        elif method != "HEAD":
+            return None
 
-                if data:
-                    data = self.deserializer.loads(
-                        data, headers_response.get("content-type")
-                    )
-                return data
+        if params:
+            for param, values in STATEFUL_PARAMS.items():
+                if param not in params:
+                    continue
+                value = params[param]
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8")
+                if values is None or value in values:
+                    return None
+        # streamed bodies can only be read once, by the connection sending them
+        if body is not None and not isinstance(body, bytes):
+            return None
+        # searches of a point in time share its id and keep alive
+        if body and b'"pit"' in body:
+            return None
+        return ResponseCache.make_key(method, url, params, body, headers, ignore)
+
+    def _should_retry(self, error, connection, attempt, endpoint):
+        """
+        Decide whether a request that failed with ``error`` should be retried
+        on another node, marking the connection as dead if so.
+        """
+        retry = False
+        if isinstance(error, ConnectionTimeout):
+            retry = self.retry_on_timeout
+        elif isinstance(error, ConnectionError):
+            retry = True
+        elif error.status_code in self.retry_on_status:
+            retry = True
+
+        if not retry:
+            return False
+        try:
+            # only mark as dead if we are retrying
+            self.mark_dead(connection)
+        except TransportError:
+            # If sniffing on failure, it could fail too. Catch the
+            # exception not to interrupt the retries.
+            pass
+        # give up on last retry or when out of retry budget
+        return self._can_retry(attempt, endpoint)
+
+    def _process_response(self, method, response, endpoint, start, body):
+        """
+        Turn the response returned by :meth:`_send` into the return value of
+        :meth:`perform_request`.
+        """
+        status, mimetype, data = response
+        if method == "HEAD":
+            result = 200 <= status < 300
+        elif data:
+            result = self._deserialize(data, mimetype)
+        else:
+            result = data
+        self._record_endpoint(endpoint, start, body, data)
+        return result
+
+    def warmup(self, connections_per_node=1):
+        """
+        Pre-open ``connections_per_node`` keep-alive connections to every live
+        node so the first requests don't pay for the TCP and TLS handshakes.
+        Nodes are warmed up in parallel, see
+        :meth:`~elasticsearch.Urllib3HttpConnection.warmup`.
+
+        Returns a dict mapping each node's host to the number of open
+        connections.
+        """
+        connections = list(self.connection_pool.connections)
+        opened = {}
+
+        def _warmup(connection):
+            opened[connection.host] = connection.warmup(connections_per_node)
+
+        threads = [
+            threading.Thread(target=_warmup, args=(connection,))
+            for connection in connections[1:]
+        ]
+        for thread in threads:
+            thread.start()
+        if connections:
+            _warmup(connections[0])
+        for thread in threads:
+            thread.join()
+        return opened
+
+    def drain(self, timeout=None):
+        """
+        Gracefully close the transport: wait for the in-flight requests to
+        finish and then close all connections.
+
+        :arg timeout: maximum number of seconds to wait for the in-flight
+            requests, wait forever if ``None``. Connections are closed even if
+            some requests haven't finished in time.
+
+        Returns ``True`` if all in-flight requests finished.
+        """
+        drained = self._wait_for_in_flight(timeout)
+        self.close()
+        return drained
 
     def close(self):
         """
         Explicitly closes connections
         """
+        # don't let a running sniff swap in a new pool after we're closed
+        sniffing_thread = self.sniffing_thread
+        if sniffing_thread is not None:
+            sniffing_thread.join()
         self.connection_pool.close()
 
+        # connections removed by sniffing but still busy
+        with self._in_flight_cond:
+            close_pending, self._close_pending = self._close_pending, []
+        for connection in close_pending:
+            connection.close()
+
     def _resolve_request_args(self, method, params, body):
         """Resolves parameters for .perform_request()"""
-        if body is not None:
-            body = self.serializer.dumps(body)
+        if body is not None and not isinstance(body, _StreamingBody):
+            with start_span(self.tracer, "elasticsearch.serialize"):
+                if self.metrics is None:
+                    body = self.serializer.dumps(body)
+                else:
+                    start = time.time()
+                    body = self.serializer.dumps(body)
+                    self.metrics.record_serialize(time.time() - start)
 
             # some clients or environments don't support sending GET with body
             if method in ("HEAD", "GET") and self.send_get_body_as != "GET":
@@ -423,8 +1076,8 @@ class Transport(object):
 
                 # or as source parameter
                 elif self.send_get_body_as == "source":
-                    if params is None:
-                        params = {}
+                    # the params may be the caller's own dict
+                    params = dict(params) if params else {}
                     params["source"] = body
                     body = None
 
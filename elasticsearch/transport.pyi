@@ -15,6 +15,8 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import logging
+import threading
 from typing import (
     Callable,
     Optional,
@@ -25,18 +27,31 @@ from typing import (
     Any,
     Dict,
     List,
+    Tuple,
 )
 
 from .connection import Connection
 from .connection_pool import ConnectionPool
 from .serializer import Serializer, Deserializer
+from .retry import RetryBudget, CircuitBreaker
+from .metrics import Metrics
+from .cache import ResponseCache
+from .tracing import Tracer
+
+logger: logging.Logger
+COALESCE_POST_PATHS: Tuple[str, ...]
+COALESCE_GET_PATHS: Tuple[str, ...]
+STATEFUL_PARAMS: Dict[str, Optional[Tuple[str, ...]]]
 
 def get_host_info(
     node_info: Dict[str, Any], host: Optional[Dict[str, Any]]
 ) -> Optional[Dict[str, Any]]: ...
+def _body_size(body: Any) -> int: ...
+def _is_sent_stream(body: Any) -> bool: ...
 
 class Transport(object):
     DEFAULT_CONNECTION_CLASS: Type[Connection]
+    SNIFF_MAX_WORKERS: int
     connection_pool: ConnectionPool
     deserializer: Deserializer
 
@@ -44,6 +59,13 @@ class Transport(object):
     retry_on_timeout: bool
     retry_on_status: Collection[int]
     send_get_body_as: str
+    retry_budget: Optional[RetryBudget]
+    circuit_breaker_class: Optional[Callable[[], CircuitBreaker]]
+    metrics: Optional[Metrics]
+    tracer: Optional[Tracer]
+    response_cache: Optional[ResponseCache]
+    coalesce_requests: bool
+    circuit_breakers: Dict[Connection, CircuitBreaker]
     serializer: Serializer
     connection_pool_class: Type[ConnectionPool]
     connection_class: Type[Connection]
@@ -55,6 +77,7 @@ class Transport(object):
     sniff_on_connection_fail: bool
     last_sniff: float
     sniff_timeout: Optional[float]
+    sniffing_thread: Optional[threading.Thread]
     host_info_callback: Callable[
         [Dict[str, Any], Optional[Dict[str, Any]]], Optional[Dict[str, Any]]
     ]
@@ -77,11 +100,20 @@ class Transport(object):
         retry_on_status: Collection[int] = ...,
         retry_on_timeout: bool = ...,
         send_get_body_as: str = ...,
+        retry_budget: Optional[RetryBudget] = ...,
+        circuit_breaker_class: Optional[Callable[[], CircuitBreaker]] = ...,
+        metrics: Optional[Metrics] = ...,
+        tracer: Optional[Tracer] = ...,
+        response_cache: Optional[ResponseCache] = ...,
+        coalesce_requests: bool = ...,
         **kwargs: Any
     ) -> None: ...
     def add_connection(self, host: Any) -> None: ...
     def set_connections(self, hosts: Collection[Any]) -> None: ...
     def get_connection(self) -> Connection: ...
+    def get_circuit_breaker(self, connection: Connection) -> CircuitBreaker: ...
+    def circuit_breaker_stats(self) -> Dict[str, Dict[str, Union[str, int]]]: ...
+    def create_sniff_thread(self) -> threading.Thread: ...
     def sniff_hosts(self, initial: bool = ...) -> None: ...
     def mark_dead(self, connection: Connection) -> None: ...
     def perform_request(
@@ -92,4 +124,6 @@ class Transport(object):
         params: Optional[Mapping[str, Any]] = ...,
         body: Optional[Any] = ...,
     ) -> Union[bool, Any]: ...
+    def warmup(self, connections_per_node: int = ...) -> Dict[str, int]: ...
+    def drain(self, timeout: Optional[float] = ...) -> bool: ...
     def close(self) -> None: ...
@@ -103,5 +103,7 @@ setup(
         "docs": docs_require,
         "requests": ["requests>=2.4.0, <3.0.0"],
         "async": async_require,
+        "httpx": ["httpx[http2]>=0.18, <1"],
+        "opentelemetry": ["opentelemetry-api>=1.0, <2"],
     },
 )
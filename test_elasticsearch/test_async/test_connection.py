@@ -16,17 +16,33 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import asyncio
 import ssl
 import gzip
 import io
-from mock import patch
+from mock import Mock, patch
 import warnings
 from platform import python_version
 import aiohttp
 from multidict import CIMultiDict
 import pytest
 
-from elasticsearch import AIOHttpConnection
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from elasticsearch import AIOHttpConnection, AsyncHttpxHttpConnection
+from elasticsearch.exceptions import (
+    ConnectionError,
+    ConnectionTimeout,
+    NotFoundError,
+    ResponseTooLargeError,
+)
+from elasticsearch._async.http_aiohttp import ESClientResponse
+from elasticsearch.connection.base import _StreamingBody
+from elasticsearch._async.client.utils import _bulk_body
+from elasticsearch.serializer import JSONSerializer
 from elasticsearch import __versionstr__
 
 pytestmark = pytest.mark.asyncio
@@ -50,9 +66,13 @@ class TestAIOHttpConnection:
                 async def __aexit__(self, *_, **__):
                     pass
 
-                async def text(self):
+                async def text(self, max_bytes=None):
+                    _dummy_request.max_bytes = max_bytes
                     return response_body.decode("utf-8", "surrogatepass")
 
+                async def release(self):
+                    pass
+
             dummy_response = DummyResponse()
             dummy_response.headers = CIMultiDict()
             dummy_response.status = 200
@@ -167,6 +187,27 @@ class TestAIOHttpConnection:
         assert kwargs["headers"]["accept-encoding"] == "gzip,deflate"
         assert "content-encoding" not in kwargs["headers"]
 
+    async def test_streamed_body_is_sent_as_async_iterator(self):
+        async def lines():
+            yield {"index": {}}
+            yield {"a": 1}
+
+        assert isinstance(_bulk_body(JSONSerializer(), lines()), _StreamingBody)
+
+        for http_compress in (False, True):
+            con = await self._get_mock_connection({"http_compress": http_compress})
+            body = _StreamingBody(JSONSerializer(), lines())
+
+            await con.perform_request("POST", "/_bulk", body=body)
+
+            _, kwargs = con.session.request.call_args
+            data = b"".join([chunk async for chunk in kwargs["data"]])
+            if http_compress:
+                assert kwargs["headers"]["content-encoding"] == "gzip"
+                data = gzip_decompress(data)
+            assert data == b'{"index":{}}\n{"a":1}\n'
+            assert body.started and body.size == len(data)
+
     def test_cloud_id_http_compress_override(self):
         # 'http_compress' will be 'True' by default for connections with
         # 'cloud_id' set but should prioritize user-defined values.
@@ -311,8 +352,174 @@ class TestAIOHttpConnection:
         assert '> {"example": "body"}' == req[0][0] % req[0][1:]
         assert "< {}" == resp[0][0] % resp[0][1:]
 
+    async def test_client_timeouts_are_reused(self):
+        con = await self._get_mock_connection(connection_params={"timeout": 5})
+        await con.perform_request("GET", "/")
+        default_timeout = con.session.request.call_args[1]["timeout"]
+        assert default_timeout.total == 5
+
+        await con.perform_request("GET", "/")
+        assert default_timeout is con.session.request.call_args[1]["timeout"]
+
+        await con.perform_request("GET", "/", timeout=1)
+        assert con.session.request.call_args[1]["timeout"].total == 1
+
+    async def test_connection_headers_are_reused_without_request_headers(self):
+        con = await self._get_mock_connection()
+        await con.perform_request("GET", "/")
+        assert con.headers is con.session.request.call_args[1]["headers"]
+
+        await con.perform_request("GET", "/", headers={"x-custom": "value"})
+        request_headers = con.session.request.call_args[1]["headers"]
+        assert request_headers["x-custom"] == "value"
+        assert "x-custom" not in con.headers
+
     async def test_surrogatepass_into_bytes(self):
         buf = b"\xe4\xbd\xa0\xe5\xa5\xbd\xed\xa9\xaa"
         con = await self._get_mock_connection(response_body=buf)
         status, headers, data = await con.perform_request("GET", "/")
         assert u"你好\uda6a" == data
+
+    async def test_max_response_bytes_passed_to_response(self):
+        con = await self._get_mock_connection(
+            connection_params={"max_response_bytes": 1}
+        )
+        await con.perform_request("GET", "/")
+        assert 1 == con.session.request.max_bytes
+
+    async def test_connector_options(self):
+        con = AIOHttpConnection(
+            maxsize=5, limit_per_host=2, keepalive_timeout=30, ttl_dns_cache=60
+        )
+        await con._create_aiohttp_session()
+        connector = con.session.connector
+        assert 5 == connector.limit
+        assert 2 == connector.limit_per_host
+        assert 30 == connector._keepalive_timeout
+        await con.close()
+        assert connector.closed
+
+    async def test_shared_connector_is_not_closed(self):
+        connector = aiohttp.TCPConnector()
+        con = AIOHttpConnection(connector=connector)
+        await con._create_aiohttp_session()
+        assert con.session.connector is connector
+
+        await con.close()
+        assert not connector.closed
+        await connector.close()
+
+    async def test_ssl_context_passed_per_request_with_shared_connector(self):
+        context = ssl.create_default_context()
+        connector = aiohttp.TCPConnector()
+        con = await self._get_mock_connection(
+            connection_params={
+                "use_ssl": True,
+                "ssl_context": context,
+                "connector": connector,
+            }
+        )
+        await con.perform_request("GET", "/")
+        kwargs = con.session.request.call_args[1]
+        assert context is kwargs["ssl"]
+        assert "fingerprint" not in kwargs
+        await connector.close()
+
+    async def test_warmup(self):
+        con = await self._get_mock_connection()
+        assert 3 == await con.warmup(3)
+
+        async def _fail(*args, **kwargs):
+            raise ConnectionError("N/A", "error", None)
+
+        con.perform_request = _fail
+        assert 0 == await con.warmup(2)
+
+
+class TestESClientResponse:
+    def _get_response(self, chunks, content_length=None):
+        async def iter_chunked(n):
+            for chunk in chunks:
+                yield chunk
+
+        response = Mock(
+            _body=None,
+            headers=CIMultiDict(
+                {} if content_length is None else {"content-length": content_length}
+            ),
+        )
+        response.content.iter_chunked = iter_chunked
+        response.read_body = lambda max_bytes: ESClientResponse.read_body(
+            response, max_bytes
+        )
+        return response
+
+    async def test_read_body(self):
+        response = self._get_response([b'{"a"', b": 1}"], "8")
+        text = await ESClientResponse.text(response, max_bytes=10)
+
+        assert '{"a": 1}' == text
+        assert b'{"a": 1}' == response._body
+        assert 0 == response.close.call_count
+
+    async def test_read_body_without_limit_reads_at_once(self):
+        response = self._get_response([b"{}"], "2")
+
+        async def read():
+            response._body = b"{}"
+            return response._body
+
+        response.read = read
+        assert "{}" == await ESClientResponse.text(response)
+
+    async def test_read_body_exceeding_max_bytes(self):
+        for chunks, content_length in (([b"{}"], "11"), ([b"x" * 6] * 2, None)):
+            response = self._get_response(chunks, content_length)
+            with pytest.raises(ResponseTooLargeError):
+                await ESClientResponse.read_body(response, 10)
+            assert 1 == response.close.call_count
+
+
+@pytest.mark.skipif(httpx is None, reason="Test requires httpx[http2]")
+class TestAsyncHttpxConnection:
+    def _get_mock_connection(self, connection_params={}, handler=None):
+        con = AsyncHttpxHttpConnection(**connection_params)
+        self.requests = []
+
+        def _record(request):
+            self.requests.append(request)
+            if handler:
+                return handler(request)
+            return httpx.Response(200, content=b"{}")
+
+        con.client = con._create_client(transport=httpx.MockTransport(_record))
+        return con
+
+    async def test_perform_request(self):
+        con = self._get_mock_connection({"http_compress": True})
+        status, headers, data = await con.perform_request(
+            "POST", "/_search", params={"size": 1}, body=b"{}"
+        )
+
+        assert (status, data) == (200, "{}")
+        request = self.requests[0]
+        assert str(request.url) == "http://localhost:9200/_search?size=1"
+        assert gzip_decompress(request.content) == b"{}"
+        assert request.headers["content-encoding"] == "gzip"
+        assert con.loop is asyncio.get_running_loop()
+        await con.close()
+
+    async def test_error_status_raises_transport_error(self):
+        con = self._get_mock_connection(
+            handler=lambda request: httpx.Response(404, content=b"{}")
+        )
+        with pytest.raises(NotFoundError):
+            await con.perform_request("GET", "/")
+
+    async def test_timeout_raises_connection_timeout(self):
+        def handler(request):
+            raise httpx.ReadTimeout("timed out")
+
+        con = self._get_mock_connection(handler=handler)
+        with pytest.raises(ConnectionTimeout):
+            await con.perform_request("GET", "/")
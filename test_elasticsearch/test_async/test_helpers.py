@@ -0,0 +1,390 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from mock import Mock
+
+from elasticsearch import helpers
+from elasticsearch.serializer import JSONSerializer
+from elasticsearch.exceptions import ConnectionError, NotFoundError, SerializationError
+
+pytestmark = pytest.mark.asyncio
+
+
+class DummyBulkClient:
+    def __init__(self):
+        self.transport = Mock(serializer=JSONSerializer(), tracer=None)
+        self.bodies = []
+
+    async def bulk(self, body, *args, **kwargs):
+        self.bodies.append(body)
+        lines = body.strip().split("\n")
+        return {
+            "items": [
+                {"index": {"_id": str(i), "status": 201}}
+                for i, line in enumerate(lines)
+                if '"index"' in line
+            ]
+        }
+
+
+class TestAsyncPipelineBulk:
+    async def test_results_match_streaming_bulk(self):
+        actions = [{"_index": "i", "_id": i, "value": i} for i in range(10)]
+
+        streaming_client = DummyBulkClient()
+        expected = [
+            x
+            async for x in helpers.async_streaming_bulk(
+                streaming_client, actions, chunk_size=3
+            )
+        ]
+        pipeline_client = DummyBulkClient()
+        results = [
+            x
+            async for x in helpers.async_pipeline_bulk(
+                pipeline_client, actions, chunk_size=3, queue_size=1
+            )
+        ]
+
+        assert expected == results
+        assert streaming_client.bodies == pipeline_client.bodies
+        assert 4 == len(pipeline_client.bodies)
+
+    async def test_serializes_off_the_event_loop_thread(self):
+        threads = set()
+
+        def expand(action):
+            threads.add(threading.current_thread())
+            return helpers.expand_action(action)
+
+        async def actions():
+            for i in range(5):
+                yield {"_index": "i", "value": i}
+
+        results = [
+            x
+            async for x in helpers.async_pipeline_bulk(
+                DummyBulkClient(), actions(), expand_action_callback=expand
+            )
+        ]
+
+        assert 5 == len(results)
+        assert threads and threading.current_thread() not in threads
+
+    async def test_producer_errors_are_raised(self):
+        def actions():
+            yield {"_index": "i"}
+            raise ValueError("broken generator")
+
+        with pytest.raises(ValueError, match="broken generator"):
+            async for _ in helpers.async_pipeline_bulk(DummyBulkClient(), actions()):
+                pass
+
+    async def test_serializer_errors_are_raised(self):
+        def expand(action):
+            raise TypeError("not serializable")
+
+        with pytest.raises(TypeError, match="not serializable"):
+            async for _ in helpers.async_pipeline_bulk(
+                DummyBulkClient(), [{}] * 10, expand_action_callback=expand
+            ):
+                pass
+
+    async def test_lag_monitor_runs_for_the_duration_of_the_pipeline(self):
+        monitor = helpers.EventLoopLagMonitor(interval=0.001)
+
+        async for _ in helpers.async_pipeline_bulk(
+            DummyBulkClient(), [{"_index": "i"}], lag_monitor=monitor
+        ):
+            await asyncio.sleep(0.01)
+
+        assert not monitor.running
+        assert monitor.stats()["samples"] > 0
+
+
+class TestEventLoopLagMonitor:
+    async def test_measures_blocked_event_loop(self):
+        async with helpers.EventLoopLagMonitor(interval=0.001) as monitor:
+            await asyncio.sleep(0.01)
+            time.sleep(0.05)
+            await asyncio.sleep(0.01)
+
+        stats = monitor.stats()
+        assert not monitor.running
+        assert stats["samples"] >= 2
+        assert stats["max_lag"] >= 0.04
+        assert 0 < stats["mean_lag"] <= stats["max_lag"]
+
+    def test_stats_without_samples(self):
+        assert {
+            "samples": 0,
+            "max_lag": 0.0,
+            "mean_lag": 0.0,
+            "last_lag": 0.0,
+        } == helpers.EventLoopLagMonitor().stats()
+
+
+class DummyMgetClient:
+    def __init__(self, missing=()):
+        self.transport = Mock(serializer=JSONSerializer(), tracer=None)
+        self.missing = missing
+        self.max_docs = None
+        self.mget_calls = []
+
+    async def mget(self, body, **kwargs):
+        self.mget_calls.append((body, kwargs))
+        await asyncio.sleep(0)
+        docs = [dict(doc, found=doc["_id"] not in self.missing) for doc in body["docs"]]
+        return {"docs": docs[: self.max_docs]}
+
+
+class TestAsyncBatchingClient:
+    async def test_concurrent_gets_are_sent_as_one_mget(self):
+        client = DummyMgetClient(missing=("2",))
+        async with helpers.AsyncBatchingClient(client, max_wait=0.01) as batching:
+            results = await asyncio.gather(
+                *[batching.get("i", str(i)) for i in range(3)], return_exceptions=True
+            )
+
+        assert 1 == len(client.mget_calls)
+        assert {"_index": "i", "_id": "0", "found": True} == results[0]
+        assert isinstance(results[2], NotFoundError)
+
+    async def test_full_batches_are_sent_right_away(self):
+        client = DummyMgetClient()
+        batching = helpers.AsyncBatchingClient(client, max_batch_size=2, max_wait=10)
+
+        start = time.time()
+        await asyncio.gather(*[batching.get("i", str(i)) for i in range(4)])
+        assert time.time() - start < 1
+        assert 2 == len(client.mget_calls)
+
+        pending = asyncio.ensure_future(batching.get("i", "5"))
+        await asyncio.sleep(0)
+        await batching.close()
+        assert "5" == (await pending)["_id"]
+        assert 3 == len(client.mget_calls)
+
+    async def test_malformed_responses_fail_every_call(self):
+        client = DummyMgetClient()
+        client.max_docs = 1
+        async with helpers.AsyncBatchingClient(client, max_wait=0.01) as batching:
+            results = await asyncio.gather(
+                *[batching.get("i", str(i)) for i in range(2)], return_exceptions=True
+            )
+
+        assert [SerializationError] * 2 == [type(r) for r in results]
+
+
+class TestAsyncBulkIndexer:
+    async def test_actions_are_sent_in_chunks(self):
+        client = DummyBulkClient()
+        results = []
+        async with helpers.AsyncBulkIndexer(
+            client,
+            chunk_size=2,
+            flush_interval=0.05,
+            callback=lambda *r: results.append(r),
+        ) as indexer:
+            futures = [await indexer.index("i", {"value": i}) for i in range(3)]
+            # the last action is sent after flush_interval
+            assert {"_id": "0", "status": 201} == (await futures[0])["index"]
+            assert "0" == (await futures[2])["index"]["_id"]
+
+        assert 2 == len(client.bodies)
+        assert [True] * 3 == [ok for ok, _ in results]
+        assert {"pending": 0, "sent": 3, "failed": 0, "chunks": 2} == indexer.stats()
+        with pytest.raises(RuntimeError):
+            await indexer.add({"_index": "i"})
+
+    async def test_pending_actions_are_bounded(self):
+        client = DummyBulkClient()
+        unblocked = asyncio.Event()
+        bulk = client.bulk
+
+        async def slow_bulk(*args, **kwargs):
+            await unblocked.wait()
+            return await bulk(*args, **kwargs)
+
+        client.bulk = slow_bulk
+        indexer = helpers.AsyncBulkIndexer(client, chunk_size=1, max_pending=2)
+        await indexer.add({"_index": "i"})
+        await indexer.add({"_index": "i"})
+
+        with pytest.raises(asyncio.QueueFull):
+            await indexer.add({"_index": "i"}, block=False)
+        with pytest.raises(asyncio.QueueFull):
+            await indexer.add({"_index": "i"}, timeout=0.01)
+        assert not await indexer.flush(timeout=0.01)
+
+        unblocked.set()
+        assert await indexer.flush()
+        await indexer.close()
+        assert {"pending": 0, "sent": 2, "failed": 0, "chunks": 2} == indexer.stats()
+
+    async def test_transport_errors_fail_every_action(self):
+        client = DummyBulkClient()
+
+        async def failing_bulk(*args, **kwargs):
+            raise ConnectionError("N/A", "boom", None)
+
+        client.bulk = failing_bulk
+        async with helpers.AsyncBulkIndexer(client) as indexer:
+            futures = [await indexer.add({"_index": "i"}) for _ in range(2)]
+
+        for future in futures:
+            with pytest.raises(helpers.BulkIndexError):
+                await future
+        assert 2 == indexer.stats()["failed"]
+
+    async def test_actions_missing_from_the_response_fail(self):
+        client = DummyBulkClient()
+        bulk = client.bulk
+
+        async def truncated_bulk(*args, **kwargs):
+            return {"items": (await bulk(*args, **kwargs))["items"][:1]}
+
+        client.bulk = truncated_bulk
+        async with helpers.AsyncBulkIndexer(client) as indexer:
+            futures = [await indexer.add({"_index": "i"}) for _ in range(3)]
+
+        assert 201 == (await futures[0])["index"]["status"]
+        for future in futures[1:]:
+            with pytest.raises(helpers.BulkIndexError):
+                await future
+        assert {"pending": 0, "sent": 1, "failed": 2, "chunks": 1} == indexer.stats()
+
+
+class DummyMsearchClient:
+    def __init__(self, delays=None, error=None):
+        self.transport = Mock(serializer=JSONSerializer(), tracer=None)
+        self.delays = delays or {}
+        self.error = error
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def msearch(self, body, **kwargs):
+        searches = [json.loads(line) for line in body[1::2]]
+        self.calls.append((len(searches), kwargs))
+        self.in_flight += 1
+        self.max_in_flight = max(self.in_flight, self.max_in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(searches[0]["size"], 0.01))
+        finally:
+            self.in_flight -= 1
+        if self.error:
+            raise self.error
+        return {
+            "responses": [
+                {"error": {"type": "bad"}, "status": 400}
+                if s["size"] < 0
+                else {"hits": {"total": s["size"]}, "status": 200}
+                for s in searches
+            ]
+        }
+
+
+class TestAsyncMultiSearch:
+    async def test_results_are_yielded_in_order(self):
+        client = DummyMsearchClient(delays={0: 0.1})
+
+        async def searches():
+            for i in range(9):
+                yield "i", {"size": i}
+            yield None, {"size": -1}
+
+        results = [
+            r
+            async for r in helpers.async_multi_search(
+                client, searches(), chunk_size=2, max_concurrent_searches=6
+            )
+        ]
+
+        assert list(range(9)) == [r["hits"]["total"] for _, r in results[:9]]
+        assert [True] * 9 + [False] == [ok for ok, _ in results]
+        assert 5 == len(client.calls)
+        assert 4 == client.max_in_flight
+        assert {"max_concurrent_searches": 1} == client.calls[0][1]
+
+    async def test_transport_errors_fail_every_search(self):
+        client = DummyMsearchClient(error=ConnectionError("N/A", "boom", None))
+        searches = [("i", {"size": i}) for i in range(3)]
+
+        with pytest.raises(ConnectionError):
+            async for _ in helpers.async_multi_search(client, searches):
+                pass
+
+        results = [
+            r
+            async for r in helpers.async_multi_search(
+                client, searches, raise_on_exception=False
+            )
+        ]
+        assert [False] * 3 == [ok for ok, _ in results]
+        assert "N/A" == results[0][1]["status"]
+
+
+class TestAsyncStreamingPostData:
+    def client(self):
+        client = Mock()
+        client.transport.serializer = JSONSerializer()
+        client.bodies = []
+
+        async def post_data(job_id, body):
+            client.bodies.append(body)
+            return {"processed_record_count": body.count(b"\n")}
+
+        client.ml.post_data = post_data
+        return client
+
+    async def test_async_iterable_is_split(self):
+        client = self.client()
+
+        async def docs():
+            for i in range(5):
+                yield {"a": i}
+
+        results = [
+            r
+            async for r in helpers.async_streaming_post_data(
+                client, "job", docs(), max_chunk_bytes=16
+            )
+        ]
+
+        assert [2, 2, 1] == [r["processed_record_count"] for r in results]
+        assert b'{"a":0}\n{"a":1}\n' == client.bodies[0]
+
+    async def test_file_is_read_in_executor(self, tmp_path):
+        client = self.client()
+        path = tmp_path / "data.json"
+        path.write_bytes(b'{"a":1}\n{"a":22}\n{"a":333}\n')
+
+        results = [
+            r
+            async for r in helpers.async_streaming_post_data(
+                client, "job", path, max_chunk_bytes=20
+            )
+        ]
+
+        assert [2, 1] == [r["processed_record_count"] for r in results]
+        assert [b'{"a":1}\n{"a":22}\n', b'{"a":333}\n'] == client.bodies
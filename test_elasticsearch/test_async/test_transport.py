@@ -22,16 +22,21 @@ import json
 from mock import patch
 import pytest
 
-from elasticsearch import AsyncTransport
-from elasticsearch.connection import Connection
+from elasticsearch import AsyncTransport, AsyncConnection, AIOHttpConnection
+from elasticsearch.connection.base import _StreamingBody
 from elasticsearch.connection_pool import DummyConnectionPool
 from elasticsearch.exceptions import ConnectionError, TransportError
+from elasticsearch.retry import RetryBudget, CircuitBreaker
+from elasticsearch.metrics import Metrics, ENDPOINT_PARAM
+from elasticsearch.cache import ResponseCache
+
+from ..test_tracing import RecordingTracer
 
 
 pytestmark = pytest.mark.asyncio
 
 
-class DummyConnection(Connection):
+class DummyConnection(AsyncConnection):
     def __init__(self, **kwargs):
         self.exception = kwargs.pop("exception", None)
         self.status, self.data = kwargs.pop("status", 200), kwargs.pop("data", "{}")
@@ -273,6 +278,194 @@ class TestTransport:
         assert connection_error
         assert 0 == len(t.connection_pool.connections)
 
+    async def test_retry_budget_limits_retries(self):
+        t = AsyncTransport(
+            [{"exception": ConnectionError("abandon ship")}],
+            connection_class=DummyConnection,
+            retry_budget=RetryBudget(ratio=0, min_retries=1),
+        )
+
+        with pytest.raises(ConnectionError):
+            await t.perform_request("GET", "/")
+        assert 2 == len(t.get_connection().calls)
+        assert 1 == t.retry_budget.stats()["rejected"]
+
+    async def test_metrics_record_requests_retries_and_dead_nodes(self):
+        t = AsyncTransport(
+            [
+                {"host": "node1", "exception": ConnectionError("abandon ship")},
+                {"host": "node2", "data": '{"a": 1}'},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+            metrics=Metrics(),
+        )
+        await t._async_call()
+        conn_err, conn_ok = t.connection_pool.connections
+
+        assert {"a": 1} == await t.perform_request(
+            "GET", "/", params={ENDPOINT_PARAM: "search"}
+        )
+
+        snapshot = t.metrics.snapshot()
+        assert 1 == snapshot["endpoints"]["search"]["requests"]
+        assert 1 == snapshot["endpoints"]["search"]["retries"]
+        assert 1 == snapshot["nodes"][conn_err.host]["dead"]
+        assert 1 == snapshot["nodes"][conn_ok.host]["requests"]
+        assert 1 == snapshot["deserialize"]["count"]
+
+    async def test_tracer_spans_are_nested_per_attempt(self):
+        tracer = RecordingTracer()
+        t = AsyncTransport(
+            [
+                {"host": "node1", "exception": ConnectionError("abandon ship")},
+                {"host": "node2"},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+            tracer=tracer,
+        )
+
+        await t.perform_request(
+            "GET", "/", params={ENDPOINT_PARAM: "search"}, body={"q": 1}
+        )
+
+        assert [
+            ("elasticsearch.serialize", "search"),
+            ("elasticsearch.checkout", "search"),
+            ("elasticsearch.request", "search"),
+            ("elasticsearch.checkout", "search"),
+            ("elasticsearch.request", "search"),
+            ("elasticsearch.deserialize", "search"),
+            ("search", None),
+        ] == tracer.names()
+        assert [ConnectionError, None] == [
+            s.error for s in tracer.spans if s.name == "elasticsearch.request"
+        ]
+
+    async def test_concurrent_cache_misses_send_a_single_request(self):
+        t = AsyncTransport(
+            [{"delay": 0.05, "data": '{"hits": 1}'}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+        await t._async_call()
+
+        results = await asyncio.gather(
+            *[t.perform_request("GET", "/", params={"cache_ttl": 10}) for _ in range(5)]
+        )
+        assert [{"hits": 1}] * 5 == results
+        assert results[0] is not results[1]
+        assert {"hits": 1} == await t.perform_request(
+            "GET", "/", params={"cache_ttl": 10}
+        )
+        assert 1 == len(t.get_connection().calls)
+        assert 1 == t.response_cache.stats()["hits"]
+
+    async def test_writes_are_never_cached(self):
+        t = AsyncTransport(
+            [{"data": '{"result": "created"}'}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+        await t._async_call()
+
+        for _ in range(2):
+            await t.perform_request(
+                "POST", "/i/_doc", params={"cache_ttl": 10}, body={"a": 1}
+            )
+            await t.perform_request("DELETE", "/i", params={"cache_ttl": 10})
+        assert 4 == len(t.get_connection().calls)
+        assert {} == t.get_connection().calls[0][0][2]
+        assert 0 == t.response_cache.stats()["entries"]
+
+    async def test_concurrent_identical_reads_are_coalesced(self):
+        t = AsyncTransport(
+            [{"delay": 0.05, "exception": TransportError(404, "not found")}],
+            connection_class=DummyConnection,
+            coalesce_requests=True,
+        )
+        await t._async_call()
+
+        results = await asyncio.gather(
+            *[t.perform_request("GET", "/i/_doc/1") for _ in range(3)]
+            + [t.perform_request("HEAD", "/i/_doc/1") for _ in range(2)],
+            return_exceptions=True,
+        )
+        assert [TransportError] * 3 + [bool] * 2 == [type(r) for r in results]
+        assert [False, False] == results[3:]
+        assert 2 == len(t.get_connection().calls)
+
+    async def test_streamed_bodies_are_not_coalesced(self):
+        t = AsyncTransport(
+            [{}], connection_class=DummyConnection, coalesce_requests=True
+        )
+        await t._async_call()
+
+        async def lines():
+            yield {"index": "i"}
+            yield {"query": {"match_all": {}}}
+
+        body = _StreamingBody(t.serializer, lines())
+        await t.perform_request("POST", "/_msearch", body=body)
+
+        # handed to the connection untouched
+        assert body is t.get_connection().calls[0][0][3]
+        assert not body.started
+
+    async def test_coalesced_requests_retry_when_the_first_is_cancelled(self):
+        t = AsyncTransport(
+            [{"delay": 0.05}], connection_class=DummyConnection, coalesce_requests=True
+        )
+        await t._async_call()
+
+        first = asyncio.ensure_future(t.perform_request("GET", "/"))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(t.perform_request("GET", "/"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert {} == await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert 1 == len(t.get_connection().calls)
+
+    async def test_cancelled_requests_release_the_probe_slot(self):
+        t = AsyncTransport(
+            [{"delay": 1}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(
+                failure_threshold=1, recovery_timeout=0
+            ),
+        )
+        await t._async_call()
+        breaker = t.get_circuit_breaker(t.get_connection())
+        breaker.record_failure()
+
+        request = asyncio.ensure_future(t.perform_request("GET", "/"))
+        await asyncio.sleep(0.01)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert breaker.allow_request()
+
+    async def test_open_circuit_breaker_skips_connection(self):
+        t = AsyncTransport(
+            [{"exception": ConnectionError("abandon ship")}, {}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(failure_threshold=1),
+            randomize_hosts=False,
+            dead_timeout=0,
+        )
+        await t._async_call()
+        conn_err, conn_ok = t.connection_pool.connections
+
+        for _ in range(3):
+            assert {} == await t.perform_request("GET", "/")
+        assert 1 == len(conn_err.calls)
+        assert 3 == len(conn_ok.calls)
+        assert "open" == t.get_circuit_breaker(conn_err).state()
+
     async def test_resurrected_connection_will_be_marked_as_live_on_success(self):
         for method in ("GET", "HEAD"):
             t = AsyncTransport([{}, {}], connection_class=DummyConnection)
@@ -457,3 +650,56 @@ class TestTransport:
         assert not any([conn.closed for conn in t.connection_pool.connections])
         await t.close()
         assert all([conn.closed for conn in t.connection_pool.connections])
+
+    async def test_drain_waits_for_in_flight_requests(self):
+        t = AsyncTransport([{"delay": 0.1}], connection_class=DummyConnection)
+        await t._async_call()
+        connection = t.get_connection()
+
+        request = asyncio.ensure_future(t.perform_request("GET", "/"))
+        await asyncio.sleep(0)
+        assert 1 == connection.in_flight
+
+        assert await t.drain()
+        assert connection.closed
+        assert {} == await request
+
+    async def test_drain_gives_up_after_timeout(self):
+        t = AsyncTransport([{"delay": 0.5}], connection_class=DummyConnection)
+        await t._async_call()
+        connection = t.get_connection()
+
+        request = asyncio.ensure_future(t.perform_request("GET", "/"))
+        await asyncio.sleep(0)
+
+        assert not await t.drain(timeout=0.05)
+        assert connection.closed
+        request.cancel()
+
+    async def test_shared_connector_is_used_by_all_connections(self):
+        t = AsyncTransport([{}, {"host": "otherhost"}], shared_connector={"limit": 7})
+        await t._async_call()
+        assert 7 == t.connector.limit
+        for connection in t.connection_pool.connections:
+            assert isinstance(connection, AIOHttpConnection)
+            assert t.connector is connection._connector
+
+        await t.close()
+        assert t.connector.closed
+
+    async def test_no_shared_connector_by_default(self):
+        t = AsyncTransport([{}])
+        await t._async_call()
+        assert t.connector is None
+        assert "connector" not in t.kwargs
+
+    async def test_warmup_every_connection(self):
+        t = AsyncTransport(
+            [{"host": "a"}, {"host": "b", "exception": ConnectionError("N/A", "")}],
+            connection_class=DummyConnection,
+        )
+        assert {"http://a:9200": 2, "http://b:9200": 0} == await t.warmup(2)
+        connection = t.connection_pool.connections[0]
+        if connection.host != "http://a:9200":
+            connection = t.connection_pool.connections[1]
+        assert [(("HEAD", "/"), {})] * 2 == connection.calls
@@ -0,0 +1,199 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import threading
+import time
+
+from elasticsearch.cache import ResponseCache, _SingleFlight
+
+from .test_cases import TestCase
+
+
+class TestResponseCache(TestCase):
+    def test_keys_ignore_param_and_header_order(self):
+        key = ResponseCache.make_key(
+            "POST", "/i/_search", {"a": b"1", "b": b"2"}, b'{"q":1}', {"x": "1"}, ()
+        )
+        self.assertEqual(
+            key,
+            ResponseCache.make_key(
+                "POST", "/i/_search", {"b": b"2", "a": b"1"}, b'{"q":1}', {"x": "1"}
+            ),
+        )
+        for other in (
+            ResponseCache.make_key("POST", "/i/_search", {"a": b"1"}, b'{"q":1}'),
+            ResponseCache.make_key("POST", "/i/_search", body=b'{"q":2}'),
+            ResponseCache.make_key("GET", "/i/_search", body=b'{"q":1}'),
+            ResponseCache.make_key(
+                "POST", "/i/_search", {"a": b"1", "b": b"2"}, b'{"q":1}', {"x": "2"}
+            ),
+            ResponseCache.make_key(
+                "POST",
+                "/i/_search",
+                {"a": b"1", "b": b"2"},
+                b'{"q":1}',
+                {"x": "1"},
+                (404,),
+            ),
+        ):
+            self.assertNotEqual(key, other)
+
+    def test_only_reads_are_cacheable(self):
+        for method, url in (
+            ("GET", "/i/_doc/1"),
+            ("HEAD", "/i"),
+            ("POST", "/_search"),
+            ("POST", "/i/_count"),
+            ("POST", "/_msearch"),
+            ("POST", "/i/_mget"),
+        ):
+            self.assertTrue(ResponseCache.cacheable(method, url))
+        for method, url in (
+            ("POST", "/i/_doc"),
+            ("PUT", "/i/_doc/1"),
+            ("DELETE", "/i"),
+            ("POST", "/_search/scroll"),
+        ):
+            self.assertFalse(ResponseCache.cacheable(method, url))
+
+    def test_unhashable_requests_have_no_key(self):
+        self.assertIsNone(ResponseCache.make_key("GET", "/", {"a": [1]}))
+
+    def test_entries_expire(self):
+        cache = ResponseCache()
+        cache.set("key", (200, None, "{}"), 10, 2, now=100)
+
+        self.assertEqual((200, None, "{}"), cache.get("key", now=109))
+        self.assertIsNone(cache.get("key", now=110))
+        self.assertEqual(
+            {"entries": 0, "bytes": 0, "hits": 1, "misses": 1, "evictions": 0},
+            cache.stats(),
+        )
+
+    def test_now_zero_is_a_timestamp(self):
+        cache = ResponseCache()
+        cache.set("key", (200, None, "{}"), 10, 2, now=0)
+
+        self.assertEqual((200, None, "{}"), cache.get("key", now=0))
+        self.assertIsNone(cache.get("key", now=10))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.set("a", "a", 10, 4)
+        cache.set("b", "b", 10, 4)
+        cache.get("a")
+        cache.set("c", "c", 10, 4)
+
+        self.assertEqual("a", cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("c", cache.get("c"))
+        self.assertEqual(8, cache.stats()["bytes"])
+        self.assertEqual(1, cache.stats()["evictions"])
+
+        # too big to be cached at all
+        cache.set("d", "d", 10, 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(2, cache.stats()["entries"])
+
+        cache.clear()
+        self.assertEqual(0, cache.stats()["bytes"])
+
+
+class TestSingleFlight(TestCase):
+    def test_concurrent_calls_share_a_single_result(self):
+        single_flight = _SingleFlight()
+        calls = []
+        started = threading.Event()
+        results = []
+
+        def func():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "result"
+
+        def call():
+            results.append(single_flight.do("key", func))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(["result"] * 5, results)
+
+        # the next call runs the function again
+        self.assertEqual("result", single_flight.do("key", func))
+        self.assertEqual(2, len(calls))
+
+    def test_errors_are_shared(self):
+        single_flight = _SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def func():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                single_flight.do("key", func)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(3, len(errors))
+
+    def test_waiting_calls_retry_after_an_interrupted_call(self):
+        class Interrupted(BaseException):
+            pass
+
+        single_flight = _SingleFlight()
+        started = threading.Event()
+        interrupted = []
+
+        def func():
+            started.set()
+            time.sleep(0.05)
+            raise Interrupted()
+
+        def leader():
+            try:
+                single_flight.do("key", func)
+            except Interrupted:
+                interrupted.append(True)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait()
+        self.assertEqual("result", single_flight.do("key", lambda: "result"))
+        thread.join()
+
+        self.assertEqual([True], interrupted)
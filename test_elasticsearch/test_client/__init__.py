@@ -18,8 +18,10 @@
 from __future__ import unicode_literals
 
 from elasticsearch.client import _normalize_hosts, Elasticsearch
+from elasticsearch.metrics import Metrics
 
 from ..test_cases import TestCase, ElasticsearchTestCase
+from ..test_transport import DummyConnection
 
 
 class TestNormalizeHosts(TestCase):
@@ -66,6 +68,26 @@ class TestNormalizeHosts(TestCase):
 
 
 class TestClient(ElasticsearchTestCase):
+    def test_namespaces_are_created_once_per_client(self):
+        from elasticsearch.client import IndicesClient
+
+        other = Elasticsearch()
+
+        self.assertIsInstance(self.client.indices, IndicesClient)
+        self.assertIs(self.client.indices, self.client.indices)
+        self.assertIsNot(self.client.indices, other.indices)
+        self.assertIs(self.client, self.client.indices.client)
+
+    def test_metrics_record_endpoint_names(self):
+        client = Elasticsearch(connection_class=DummyConnection, metrics=Metrics())
+        client.search(index="test")
+        client.indices.refresh()
+
+        self.assertEqual(
+            set(["search", "indices.refresh"]),
+            set(client.transport.metrics.snapshot()["endpoints"]),
+        )
+
     def test_request_timeout_is_passed_through_unescaped(self):
         self.client.ping(request_timeout=0.1)
         calls = self.assert_url_called("HEAD", "/")
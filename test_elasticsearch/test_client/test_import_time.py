@@ -0,0 +1,100 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import os
+import subprocess
+import sys
+
+from ..test_cases import TestCase, SkipTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_times(code):
+    """
+    Run ``code`` in a fresh interpreter with ``-X importtime`` and return a
+    dict mapping every imported module to its cumulative import time in
+    microseconds.
+    """
+    if sys.version_info < (3, 7):
+        raise SkipTest("-X importtime requires Python 3.7+")
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+    )
+    _, stderr = proc.communicate()
+    assert proc.returncode == 0, stderr
+
+    times = {}
+    for line in stderr.decode("utf-8").splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def namespace_modules(times):
+    return sorted(
+        m
+        for m in times
+        if m.startswith(("elasticsearch.client.", "elasticsearch._async.client."))
+        and not m.endswith(".utils")
+    )
+
+
+class TestImportTime(TestCase):
+    """
+    Guards the cold-start budget: importing the package and calling an API
+    that isn't namespaced must not import any of the namespaced client
+    modules (``indices``, ``ml``, ...).
+    """
+
+    def test_import_does_not_load_namespaces(self):
+        times = import_times("import elasticsearch")
+
+        self.assertIn("elasticsearch", times)
+        self.assertEqual([], namespace_modules(times))
+
+    def test_namespace_is_imported_on_first_access(self):
+        times = import_times(
+            "from elasticsearch import Elasticsearch\n"
+            "es = Elasticsearch()\n"
+            "es.search, es.index\n"
+            "es.indices\n"
+        )
+
+        self.assertEqual(["elasticsearch.client.indices"], namespace_modules(times))
+
+    def test_import_does_not_load_httpx(self):
+        times = import_times("import elasticsearch")
+
+        self.assertNotIn("httpx", times)
+
+    def test_httpx_is_imported_by_its_connections(self):
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise SkipTest("Test requires httpx[http2]")
+        times = import_times(
+            "from elasticsearch import HttpxHttpConnection\n" "HttpxHttpConnection()\n"
+        )
+
+        self.assertIn("httpx", times)
@@ -68,3 +68,12 @@ class TestOverriddenUrlTargets(ElasticsearchTestCase):
 
         self.client.cluster.stats(node_id="test-node")
         self.assert_url_called("GET", "/_cluster/stats/nodes/test-node")
+
+    def test_scroll_does_not_modify_passed_params(self):
+        params = {"pretty": "true"}
+        self.client.scroll(scroll_id="a", body={"scroll": "1m"}, params=params)
+        self.client.clear_scroll(scroll_id="b", body={"x": 1}, params=params)
+
+        self.assertEqual({"pretty": "true"}, params)
+        ((scroll_params, _, _),) = self.assert_url_called("POST", "/_search/scroll")
+        self.assertEqual({"pretty": "true", "scroll_id": "a"}, scroll_params)
@@ -18,8 +18,21 @@
 
 from __future__ import unicode_literals
 
-from elasticsearch.client.utils import _bulk_body, _make_path, _escape, query_params
-from elasticsearch.compat import PY2
+import tempfile
+
+from mock import patch
+
+from elasticsearch.client import utils
+from elasticsearch.client.utils import (
+    _bulk_body,
+    _make_path,
+    _escape,
+    _escape_param,
+    query_params,
+)
+from elasticsearch.compat import PY2, quote
+from elasticsearch.connection.base import _FileBody, _StreamingBody
+from elasticsearch.serializer import JSONSerializer
 
 from ..test_cases import TestCase, SkipTest
 
@@ -75,6 +88,59 @@ class TestQueryParams(TestCase):
         self.func_to_wrap(headers={"X": "y"})
         self.assertEqual(self.calls[-1], ((), {"params": {}, "headers": {"x": "y"}}))
 
+    def test_passes_unknown_and_unescaped_kwargs(self):
+        self.func_to_wrap(1, other=True, ignore=404, request_timeout=5, cache_ttl=2)
+        self.assertEqual(
+            self.calls[-1],
+            (
+                (1,),
+                {
+                    "other": True,
+                    "params": {"ignore": 404, "request_timeout": 5, "cache_ttl": 2},
+                    "headers": {},
+                },
+            ),
+        )
+
+    def test_does_not_modify_passed_params_and_headers(self):
+        params, headers = {"a": "1"}, {"X-A": "1"}
+        self.func_to_wrap(params=params, headers=headers, simple_param=True)
+        self.assertEqual(
+            self.calls[-1][1],
+            {"params": {"a": "1", "simple_param": b"true"}, "headers": {"x-a": "1"}},
+        )
+        self.assertEqual({"a": "1"}, params)
+        self.assertEqual({"X-A": "1"}, headers)
+
+    def test_params_are_only_copied_when_modified(self):
+        params = {"a": "1"}
+        self.func_to_wrap(params=params)
+        self.assertIs(params, self.calls[-1][1]["params"])
+
+        # the transport pops request_timeout
+        params = {"request_timeout": 1}
+        self.func_to_wrap(params=params)
+        self.assertIsNot(params, self.calls[-1][1]["params"])
+        self.assertEqual(params, self.calls[-1][1]["params"])
+
+    def test_escaped_values_are_cached_per_type(self):
+        self.assertEqual(b"true", _escape_param(True))
+        self.assertEqual("1", _escape_param(1))
+        self.assertEqual(b"a,b", _escape_param(["a", "b"]))
+        self.assertEqual(b"1", _escape_param(_escape_param(1)))
+        self.assertIn((bool, True), utils._ESCAPE_CACHE)
+
+    def test_long_values_are_not_cached(self):
+        value = "x" * (utils._ESCAPE_CACHE_MAX_LENGTH + 1)
+        self.assertEqual(value.encode("utf-8"), _escape_param(value))
+        self.assertNotIn((type(value), value), utils._ESCAPE_CACHE)
+
+    def test_escape_cache_is_bounded(self):
+        with patch.object(utils, "_ESCAPE_CACHE_SIZE", 2):
+            for i in range(5):
+                self.assertEqual(str(i).encode("utf-8"), _escape_param(str(i)))
+            self.assertLessEqual(len(utils._ESCAPE_CACHE), 2)
+
 
 class TestMakePath(TestCase):
     def test_handles_unicode(self):
@@ -91,6 +157,39 @@ class TestMakePath(TestCase):
             "/some-index/type/%E4%B8%AD%E6%96%87", _make_path("some-index", "type", id)
         )
 
+    def test_matches_quoting_of_all_parts(self):
+        parts = (
+            "logs-2020.01.01",
+            "a,b*",
+            "my index",
+            "a/b",
+            "~user",
+            "<logs-{now/d}>",
+            "中文",
+            b"bytes id",
+            42,
+            True,
+            ["a", "b c"],
+            ("x", "y"),
+        )
+        for part in parts:
+            self.assertEqual(
+                "/" + quote(_escape(part), b",*"), _make_path(part), repr(part)
+            )
+        self.assertEqual("/index/_doc/1", _make_path("index", None, "_doc", "", 1))
+
+    def test_quoted_segments_are_cached_and_bounded(self):
+        with patch.object(utils, "_PATH_CACHE_SIZE", 2):
+            utils._PATH_CACHE.clear()
+            self.assertEqual("/safe-index/1", _make_path("safe-index", 1))
+            self.assertEqual({}, utils._PATH_CACHE)
+
+            for i in range(5):
+                part = "a %d" % i
+                self.assertEqual("/a%%20%d" % i, _make_path(part))
+                self.assertIn((type(part), part), utils._PATH_CACHE)
+            self.assertLessEqual(len(utils._PATH_CACHE), 2)
+
 
 class TestEscape(TestCase):
     def test_handles_ascii(self):
@@ -128,3 +227,62 @@ class TestBulkBody(TestCase):
             b'"{"index":{ "_index" : "test"}}\n{"field1": "value1"}"\n',
             _bulk_body(None, bytestring_body),
         )
+
+    def test_bulk_body_as_list_is_joined(self):
+        self.assertEqual(
+            '{"index":{}}\n{"a":1}\n',
+            _bulk_body(JSONSerializer(), [{"index": {}}, {"a": 1}]),
+        )
+
+    def test_bulk_body_as_iterator_is_streamed(self):
+        body = _bulk_body(
+            JSONSerializer(), (line for line in ['{"index":{}}', {"a": 1}, b"{}\n"])
+        )
+        self.assertIsInstance(body, _StreamingBody)
+        self.assertFalse(body.started)
+
+        self.assertEqual([b'{"index":{}}\n{"a":1}\n{}\n'], list(body))
+        self.assertTrue(body.started)
+        self.assertEqual(24, body.size)
+
+    def test_bulk_body_rejects_async_iterables(self):
+        class AsyncLines(object):
+            def __aiter__(self):
+                return self
+
+        self.assertRaises(TypeError, _bulk_body, JSONSerializer(), AsyncLines())
+
+    def test_streamed_body_is_sent_in_chunks(self):
+        body = _StreamingBody(JSONSerializer(), iter(["x" * 9] * 5))
+        body.chunk_size = 20
+
+        line = b"x" * 9 + b"\n"
+        self.assertEqual([line * 2, line * 2, line], list(body))
+        self.assertEqual(50, body.size)
+
+    def test_bulk_body_as_file_is_streamed_as_is(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as f:
+            f.write(b'{"a":1}\n{"a":2}')
+            f.flush()
+
+            for mode in ("rb", "r"):
+                with open(f.name, mode) as fileobj:
+                    body = _bulk_body(JSONSerializer(), fileobj)
+                    self.assertIsInstance(body, _FileBody)
+                    body.chunk_size = 5
+                    self.assertEqual([b'{"a":', b'1}\n{"', b'a":2}', b"\n"], list(body))
+                    self.assertEqual(16, body.size)
+
+    def test_bulk_body_as_path_is_streamed(self):
+        class Path(object):
+            def __init__(self, path):
+                self.path = path
+
+            def __fspath__(self):
+                return self.path
+
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b'{"a":1}\n')
+            f.flush()
+            body = _bulk_body(JSONSerializer(), Path(f.name))
+            self.assertEqual([b'{"a":1}\n'], list(body))
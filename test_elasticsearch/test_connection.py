@@ -20,6 +20,8 @@ import re
 import ssl
 import gzip
 import io
+import threading
+import time
 from mock import Mock, patch
 import urllib3
 from urllib3._collections import HTTPHeaderDict
@@ -29,18 +31,39 @@ from platform import python_version
 
 import pytest
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 from elasticsearch.exceptions import (
     TransportError,
     ConflictError,
     RequestError,
     NotFoundError,
+    ResponseTooLargeError,
+    ConnectionError,
+    ConnectionTimeout,
+    SSLError,
 )
 from elasticsearch.connection import (
     Connection,
     RequestsHttpConnection,
     Urllib3HttpConnection,
+    HttpxHttpConnection,
+    create_ssl_context,
+)
+from elasticsearch.connection import base
+from elasticsearch.connection.base import (
+    _LazyBody,
+    _ResponseBuffer,
+    _StreamingBody,
+    _encode_query,
 )
+from elasticsearch.connection.pooling import PoolingConnection
+from elasticsearch.connection.http_urllib3 import HAS_TLS_SESSION_REUSE
 from elasticsearch import __versionstr__
+from elasticsearch.serializer import JSONSerializer
 from .test_cases import TestCase, SkipTest
 
 
@@ -150,6 +173,59 @@ class TestBaseConnection(TestCase):
 
         self.assertEqual([str(w.message) for w in warn], ["warning", "folded"])
 
+    @patch("elasticsearch.connection.base.logger")
+    def test_disabled_log_levels_skip_formatting(self, logger):
+        logger.isEnabledFor.return_value = False
+        body = Mock()
+        con = Connection()
+
+        con.log_request_success("GET", None, "/", body, 200, "{}", 0.1)
+        con.log_request_fail("GET", None, "/", body, 0.1, 500, "{}")
+
+        self.assertEqual(0, logger.info.call_count)
+        self.assertEqual(0, logger.warning.call_count)
+        self.assertEqual(0, logger.debug.call_count)
+        self.assertEqual(0, body.decode.call_count)
+
+    def test_lazy_body_is_decoded_when_formatted(self):
+        self.assertEqual(u'> {"key": "value"}', "> %s" % _LazyBody(b'{"key": "value"}'))
+        self.assertEqual("> None", "> %s" % _LazyBody(None))
+
+    def test_response_buffer_is_preallocated_and_grows(self):
+        buffer = _ResponseBuffer("4", None)
+        self.assertEqual(4, len(buffer.buffer))
+        buffer.write(b"ab")
+        self.assertEqual(b"ab", bytes(buffer.getvalue()))
+
+        buffer = _ResponseBuffer("2", None)
+        for chunk in (b"ab", b"cd", b"ef"):
+            buffer.write(chunk)
+        self.assertEqual(b"abcdef", bytes(buffer.getvalue()))
+
+        self.assertEqual(0, len(_ResponseBuffer("invalid", None).buffer))
+
+    def test_response_buffer_enforces_max_bytes(self):
+        self.assertRaises(ResponseTooLargeError, _ResponseBuffer, "11", 10)
+
+        buffer = _ResponseBuffer(None, 10)
+        buffer.write(b"x" * 10)
+        self.assertRaises(ResponseTooLargeError, buffer.write, b"x")
+
+    def test_encoded_query_strings_are_cached_and_bounded(self):
+        with patch.object(base, "_QUERY_STRING_CACHE_SIZE", 2):
+            base._QUERY_STRING_CACHE.clear()
+            self.assertEqual("a=1&b=x+y", _encode_query({"a": b"1", "b": "x y"}))
+            self.assertEqual("b=x+y&a=1", _encode_query({"b": "x y", "a": b"1"}))
+            self.assertEqual(2, len(base._QUERY_STRING_CACHE))
+            self.assertEqual("a=1&b=x+y", _encode_query({"a": b"1", "b": "x y"}))
+
+            self.assertEqual("c=2", _encode_query({"c": 2}))
+            self.assertEqual(1, len(base._QUERY_STRING_CACHE))
+
+            # unhashable values aren't cached
+            self.assertEqual("l=%5B1%5D", _encode_query({"l": [1]}))
+            self.assertEqual(1, len(base._QUERY_STRING_CACHE))
+
 
 class TestUrllib3Connection(TestCase):
     def _get_mock_connection(self, connection_params={}, response_body=b"{}"):
@@ -276,6 +352,22 @@ class TestUrllib3Connection(TestCase):
         self.assertEqual(kwargs["headers"]["accept-encoding"], "gzip,deflate")
         self.assertNotIn("content-encoding", kwargs["headers"])
 
+    def test_streamed_body_is_sent_chunked(self):
+        for http_compress in (False, True):
+            con = self._get_mock_connection({"http_compress": http_compress})
+            body = _StreamingBody(JSONSerializer(), iter([{"index": {}}, {"a": 1}]))
+
+            con.perform_request("POST", "/_bulk", body=body)
+
+            (_, _, req_body), kwargs = con.pool.urlopen.call_args
+            self.assertIs(body, req_body)
+            self.assertTrue(kwargs["chunked"])
+            data = b"".join(req_body)
+            if http_compress:
+                self.assertEqual("gzip", kwargs["headers"]["content-encoding"])
+                data = gzip_decompress(data)
+            self.assertEqual(b'{"index":{}}\n{"a":1}\n', data)
+
     def test_cloud_id_http_compress_override(self):
         # 'http_compress' will be 'True' by default for connections with
         # 'cloud_id' set but should prioritize user-defined values.
@@ -417,12 +509,240 @@ class TestUrllib3Connection(TestCase):
         self.assertEqual('> {"example": "body"}', req[0][0] % req[0][1:])
         self.assertEqual("< {}", resp[0][0] % resp[0][1:])
 
+    @patch("elasticsearch.connection.base.logger")
+    def test_full_url_logged(self, logger):
+        con = self._get_mock_connection(connection_params={"url_prefix": "/prefix"})
+        con.perform_request("GET", "/_search", params={"q": "x"})
+
+        self.assertEqual(1, logger.info.call_count)
+        args = logger.info.call_args[0]
+        self.assertEqual(
+            "GET http://localhost:9200/prefix/_search?q=x [status:200 request:%.3fs]"
+            % args[-1],
+            args[0] % args[1:],
+        )
+
+    def test_connection_headers_are_reused_without_request_headers(self):
+        con = self._get_mock_connection()
+        con.perform_request("GET", "/")
+        self.assertIs(con.headers, con.pool.urlopen.call_args[1]["headers"])
+
+        con.perform_request("GET", "/", headers={"x-custom": "value"})
+        request_headers = con.pool.urlopen.call_args[1]["headers"]
+        self.assertIsNot(con.headers, request_headers)
+        self.assertEqual("value", request_headers["x-custom"])
+        self.assertNotIn("x-custom", con.headers)
+
+        con.http_compress = True
+        con.perform_request("GET", "/", body=b"{}")
+        self.assertNotIn("content-encoding", con.headers)
+
     def test_surrogatepass_into_bytes(self):
         buf = b"\xe4\xbd\xa0\xe5\xa5\xbd\xed\xa9\xaa"
         con = self._get_mock_connection(response_body=buf)
         status, headers, data = con.perform_request("GET", "/")
         self.assertEqual(u"你好\uda6a", data)
 
+    def _get_streaming_connection(self, chunks, content_length=None):
+        con = Urllib3HttpConnection(max_response_bytes=10)
+        response = Mock(status=200)
+        response.headers = HTTPHeaderDict({})
+        if content_length is not None:
+            response.headers["content-length"] = str(content_length)
+        response.stream.return_value = iter(chunks)
+        con.pool.urlopen = Mock(return_value=response)
+        return con, response
+
+    def test_max_response_bytes_streams_body(self):
+        con, response = self._get_streaming_connection([b'{"a"', b": 1}"], 8)
+        status, headers, data = con.perform_request("GET", "/")
+
+        self.assertEqual('{"a": 1}', data)
+        self.assertFalse(con.pool.urlopen.call_args[1]["preload_content"])
+        self.assertEqual(1, response.release_conn.call_count)
+        self.assertEqual(0, response.close.call_count)
+
+    def test_max_response_bytes_exceeded(self):
+        for chunks, content_length in (([b"{}"], 11), ([b"x" * 6, b"x" * 6], None)):
+            con, response = self._get_streaming_connection(chunks, content_length)
+            self.assertRaises(ResponseTooLargeError, con.perform_request, "GET", "/")
+            self.assertEqual(1, response.close.call_count)
+            self.assertEqual(1, response.release_conn.call_count)
+
+    def test_body_is_preloaded_without_max_response_bytes(self):
+        con = self._get_mock_connection()
+        con.perform_request("GET", "/")
+        self.assertTrue(con.pool.urlopen.call_args[1]["preload_content"])
+
+    def test_warmup_opens_connections_in_the_pool(self):
+        con = Urllib3HttpConnection(maxsize=2, url_prefix="/prefix")
+        conns = []
+
+        def _new_conn():
+            conn = Mock(sock=None)
+
+            def _request(*args, **kwargs):
+                conn.sock = object()
+
+            conn.request.side_effect = _request
+            conns.append(conn)
+            return conn
+
+        con.pool._new_conn = _new_conn
+
+        self.assertEqual(2, con.warmup(5))
+        self.assertEqual(2, len(conns))
+        conns[0].request.assert_called_once_with(
+            "HEAD", "/prefix/", headers=con.headers
+        )
+        self.assertEqual(set(conns), set(con.pool.pool.queue))
+
+        # sockets already in the pool are reused
+        with patch("urllib3.connectionpool.is_connection_dropped", return_value=False):
+            self.assertEqual(2, con.warmup(2))
+        self.assertEqual(2, len(conns))
+
+    def test_warmup_failure_closes_connection(self):
+        con = Urllib3HttpConnection()
+        conn = Mock(sock=None)
+        conn.request.side_effect = urllib3.exceptions.NewConnectionError(conn, "")
+        con.pool._new_conn = lambda: conn
+
+        self.assertEqual(0, con.warmup())
+        conn.close.assert_called_once_with()
+
+    def test_tls_session_context(self):
+        if not HAS_TLS_SESSION_REUSE:
+            raise SkipTest("TLS sessions can't be reused on this version of Python")
+
+        ctx = create_ssl_context(session_reuse=True)
+        self.assertEqual(ssl.CERT_REQUIRED, ctx.verify_mode)
+        self.assertTrue(ctx.check_hostname)
+
+        sock = Mock()
+        sock.getpeername.return_value = ("127.0.0.1", 9200)
+        ssl_sock = Mock(session="new-session", server_side=False)
+        ssl_sock.server_hostname = "localhost"
+        ssl_sock.getpeername.return_value = ("127.0.0.1", 9200)
+
+        with patch.object(ssl.SSLContext, "wrap_socket", return_value=ssl_sock) as wrap:
+            self.assertIs(ssl_sock, ctx.wrap_socket(sock, server_hostname="localhost"))
+            self.assertIsNone(wrap.call_args[1]["session"])
+
+            ctx.wrap_socket(sock, server_hostname="localhost")
+            self.assertEqual("new-session", wrap.call_args[1]["session"])
+
+            # sessions are remembered per server
+            ctx.wrap_socket(sock, server_hostname="otherhost")
+            self.assertIsNone(wrap.call_args[1]["session"])
+
+
+class DummyPoolingConnection(PoolingConnection):
+    def __init__(self, *args, **kwargs):
+        self.made = []
+        self.usable = True
+        super(DummyPoolingConnection, self).__init__(*args, **kwargs)
+
+    def _make_connection(self):
+        con = Mock()
+        self.made.append(con)
+        return con
+
+    def _is_connection_usable(self, con):
+        return self.usable
+
+
+class TestPoolingConnection(TestCase):
+    def test_connections_are_reused(self):
+        con = DummyPoolingConnection()
+        first = con._get_connection()
+        second = con._get_connection()
+        con._release_connection(first)
+        con._release_connection(second)
+
+        # most recently used first
+        self.assertIs(second, con._get_connection())
+        self.assertIs(first, con._get_connection())
+        self.assertEqual(2, len(con.made))
+
+        stats = con.pool_stats()
+        self.assertEqual(2, stats["connections"])
+        self.assertEqual(2, stats["in_use"])
+        self.assertEqual(0, stats["idle"])
+        self.assertEqual(2, stats["created"])
+        self.assertEqual(2, stats["reused"])
+
+    def test_acquire_times_out_when_pool_is_exhausted(self):
+        con = DummyPoolingConnection(maxsize=1, pool_timeout=0.01)
+        con._get_connection()
+
+        self.assertRaises(ConnectionTimeout, con._get_connection)
+        self.assertEqual(1, len(con.made))
+        stats = con.pool_stats()
+        self.assertEqual(1, stats["waited"])
+        self.assertEqual(1, stats["timed_out"])
+
+    def test_acquire_blocks_until_a_connection_is_released(self):
+        con = DummyPoolingConnection(maxsize=1)
+        first = con._get_connection()
+        timer = threading.Timer(0.05, con._release_connection, (first,))
+        timer.start()
+
+        self.assertIs(first, con._get_connection())
+        timer.join()
+        self.assertEqual(1, con.pool_stats()["waited"])
+
+    def test_idle_connections_are_evicted(self):
+        con = DummyPoolingConnection(idle_timeout=60)
+        first = con._get_connection()
+        con._release_connection(first)
+        # pretend it was released 2 minutes ago
+        con._free_connections[0] = (first, time.time() - 120)
+
+        second = con._get_connection()
+        self.assertIsNot(first, second)
+        first.close.assert_called_once_with()
+        stats = con.pool_stats()
+        self.assertEqual(1, stats["evicted"])
+        self.assertEqual(1, stats["connections"])
+
+    def test_evict_idle_honours_now_zero(self):
+        con = DummyPoolingConnection(idle_timeout=60)
+        first = con._get_connection()
+        con._release_connection(first)
+        con._free_connections[0] = (first, 0)
+
+        with con._pool_cond:
+            self.assertEqual([], con._evict_idle(now=0))
+            self.assertEqual([first], con._evict_idle(now=61))
+
+    def test_unusable_connections_are_replaced(self):
+        con = DummyPoolingConnection()
+        first = con._get_connection()
+        con._release_connection(first)
+        con.usable = False
+
+        self.assertIsNot(first, con._get_connection())
+        first.close.assert_called_once_with()
+        stats = con.pool_stats()
+        self.assertEqual(1, stats["discarded"])
+        self.assertEqual(1, stats["connections"])
+
+    def test_close(self):
+        con = DummyPoolingConnection()
+        idle = con._get_connection()
+        in_use = con._get_connection()
+        con._release_connection(idle)
+
+        con.close()
+        idle.close.assert_called_once_with()
+        self.assertFalse(in_use.close.called)
+
+        con._release_connection(in_use)
+        in_use.close.assert_called_once_with()
+        self.assertEqual(0, con.pool_stats()["connections"])
+        self.assertRaises(ConnectionError, con._get_connection)
+
 
 class TestRequestsConnection(TestCase):
     def _get_mock_connection(
@@ -824,3 +1144,144 @@ class TestRequestsConnection(TestCase):
         con = self._get_mock_connection(response_body=buf)
         status, headers, data = con.perform_request("GET", "/")
         self.assertEqual(u"你好\uda6a", data)
+
+    def test_max_response_bytes_streams_body(self):
+        con = RequestsHttpConnection(max_response_bytes=10)
+        response = Mock(status_code=200, headers={"content-length": "8"})
+        response.iter_content.return_value = iter([b'{"a"', b": 1}"])
+        con.session.send = Mock(return_value=response)
+
+        status, headers, data = con.perform_request("GET", "/")
+
+        self.assertEqual('{"a": 1}', data)
+        self.assertTrue(con.session.send.call_args[1]["stream"])
+        self.assertEqual(1, response.close.call_count)
+
+    def test_max_response_bytes_exceeded(self):
+        con = RequestsHttpConnection(max_response_bytes=10)
+        response = Mock(status_code=200, headers={})
+        response.iter_content.return_value = iter([b"x" * 6, b"x" * 6])
+        con.session.send = Mock(return_value=response)
+
+        self.assertRaises(ResponseTooLargeError, con.perform_request, "GET", "/")
+        self.assertEqual(1, response.close.call_count)
+
+
+class TestHttpxConnection(TestCase):
+    def setUp(self):
+        if httpx is None:
+            raise SkipTest("Test requires httpx[http2]")
+        super(TestHttpxConnection, self).setUp()
+
+    def _get_mock_connection(self, connection_params={}, handler=None):
+        con = HttpxHttpConnection(**connection_params)
+        self.requests = []
+
+        def _default_handler(request):
+            return httpx.Response(200, content=b"{}")
+
+        def _record(request):
+            self.requests.append(request)
+            return (handler or _default_handler)(request)
+
+        con.client.close()
+        con.client = con._create_client(transport=httpx.MockTransport(_record))
+        return con
+
+    def test_http2_is_enabled_by_default(self):
+        con = HttpxHttpConnection()
+        self.assertTrue(con.http2)
+        self.assertFalse(HttpxHttpConnection(http2=False).http2)
+
+    def test_request_url_headers_and_body(self):
+        con = self._get_mock_connection(
+            {"url_prefix": "/prefix", "headers": {"X-Custom": "value"}}
+        )
+        status, headers, data = con.perform_request(
+            "POST",
+            "/_search",
+            params={"size": 1},
+            body=b'{"answer": 42}',
+            headers={"x-request": "1"},
+        )
+
+        self.assertEqual((200, "{}"), (status, data))
+        request = self.requests[0]
+        self.assertEqual(
+            "http://localhost:9200/prefix/_search?size=1", str(request.url)
+        )
+        self.assertEqual(b'{"answer": 42}', request.content)
+        self.assertEqual("value", request.headers["x-custom"])
+        self.assertEqual("1", request.headers["x-request"])
+        self.assertEqual("application/json", request.headers["content-type"])
+        self.assertNotIn("accept-encoding", request.headers)
+
+    def test_http_compression(self):
+        con = self._get_mock_connection({"http_compress": True})
+        con.perform_request("GET", "/", body=b"{}")
+
+        request = self.requests[0]
+        self.assertEqual(b"{}", gzip_decompress(request.content))
+        self.assertEqual("gzip", request.headers["content-encoding"])
+        self.assertEqual("gzip,deflate", request.headers["accept-encoding"])
+
+    def test_http_auth_attached(self):
+        con = self._get_mock_connection({"http_auth": ("username", "secret")})
+        con.perform_request("GET", "/")
+
+        self.assertEqual(
+            "Basic dXNlcm5hbWU6c2VjcmV0", self.requests[0].headers["authorization"]
+        )
+
+    def test_error_status_raises_transport_error(self):
+        con = self._get_mock_connection(
+            handler=lambda request: httpx.Response(404, content=b"{}")
+        )
+        self.assertRaises(NotFoundError, con.perform_request, "GET", "/")
+        self.assertEqual(404, con.perform_request("GET", "/", ignore=(404,))[0])
+
+    def test_warning_header_raises_deprecation_warning(self):
+        con = self._get_mock_connection(
+            handler=lambda request: httpx.Response(
+                200,
+                content=b"{}",
+                headers=[
+                    ("warning", '299 Elasticsearch-7.6.1 "this is deprecated"'),
+                    ("warning", '299 Elasticsearch-7.6.1 "this is also"'),
+                ],
+            )
+        )
+        with warnings.catch_warnings(record=True) as w:
+            con.perform_request("GET", "/")
+
+        self.assertEqual(
+            ["this is deprecated", "this is also"], [str(x.message) for x in w]
+        )
+
+    def test_connection_errors_are_translated(self):
+        def raise_error(exc):
+            def handler(request):
+                raise exc
+
+            return handler
+
+        ssl_error = httpx.ConnectError("handshake failed")
+        ssl_error.__cause__ = ssl.SSLError("certificate verify failed")
+
+        for exc, expected in (
+            (httpx.ReadTimeout("timed out"), ConnectionTimeout),
+            (ssl_error, SSLError),
+            (httpx.ConnectError("refused"), ConnectionError),
+        ):
+            con = self._get_mock_connection(handler=raise_error(exc))
+            with self.assertRaises(expected) as e:
+                con.perform_request("GET", "/")
+            self.assertIs(exc, e.exception.info)
+
+    def test_surrogatepass_into_bytes(self):
+        buf = b"\xe4\xbd\xa0\xe5\xa5\xbd\xed\xa9\xaa"
+        con = self._get_mock_connection(
+            handler=lambda request: httpx.Response(200, content=buf)
+        )
+        status, headers, data = con.perform_request("GET", "/")
+        self.assertEqual(u"你好\uda6a", data)
@@ -15,6 +15,7 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import threading
 import time
 
 from elasticsearch.connection_pool import (
@@ -155,3 +156,57 @@ class TestConnectionPool(TestCase):
         self.assertEqual(3, pool.dead_count[42])
         pool.mark_live(42)
         self.assertNotIn(42, pool.dead_count)
+
+    def test_update_connections_keeps_state_of_unchanged_connections(self):
+        pool = ConnectionPool([(x, {}) for x in range(5)], randomize_hosts=False)
+        selector = pool.selector
+        now = time.time()
+        pool.dead_count[1] = 2
+        pool.mark_dead(1, now=now)
+        pool.mark_dead(4, now=now)
+
+        removed = pool.update_connections([(x, {}) for x in range(1, 4)] + [(7, {})])
+
+        self.assertEqual([0, 4], removed)
+        self.assertEqual([2, 3, 7], pool.connections)
+        self.assertEqual({1: 3}, pool.dead_count)
+        self.assertEqual((now + 4 * 60, 1), pool.dead.get())
+        self.assertTrue(pool.dead.empty())
+        self.assertIs(selector, pool.selector)
+        self.assertEqual([1, 2, 3, 7], sorted(pool.selector.connection_opts))
+
+    def test_update_connections_is_safe_with_concurrent_failures(self):
+        pool = ConnectionPool([(x, {}) for x in range(10)], dead_timeout=0)
+        done = threading.Event()
+
+        def fail_and_resurrect():
+            while not done.is_set():
+                for connection in list(pool.connections):
+                    pool.mark_dead(connection)
+                pool.resurrect(force=True)
+
+        def sniff():
+            for i in range(200):
+                pool.update_connections([(x, {}) for x in range(i % 3, 10)])
+            done.set()
+
+        threads = [threading.Thread(target=fail_and_resurrect) for _ in range(4)]
+        threads.append(threading.Thread(target=sniff))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+            # a full dead queue would block forever
+            self.assertFalse(thread.is_alive())
+
+        pool.update_connections([(x, {}) for x in range(5, 10)])
+        dead = []
+        while not pool.dead.empty():
+            dead.append(pool.dead.get()[1])
+        # every connection of the pool is either live or dead, never both
+        self.assertEqual(list(range(5, 10)), sorted(pool.connections + dead))
+
+    def test_update_connections_requires_connections(self):
+        pool = ConnectionPool([(x, {}) for x in range(2)])
+        self.assertRaises(ImproperlyConfigured, pool.update_connections, [])
@@ -16,12 +16,21 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import json
+import tempfile
 import mock
 import time
 import threading
 import pytest
 from elasticsearch import helpers, Elasticsearch
+from elasticsearch.compat import Full
 from elasticsearch.serializer import JSONSerializer
+from elasticsearch.exceptions import (
+    ConnectionError,
+    NotFoundError,
+    RequestError,
+    SerializationError,
+)
 
 from .test_cases import TestCase
 
@@ -210,3 +219,379 @@ class TestExpandActions(TestCase):
         self.assertEqual(
             ('{"index":{}}', "whatever"), helpers.expand_action("whatever")
         )
+
+
+class DummyMgetClient(object):
+    def __init__(self, missing=(), error=None, truncate=False):
+        self.transport = mock.Mock(serializer=JSONSerializer())
+        self.missing = missing
+        self.error = error
+        self.truncate = truncate
+        self.mget_calls = []
+        self.get_calls = []
+
+    def mget(self, body, **kwargs):
+        self.mget_calls.append((body, kwargs))
+        if self.error:
+            raise self.error
+        docs = []
+        for doc in body["docs"]:
+            if doc["_index"] == "missing-index":
+                docs.append(
+                    {
+                        "_index": doc["_index"],
+                        "_id": doc["_id"],
+                        "error": {"type": "index_not_found_exception"},
+                    }
+                )
+            elif doc["_index"] == "closed-index":
+                docs.append(
+                    {
+                        "_index": doc["_index"],
+                        "_id": doc["_id"],
+                        "error": {
+                            "type": "index_closed_exception",
+                            "reason": "closed",
+                            "status": 400,
+                        },
+                    }
+                )
+            elif doc["_id"] in self.missing:
+                docs.append(dict(doc, found=False))
+            else:
+                docs.append(dict(doc, found=True, _source={"id": doc["_id"]}))
+        if self.truncate:
+            docs.pop()
+        return {"docs": docs}
+
+    def get(self, index, id, **kwargs):
+        self.get_calls.append((index, id, kwargs))
+        return {"_index": index, "_id": id, "found": True}
+
+
+class TestBatchingClient(TestCase):
+    def _get_all(self, batching, calls):
+        results = [None] * len(calls)
+
+        def get(i, args, kwargs):
+            try:
+                results[i] = batching.get(*args, **kwargs)
+            except Exception as e:
+                results[i] = e
+
+        threads = [
+            threading.Thread(target=get, args=(i, args, kwargs))
+            for i, (args, kwargs) in enumerate(calls)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_gets_are_sent_as_one_mget(self):
+        client = DummyMgetClient(missing=("2",))
+        with helpers.BatchingClient(client, max_wait=0.5) as batching:
+            results = self._get_all(
+                batching,
+                [(("i", str(i)), {}) for i in range(3)]
+                + [(("missing-index", "1"), {})],
+            )
+
+        self.assertEqual(1, len(client.mget_calls))
+        self.assertEqual(4, len(client.mget_calls[0][0]["docs"]))
+        self.assertEqual({"id": "0"}, results[0]["_source"])
+        self.assertEqual({"id": "1"}, results[1]["_source"])
+        self.assertIsInstance(results[2], NotFoundError)
+        self.assertEqual(False, results[2].info["found"])
+        self.assertIsInstance(results[3], NotFoundError)
+        self.assertEqual("index_not_found_exception", results[3].error)
+
+    def test_item_errors_keep_their_status(self):
+        client = DummyMgetClient()
+        with helpers.BatchingClient(client, max_wait=0.5) as batching:
+            (result,) = self._get_all(batching, [(("closed-index", "1"), {})])
+
+        self.assertIsInstance(result, RequestError)
+        self.assertEqual(400, result.status_code)
+        self.assertEqual("closed", result.info["error"]["reason"])
+
+    def test_malformed_responses_fail_every_call(self):
+        client = DummyMgetClient(truncate=True)
+        batching = helpers.BatchingClient(client, max_wait=0.05)
+        results = self._get_all(batching, [(("i", "1"), {}), (("i", "2"), {})])
+
+        self.assertEqual([SerializationError] * 2, [type(r) for r in results])
+
+        # the flusher thread is still sending batches
+        client.truncate = False
+        results = self._get_all(batching, [(("i", "3"), {})])
+        batching.close()
+        self.assertEqual({"id": "3"}, results[0]["_source"])
+
+    def test_batches_are_split_by_size_and_params(self):
+        client = DummyMgetClient()
+        with helpers.BatchingClient(client, max_batch_size=2, max_wait=0.5) as b:
+            self._get_all(
+                b,
+                [(("i", str(i)), {}) for i in range(4)]
+                + [(("i", "5"), {"routing": "a"}), (("i", "6"), {"version": 1})],
+            )
+
+        self.assertEqual(3, len(client.mget_calls))
+        self.assertEqual(
+            [{}, {}, {"routing": "a"}],
+            sorted((kwargs for _, kwargs in client.mget_calls), key=len),
+        )
+        self.assertEqual([("i", "6", {"version": 1})], client.get_calls)
+
+    def test_mget_errors_are_raised_by_every_call(self):
+        client = DummyMgetClient(error=ConnectionError("N/A", "boom", None))
+        batching = helpers.BatchingClient(client, max_wait=0.01)
+        results = self._get_all(batching, [(("i", "1"), {}), (("i", "2"), {})])
+        batching.close()
+
+        self.assertEqual([ConnectionError] * 2, [type(r) for r in results])
+
+        # calls after close are sent on their own
+        batching.get("i", "3")
+        self.assertEqual([("i", "3", {})], client.get_calls)
+
+
+class DummyBulkClient(object):
+    def __init__(self, fail_ids=(), error=None):
+        self.transport = mock.Mock(serializer=JSONSerializer(), tracer=None)
+        self.fail_ids = fail_ids
+        self.error = error
+        self.bodies = []
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def bulk(self, body, **kwargs):
+        self.unblocked.wait()
+        self.bodies.append(body)
+        if self.error:
+            raise self.error
+        items = []
+        for line in body.strip().split("\n"):
+            action = json.loads(line)
+            if "_source" in action or len(action) != 1:
+                continue
+            op_type, meta = action.popitem()
+            if op_type not in ("index", "update", "delete"):
+                continue
+            status = 400 if meta.get("_id") in self.fail_ids else 201
+            items.append({op_type: dict(meta, status=status)})
+        return {"items": items, "errors": bool(self.fail_ids)}
+
+
+class TestBulkIndexer(TestCase):
+    def test_actions_are_sent_in_chunks(self):
+        client = DummyBulkClient(fail_ids=("2",))
+        results = []
+        with helpers.BulkIndexer(
+            client,
+            chunk_size=2,
+            flush_interval=0.05,
+            callback=lambda *r: results.append(r),
+        ) as indexer:
+            futures = [indexer.index("i", {"value": i}, id=str(i)) for i in range(3)]
+            indexer.delete("i", "3")
+            # the last two are sent after flush_interval
+            self.assertEqual(
+                {"_id": "0", "_index": "i", "status": 201}, futures[0].result()["index"]
+            )
+            self.assertRaises(helpers.BulkIndexError, futures[2].result)
+        self.assertEqual(2, len(client.bodies))
+        self.assertEqual([True, True, False, True], [ok for ok, _ in results])
+        self.assertEqual(
+            {"pending": 0, "sent": 3, "failed": 1, "chunks": 2}, indexer.stats()
+        )
+        self.assertRaises(RuntimeError, indexer.delete, "i", "4")
+
+    def test_chunks_are_split_by_bytes(self):
+        client = DummyBulkClient()
+        indexer = helpers.BulkIndexer(client, max_chunk_bytes=60, flush_interval=10)
+        for i in range(4):
+            indexer.index("i", {"value": "x" * 10})
+        self.assertTrue(indexer.flush())
+        self.assertEqual(4, indexer.stats()["sent"])
+        self.assertEqual(4, len(client.bodies))
+        indexer.close()
+
+    def test_pending_actions_are_bounded(self):
+        client = DummyBulkClient()
+        client.unblocked.clear()
+        indexer = helpers.BulkIndexer(client, chunk_size=1, max_pending=2)
+        indexer.index("i", {})
+        indexer.index("i", {})
+
+        self.assertRaises(Full, indexer.add, {"_index": "i"}, block=False)
+        self.assertRaises(Full, indexer.add, {"_index": "i"}, timeout=0.01)
+        self.assertEqual(2, indexer.stats()["pending"])
+        self.assertFalse(indexer.flush(timeout=0.01))
+
+        client.unblocked.set()
+        indexer.add({"_index": "i"}, timeout=1)
+        indexer.close()
+        self.assertEqual(3, indexer.stats()["sent"])
+
+    def test_transport_errors_fail_every_action(self):
+        client = DummyBulkClient(error=ConnectionError("N/A", "boom", None))
+        with helpers.BulkIndexer(client) as indexer:
+            futures = [indexer.index("i", {}) for _ in range(2)]
+
+        for future in futures:
+            self.assertTrue(future.done())
+            with self.assertRaises(helpers.BulkIndexError) as e:
+                future.result()
+            self.assertEqual("N/A", e.exception.errors[0]["index"]["status"])
+
+    def test_actions_missing_from_the_response_fail(self):
+        client = DummyBulkClient()
+        bulk = client.bulk
+        client.bulk = lambda body, **kwargs: {"items": bulk(body)["items"][:1]}
+        with helpers.BulkIndexer(client) as indexer:
+            futures = [indexer.index("i", {}, id=str(i)) for i in range(3)]
+
+        self.assertEqual("0", futures[0].result()["index"]["_id"])
+        for future in futures[1:]:
+            self.assertTrue(future.done())
+            self.assertRaises(helpers.BulkIndexError, future.result)
+        self.assertEqual(
+            {"pending": 0, "sent": 1, "failed": 2, "chunks": 1}, indexer.stats()
+        )
+
+    def test_errors_while_reading_the_response_fail_the_remaining_actions(self):
+        def process_bulk_chunk(*args, **kwargs):
+            yield True, {"index": {"_id": "0", "status": 201}}
+            raise ValueError("boom")
+
+        with mock.patch(
+            "elasticsearch.helpers.batching._process_bulk_chunk", process_bulk_chunk
+        ):
+            with helpers.BulkIndexer(DummyBulkClient()) as indexer:
+                futures = [indexer.index("i", {}) for _ in range(3)]
+
+        self.assertEqual(201, futures[0].result()["index"]["status"])
+        for future in futures[1:]:
+            with self.assertRaises(helpers.BulkIndexError) as e:
+                future.result()
+            self.assertEqual("boom", e.exception.errors[0]["error"])
+        self.assertEqual(2, indexer.stats()["failed"])
+
+
+class DummyMsearchClient(object):
+    def __init__(self, delays=None, error=None):
+        self.transport = mock.Mock(serializer=JSONSerializer(), tracer=None)
+        self.delays = delays or {}
+        self.error = error
+        self.calls = []
+
+    def msearch(self, body, **kwargs):
+        searches = [json.loads(line) for line in body[1::2]]
+        self.calls.append((len(searches), kwargs))
+        time.sleep(self.delays.get(searches[0]["size"], 0))
+        if self.error:
+            raise self.error
+        return {
+            "responses": [
+                {"error": {"type": "bad"}, "status": 400}
+                if s["size"] < 0
+                else {"hits": {"total": s["size"]}, "status": 200}
+                for s in searches
+            ]
+        }
+
+
+class TestMultiSearch(TestCase):
+    def test_results_are_yielded_in_order(self):
+        # the first chunk is the slowest to come back
+        client = DummyMsearchClient(delays={0: 0.1})
+        searches = [("i", {"size": i}) for i in range(7)] + [(None, {"size": -1})]
+
+        results = list(
+            helpers.multi_search(
+                client,
+                searches,
+                chunk_size=3,
+                thread_count=3,
+                max_concurrent_searches=6,
+                typed_keys=True,
+            )
+        )
+
+        self.assertEqual(list(range(7)), [r["hits"]["total"] for _, r in results[:7]])
+        self.assertEqual([True] * 7 + [False], [ok for ok, _ in results])
+        self.assertEqual(400, results[-1][1]["status"])
+        self.assertEqual(
+            [3, 3, 2], sorted((count for count, _ in client.calls), reverse=True)
+        )
+        self.assertEqual(
+            {"max_concurrent_searches": 2, "typed_keys": True}, client.calls[0][1]
+        )
+
+    def test_max_concurrent_searches_caps_thread_count(self):
+        self.assertEqual(2, helpers.actions._msearch_concurrency(4, 2, {}))
+        kwargs = {}
+        self.assertEqual(4, helpers.actions._msearch_concurrency(4, 10, kwargs))
+        self.assertEqual({"max_concurrent_searches": 2}, kwargs)
+
+    def test_transport_errors_fail_every_search(self):
+        client = DummyMsearchClient(error=ConnectionError("N/A", "boom", None))
+        searches = [("i", {"size": i}) for i in range(3)]
+
+        with self.assertRaises(ConnectionError):
+            list(helpers.multi_search(client, searches))
+
+        results = list(helpers.multi_search(client, searches, raise_on_exception=False))
+        self.assertEqual([False] * 3, [ok for ok, _ in results])
+        self.assertEqual("N/A", results[0][1]["status"])
+
+
+class TestStreamingPostData(TestCase):
+    def setUp(self):
+        super(TestStreamingPostData, self).setUp()
+        self.client = mock.Mock()
+        self.client.transport.serializer = JSONSerializer()
+        self.client.ml.post_data.side_effect = lambda job_id, body: {
+            "processed_record_count": body.count(b"\n")
+        }
+
+    def bodies(self):
+        return [kw["body"] for _, kw in self.client.ml.post_data.call_args_list]
+
+    def test_file_is_split_on_lines(self):
+        data = b'{"a":1}\n{"a":22}\n' + b"x" * 30 + b"\n{}"
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            for mode in ("rb", "r"):
+                self.client.ml.post_data.reset_mock()
+                with open(f.name, mode) as fileobj:
+                    results = list(
+                        helpers.streaming_post_data(
+                            self.client, "job", fileobj, max_chunk_bytes=20
+                        )
+                    )
+
+                self.assertEqual(3, len(results))
+                # the line larger than max_chunk_bytes is sent on its own
+                self.assertEqual(
+                    [b'{"a":1}\n{"a":22}\n', b"x" * 30 + b"\n", b"{}"]
+                    if mode == "rb"
+                    else [b'{"a":1}\n{"a":22}\n', b"x" * 30 + b"\n", b"{}\n"],
+                    self.bodies(),
+                )
+
+    def test_documents_are_serialized_and_split(self):
+        results = list(
+            helpers.streaming_post_data(
+                self.client, "job", ({"a": i} for i in range(5)), max_chunk_bytes=16
+            )
+        )
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(
+            [b'{"a":0}\n{"a":1}\n', b'{"a":2}\n{"a":3}\n', b'{"a":4}\n'], self.bodies()
+        )
@@ -0,0 +1,112 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+from elasticsearch.metrics import Histogram, Metrics
+
+from .test_cases import TestCase
+
+
+class TestHistogram(TestCase):
+    def test_observations_fall_in_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(4, snapshot["count"])
+        self.assertEqual(2.65, snapshot["sum"])
+        self.assertEqual(2.0, snapshot["max"])
+        self.assertEqual([(0.1, 2), (1.0, 3), (float("inf"), 4)], snapshot["buckets"])
+
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for _ in range(90):
+            histogram.observe(0.01)
+        for _ in range(10):
+            histogram.observe(0.5)
+
+        self.assertEqual(0.1, histogram.percentile(0.5))
+        self.assertEqual(0.1, histogram.percentile(0.9))
+        self.assertEqual(0.5, histogram.percentile(0.99))
+        self.assertEqual(0.0, Histogram().percentile(0.5))
+
+
+class TestMetrics(TestCase):
+    def setup_method(self, _):
+        self.metrics = Metrics(buckets=(0.1, 1.0))
+        self.metrics.record_request("search", 0.05, 10, 100)
+        self.metrics.record_request("search", 0.5, 10, 0, error=True)
+        self.metrics.record_retry("search")
+        self.metrics.record_node_request("localhost:9200", 0.05)
+        self.metrics.record_dead("localhost:9200")
+        self.metrics.record_sniff(0.2)
+
+    def test_snapshot(self):
+        snapshot = self.metrics.snapshot()
+
+        search = snapshot["endpoints"]["search"]
+        self.assertEqual(2, search["requests"])
+        self.assertEqual(1, search["errors"])
+        self.assertEqual(1, search["retries"])
+        self.assertEqual(20, search["bytes_sent"])
+        self.assertEqual(100, search["bytes_received"])
+        self.assertEqual(2, search["duration"]["count"])
+
+        node = snapshot["nodes"]["localhost:9200"]
+        self.assertEqual(1, node["requests"])
+        self.assertEqual(0, node["errors"])
+        self.assertEqual(1, node["dead"])
+        self.assertEqual(1, snapshot["sniff"]["count"])
+        self.assertEqual(0, snapshot["serialize"]["count"])
+
+    def test_reset(self):
+        self.metrics.reset()
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual({}, snapshot["endpoints"])
+        self.assertEqual({}, snapshot["nodes"])
+        self.assertEqual(0, snapshot["sniff"]["count"])
+
+    def test_requests_without_endpoint_are_other(self):
+        self.metrics.record_request(None, 0.01)
+
+        self.assertEqual(1, self.metrics.snapshot()["endpoints"]["other"]["requests"])
+
+    def test_to_prometheus(self):
+        lines = self.metrics.to_prometheus(prefix="es").splitlines()
+
+        self.assertIn("# TYPE es_request_duration_seconds histogram", lines)
+        self.assertIn(
+            'es_request_duration_seconds_bucket{endpoint="search",le="0.1"} 1', lines
+        )
+        self.assertIn(
+            'es_request_duration_seconds_bucket{endpoint="search",le="+Inf"} 2', lines
+        )
+        self.assertIn('es_request_duration_seconds_count{endpoint="search"} 2', lines)
+        self.assertIn('es_retries_total{endpoint="search"} 1', lines)
+        self.assertIn('es_node_marked_dead_total{node="localhost:9200"} 1', lines)
+        self.assertIn("es_sniff_duration_seconds_count 1", lines)
+
+    def test_to_statsd(self):
+        lines = self.metrics.to_statsd(prefix="es")
+
+        self.assertIn("es.endpoint.search.requests:2|g", lines)
+        self.assertIn("es.endpoint.search.duration.count:2|g", lines)
+        self.assertIn("es.endpoint.search.duration.max:500.000|g", lines)
+        self.assertIn("es.node.localhost_9200.dead:1|g", lines)
+        self.assertIn("es.sniff.duration.count:1|g", lines)
@@ -0,0 +1,117 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+from elasticsearch.retry import RetryBudget, CircuitBreaker
+
+from .test_cases import TestCase
+
+
+class TestRetryBudget(TestCase):
+    def test_min_retries_allowed_without_traffic(self):
+        budget = RetryBudget(ratio=0.1, window=10, min_retries=2)
+
+        self.assertTrue(budget.acquire_retry(now=100))
+        self.assertTrue(budget.acquire_retry(now=100))
+        self.assertFalse(budget.acquire_retry(now=100))
+        self.assertEqual(
+            {"requests": 0, "retries": 2, "rejected": 1, "available": 0},
+            budget.stats(now=100),
+        )
+
+    def test_retries_scale_with_requests(self):
+        budget = RetryBudget(ratio=0.1, window=10, min_retries=0)
+        for _ in range(20):
+            budget.record_request(now=100)
+
+        self.assertTrue(budget.acquire_retry(now=100))
+        self.assertTrue(budget.acquire_retry(now=101))
+        self.assertFalse(budget.acquire_retry(now=102))
+
+    def test_old_buckets_leave_the_window(self):
+        budget = RetryBudget(ratio=0.1, window=10, min_retries=1)
+        budget.acquire_retry(now=100)
+        self.assertFalse(budget.acquire_retry(now=105))
+
+        self.assertTrue(budget.acquire_retry(now=110))
+        self.assertEqual(1, budget.stats(now=110)["retries"])
+
+    def test_explicit_zero_time_is_used(self):
+        budget = RetryBudget(ratio=0.1, window=10, min_retries=1)
+        self.assertTrue(budget.acquire_retry(now=0))
+        self.assertFalse(budget.acquire_retry(now=5))
+        self.assertTrue(budget.acquire_retry(now=10))
+
+
+class TestCircuitBreaker(TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+
+        breaker.record_failure(now=100)
+        self.assertEqual("closed", breaker.state(now=100))
+        self.assertTrue(breaker.allow_request(now=100))
+
+        breaker.record_failure(now=100)
+        self.assertEqual("open", breaker.state(now=100))
+        self.assertFalse(breaker.allow_request(now=105))
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual("closed", breaker.state())
+
+    def test_half_open_allows_limited_probes(self):
+        breaker = CircuitBreaker(
+            failure_threshold=1, recovery_timeout=10, half_open_max_calls=1
+        )
+        breaker.record_failure(now=100)
+
+        self.assertEqual("half_open", breaker.state(now=110))
+        self.assertTrue(breaker.allow_request(now=110))
+        self.assertFalse(breaker.allow_request(now=110))
+
+        breaker.record_success()
+        self.assertEqual("closed", breaker.state(now=110))
+        self.assertTrue(breaker.allow_request(now=110))
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure(now=100)
+
+        self.assertTrue(breaker.allow_request(now=110))
+        breaker.record_failure(now=110)
+        self.assertEqual("open", breaker.state(now=115))
+        self.assertEqual(2, breaker.stats(now=115)["times_opened"])
+
+    def test_explicit_zero_time_is_used(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure(now=0)
+
+        self.assertEqual("open", breaker.state(now=5))
+        self.assertEqual("half_open", breaker.state(now=10))
+
+    def test_released_probe_slot_can_be_reused(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure(now=100)
+
+        self.assertTrue(breaker.allow_request(now=110))
+        self.assertFalse(breaker.allow_request(now=110))
+        breaker.release()
+        self.assertEqual("half_open", breaker.state(now=110))
+        self.assertTrue(breaker.allow_request(now=110))
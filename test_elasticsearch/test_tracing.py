@@ -0,0 +1,232 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+import json
+
+import mock
+
+from elasticsearch import Elasticsearch, Transport, helpers
+from elasticsearch.exceptions import ConnectionError, ImproperlyConfigured
+from elasticsearch.tracing import (
+    NOOP_SPAN,
+    OPENTELEMETRY_AVAILABLE,
+    OpenTelemetryTracer,
+    Span,
+    Tracer,
+    start_span,
+)
+
+from .test_cases import TestCase, SkipTest
+from .test_transport import DummyConnection
+
+
+class RecordingSpan(Span):
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = None
+        self.error = None
+
+    def __enter__(self):
+        if self.tracer.stack:
+            self.parent = self.tracer.stack[-1].name
+        self.tracer.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.stack.pop()
+        self.error = exc_type
+        self.tracer.spans.append(self)
+        return False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.stack = []
+        self.spans = []
+
+    def start_span(self, name, attributes=None):
+        return RecordingSpan(self, name, attributes)
+
+    def names(self):
+        return [(span.name, span.parent) for span in self.spans]
+
+
+class TestTracer(TestCase):
+    def test_default_tracer_is_noop(self):
+        self.assertIs(NOOP_SPAN, start_span(None, "search"))
+        with Tracer().start_span("search", {"a": 1}) as span:
+            span.set_attribute("b", 2)
+        self.assertIs(NOOP_SPAN, span)
+
+    def test_api_call_spans(self):
+        tracer = RecordingTracer()
+        client = Elasticsearch(connection_class=DummyConnection, tracer=tracer)
+
+        client.search(index="test", body={"query": {"match_all": {}}})
+
+        self.assertEqual(
+            [
+                ("elasticsearch.query_params", None),
+                ("elasticsearch.serialize", "search"),
+                ("elasticsearch.checkout", "search"),
+                ("elasticsearch.request", "search"),
+                ("elasticsearch.deserialize", "search"),
+                ("search", None),
+            ],
+            tracer.names(),
+        )
+        root = tracer.spans[-1]
+        self.assertEqual("search", root.attributes["db.operation"])
+        self.assertEqual("POST", root.attributes["http.request.method"])
+        self.assertEqual("/test/_search", root.attributes["url.path"])
+        self.assertEqual(200, tracer.spans[3].attributes["http.response.status_code"])
+
+    def test_custom_transports_get_plain_params(self):
+        client = Elasticsearch()
+        client.transport = mock.Mock()
+
+        client.search(index="x", size=1)
+
+        client.transport.perform_request.assert_called_once_with(
+            "POST", "/x/_search", params={"size": "1"}, headers={}, body=None
+        )
+
+    def test_every_attempt_has_a_span(self):
+        tracer = RecordingTracer()
+        t = Transport(
+            [
+                {"host": "node1", "exception": ConnectionError("abandon ship")},
+                {"host": "node2"},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+            tracer=tracer,
+        )
+
+        t.perform_request("GET", "/")
+
+        requests = [s for s in tracer.spans if s.name == "elasticsearch.request"]
+        self.assertEqual(
+            [
+                ("http://node1:9200", 0, ConnectionError),
+                ("http://node2:9200", 1, None),
+            ],
+            [
+                (
+                    s.attributes["elasticsearch.node"],
+                    s.attributes["elasticsearch.attempt"],
+                    s.error,
+                )
+                for s in requests
+            ],
+        )
+        self.assertEqual(("GET", None), tracer.names()[-1])
+
+    def test_streaming_bulk_chunk_spans(self):
+        tracer = RecordingTracer()
+        client = Elasticsearch(
+            connection_class=DummyConnection,
+            tracer=tracer,
+            data=json.dumps({"errors": False, "items": [{"index": {"status": 201}}]}),
+        )
+
+        list(helpers.streaming_bulk(client, [{"a": 1}, {"a": 2}], chunk_size=1))
+
+        chunks = [
+            s for s in tracer.spans if s.name == "elasticsearch.helpers.bulk_chunk"
+        ]
+        self.assertEqual(2, len(chunks))
+        self.assertEqual(1, chunks[0].attributes["elasticsearch.bulk.actions"])
+        self.assertEqual(False, chunks[0].attributes["elasticsearch.bulk.errors"])
+        self.assertIn(("bulk", "elasticsearch.helpers.bulk_chunk"), tracer.names())
+
+    def test_scan_page_spans(self):
+        tracer = RecordingTracer()
+        client = Elasticsearch(connection_class=DummyConnection, tracer=tracer)
+        shards = {"successful": 1, "skipped": 0, "total": 1}
+        pages = [
+            {"_scroll_id": "id", "_shards": shards, "hits": {"hits": [{"a": 1}]}},
+            {"_scroll_id": "id", "_shards": shards, "hits": {"hits": []}},
+        ]
+
+        with mock.patch.object(client, "search", return_value=pages[0]):
+            with mock.patch.object(client, "scroll", return_value=pages[1]):
+                with mock.patch.object(client, "clear_scroll"):
+                    self.assertEqual([{"a": 1}], list(helpers.scan(client)))
+
+        self.assertEqual(
+            [(0, 1), (1, 0)],
+            [
+                (
+                    s.attributes["elasticsearch.page"],
+                    s.attributes["elasticsearch.hits"],
+                )
+                for s in tracer.spans
+            ],
+        )
+
+
+class TestOpenTelemetryTracer(TestCase):
+    def test_requires_opentelemetry(self):
+        if OPENTELEMETRY_AVAILABLE:
+            raise SkipTest("opentelemetry is installed")
+        self.assertRaises(ImproperlyConfigured, OpenTelemetryTracer)
+
+    def test_spans_are_nested_and_record_errors(self):
+        try:
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+                InMemorySpanExporter,
+            )
+        except ImportError:
+            raise SkipTest("opentelemetry-sdk isn't installed")
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        t = Transport(
+            [{"exception": ConnectionError("N/A", "abandon ship", OSError())}],
+            connection_class=DummyConnection,
+            max_retries=0,
+            tracer=OpenTelemetryTracer(provider.get_tracer("test")),
+        )
+
+        self.assertRaises(ConnectionError, t.perform_request, "GET", "/")
+
+        spans = dict((span.name, span) for span in exporter.get_finished_spans())
+        self.assertEqual(
+            set(["GET", "elasticsearch.checkout", "elasticsearch.request"]),
+            set(spans),
+        )
+        self.assertEqual(
+            spans["GET"].context.span_id, spans["elasticsearch.request"].parent.span_id
+        )
+        self.assertFalse(spans["elasticsearch.request"].status.is_ok)
+        self.assertTrue(
+            spans["GET"]
+            .events[0]
+            .attributes["exception.type"]
+            .endswith("ConnectionError")
+        )
+        self.assertNotIn("db.operation", spans["GET"].attributes)
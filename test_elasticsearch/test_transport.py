@@ -19,12 +19,17 @@
 from __future__ import unicode_literals
 import json
 import time
+import threading
 from mock import patch
 
 from elasticsearch.transport import Transport, get_host_info
 from elasticsearch.connection import Connection
+from elasticsearch.connection.base import _StreamingBody
 from elasticsearch.connection_pool import DummyConnectionPool
 from elasticsearch.exceptions import ConnectionError, TransportError
+from elasticsearch.retry import RetryBudget, CircuitBreaker
+from elasticsearch.metrics import Metrics, ENDPOINT_PARAM
+from elasticsearch.cache import ResponseCache
 
 from .test_cases import TestCase
 
@@ -34,10 +39,13 @@ class DummyConnection(Connection):
         self.exception = kwargs.pop("exception", None)
         self.status, self.data = kwargs.pop("status", 200), kwargs.pop("data", "{}")
         self.headers = kwargs.pop("headers", {})
+        self.delay = kwargs.pop("delay", 0)
         self.calls = []
         super(DummyConnection, self).__init__(**kwargs)
 
     def perform_request(self, *args, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
         self.calls.append((args, kwargs))
         if self.exception:
             raise self.exception
@@ -95,6 +103,15 @@ CLUSTER_NODES_7x_PUBLISH_HOST = """{
 }"""
 
 
+def busy_request(transport, connection):
+    transport._acquire_connection(connection)
+    try:
+        connection.perform_request("GET", "/")
+    finally:
+        if transport._release_connection(connection):
+            connection.close()
+
+
 class TestHostsInfoCallback(TestCase):
     def test_master_only_nodes_are_ignored(self):
         nodes = [
@@ -245,6 +262,33 @@ class TestTransport(TestCase):
         self.assertRaises(ConnectionError, t.perform_request, "GET", "/")
         self.assertEqual(4, len(t.get_connection().calls))
 
+    def test_streamed_body_is_only_retried_until_sent(self):
+        class StreamingConnection(DummyConnection):
+            def perform_request(self, method, url, params, body, **kwargs):
+                if self.consume:
+                    list(body)
+                return super(StreamingConnection, self).perform_request(
+                    method, url, params, body, **kwargs
+                )
+
+        for consume, calls, marked_dead in ((False, 4, 4), (True, 1, 0)):
+            t = Transport(
+                [{"exception": ConnectionError("abandon ship")}],
+                connection_class=StreamingConnection,
+            )
+            t.get_connection().consume = consume
+            body = _StreamingBody(t.serializer, iter([{"index": {}}, {"a": 1}]))
+
+            with patch.object(t, "mark_dead") as mark_dead:
+                self.assertRaises(
+                    ConnectionError, t.perform_request, "POST", "/", body=body
+                )
+            self.assertEqual(calls, len(t.get_connection().calls))
+            # nothing to retry, the connection isn't marked as dead
+            self.assertEqual(marked_dead, mark_dead.call_count)
+            # passed on as is, not serialized
+            self.assertIs(body, t.get_connection().calls[0][0][3])
+
     def test_failed_connection_will_be_marked_as_dead(self):
         t = Transport(
             [{"exception": ConnectionError("abandon ship")}] * 2,
@@ -266,6 +310,267 @@ class TestTransport(TestCase):
             self.assertEqual(1, len(t.connection_pool.connections))
             self.assertEqual(1, len(t.connection_pool.dead_count))
 
+    def test_retry_budget_limits_retries(self):
+        t = Transport(
+            [{"exception": ConnectionError("abandon ship")}],
+            connection_class=DummyConnection,
+            retry_budget=RetryBudget(ratio=0, min_retries=1),
+        )
+
+        self.assertRaises(ConnectionError, t.perform_request, "GET", "/")
+        self.assertEqual(2, len(t.get_connection().calls))
+        self.assertRaises(ConnectionError, t.perform_request, "GET", "/")
+        self.assertEqual(3, len(t.get_connection().calls))
+        self.assertEqual(2, t.retry_budget.stats()["requests"])
+        self.assertEqual(2, t.retry_budget.stats()["rejected"])
+
+    def test_metrics_record_requests_retries_and_dead_nodes(self):
+        t = Transport(
+            [
+                {"host": "node1", "exception": ConnectionError("abandon ship")},
+                {"host": "node2", "data": '{"a": 1}'},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+            metrics=Metrics(),
+        )
+        conn_err, conn_ok = t.connection_pool.connections
+
+        self.assertEqual(
+            {"a": 1},
+            t.perform_request(
+                "GET", "/", params={ENDPOINT_PARAM: "search"}, body={"q": 1}
+            ),
+        )
+        self.assertEqual({}, conn_ok.calls[0][0][2])
+
+        snapshot = t.metrics.snapshot()
+        search = snapshot["endpoints"]["search"]
+        self.assertEqual(1, search["requests"])
+        self.assertEqual(0, search["errors"])
+        self.assertEqual(1, search["retries"])
+        self.assertEqual(len(b'{"q":1}'), search["bytes_sent"])
+        self.assertEqual(len('{"a": 1}'), search["bytes_received"])
+        self.assertEqual(1, snapshot["nodes"][conn_err.host]["errors"])
+        self.assertEqual(1, snapshot["nodes"][conn_err.host]["dead"])
+        self.assertEqual(0, snapshot["nodes"][conn_ok.host]["errors"])
+        self.assertEqual(0, snapshot["nodes"][conn_ok.host]["dead"])
+        self.assertEqual(1, snapshot["serialize"]["count"])
+        self.assertEqual(1, snapshot["deserialize"]["count"])
+
+    def test_metrics_record_failed_requests(self):
+        t = Transport(
+            [{"exception": TransportError(404, "not found")}],
+            connection_class=DummyConnection,
+            metrics=Metrics(),
+        )
+
+        self.assertRaises(TransportError, t.perform_request, "GET", "/")
+        self.assertEqual(1, t.metrics.snapshot()["endpoints"]["other"]["errors"])
+
+    def test_responses_are_cached_with_cache_ttl(self):
+        t = Transport(
+            [{"data": '{"hits": 1}'}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+        connection = t.get_connection()
+
+        first = t.perform_request(
+            "POST", "/i/_search", params={"cache_ttl": 10}, body={"q": 1}
+        )
+        first["hits"] = 2
+        self.assertEqual(
+            {"hits": 1},
+            t.perform_request(
+                "POST", "/i/_search", params={"cache_ttl": 10}, body={"q": 1}
+            ),
+        )
+        self.assertEqual(1, len(connection.calls))
+        self.assertEqual({}, connection.calls[0][0][2])
+
+        # other body, no cache_ttl
+        t.perform_request("POST", "/i/_search", params={"cache_ttl": 10}, body={})
+        t.perform_request("POST", "/i/_search", body={"q": 1})
+        self.assertEqual(3, len(connection.calls))
+        self.assertEqual(1, t.response_cache.stats()["hits"])
+
+    def test_writes_are_never_cached(self):
+        t = Transport(
+            [{"data": '{"result": "created"}'}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+
+        for _ in range(2):
+            t.perform_request(
+                "POST", "/i/_doc", params={"cache_ttl": 10}, body={"a": 1}
+            )
+            t.perform_request("DELETE", "/i", params={"cache_ttl": 10})
+        self.assertEqual(4, len(t.get_connection().calls))
+        self.assertEqual({}, t.get_connection().calls[0][0][2])
+        self.assertEqual(0, t.response_cache.stats()["entries"])
+
+    def test_errors_are_not_cached(self):
+        t = Transport(
+            [{"exception": TransportError(404, "not found")}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+
+        for _ in range(2):
+            self.assertRaises(
+                TransportError, t.perform_request, "GET", "/", params={"cache_ttl": 10}
+            )
+        self.assertEqual(2, len(t.get_connection().calls))
+        self.assertEqual(0, t.response_cache.stats()["entries"])
+
+    def test_concurrent_cache_misses_send_a_single_request(self):
+        t = Transport(
+            [{"delay": 0.05}],
+            connection_class=DummyConnection,
+            response_cache=ResponseCache(),
+        )
+        results = []
+
+        def search():
+            results.append(t.perform_request("GET", "/", params={"cache_ttl": 10}))
+
+        threads = [threading.Thread(target=search) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([{}] * 5, results)
+        self.assertEqual(1, len(t.get_connection().calls))
+
+    def test_concurrent_identical_reads_are_coalesced(self):
+        t = Transport(
+            [{"delay": 0.05, "data": '{"hits": 1}'}],
+            connection_class=DummyConnection,
+            coalesce_requests=True,
+        )
+        results = []
+
+        def request(method, url):
+            results.append(t.perform_request(method, url, body={"q": 1}))
+
+        threads = [
+            threading.Thread(target=request, args=args)
+            for args in [("POST", "/i/_search")] * 4 + [("POST", "/i/_doc")] * 2
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([{"hits": 1}] * 6, results)
+        self.assertEqual(6, len(set(id(result) for result in results)))
+        # one search and both writes
+        self.assertEqual(3, len(t.get_connection().calls))
+
+        # nothing is cached
+        t.perform_request("POST", "/i/_search", body={"q": 1})
+        self.assertEqual(4, len(t.get_connection().calls))
+
+    def test_streamed_bodies_are_not_coalesced(self):
+        class StreamingConnection(DummyConnection):
+            def perform_request(self, method, url, params, body, **kwargs):
+                self.sent = b"".join(body)
+                return super(StreamingConnection, self).perform_request(
+                    method, url, params, body, **kwargs
+                )
+
+        t = Transport(
+            [{}], connection_class=StreamingConnection, coalesce_requests=True
+        )
+        lines = iter([{"index": "i"}, {"query": {"match_all": {}}}])
+        body = _StreamingBody(t.serializer, lines)
+
+        t.perform_request("POST", "/_msearch", body=body)
+        self.assertEqual(
+            b'{"index":"i"}\n{"query":{"match_all":{}}}\n', t.get_connection().sent
+        )
+
+    def test_stateful_and_write_requests_are_not_coalesced(self):
+        t = Transport([{}], connection_class=DummyConnection, coalesce_requests=True)
+
+        for method, url, params, body in [
+            ("GET", "/i/_doc/1", None, None),
+            ("POST", "/i/_search", {"size": b"1"}, b"{}"),
+            ("GET", "/i/_mapping", None, None),
+            ("HEAD", "/i", None, None),
+        ]:
+            self.assertIsNotNone(t._coalesce_key(method, url, params, body, {}, ()))
+
+        for method, url, params, body in [
+            ("GET", "/_search/scroll", None, b'{"scroll_id": "x"}'),
+            ("POST", "/i/_search", {"scroll": "1m"}, b"{}"),
+            ("POST", "/i/_search", {"search_type": b"scan"}, b"{}"),
+            ("POST", "/i/_search", {"request_cache": b"false"}, b"{}"),
+            ("POST", "/_search", None, b'{"pit": {"id": "x"}}'),
+            ("GET", "/_tasks/x", None, None),
+            ("POST", "/i/_doc", None, b"{}"),
+        ]:
+            self.assertIsNone(t._coalesce_key(method, url, params, body, {}, ()))
+
+    def test_open_circuit_breaker_skips_connection(self):
+        t = Transport(
+            [{"exception": ConnectionError("abandon ship")}, {}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(failure_threshold=1),
+            randomize_hosts=False,
+            dead_timeout=0,
+        )
+        conn_err, conn_ok = t.connection_pool.connections
+
+        self.assertEqual({}, t.perform_request("GET", "/"))
+        self.assertEqual({}, t.perform_request("GET", "/"))
+        self.assertEqual({}, t.perform_request("GET", "/"))
+        self.assertEqual(1, len(conn_err.calls))
+        self.assertEqual(3, len(conn_ok.calls))
+        self.assertEqual("open", t.get_circuit_breaker(conn_err).state())
+        self.assertEqual("closed", t.get_circuit_breaker(conn_ok).state())
+        self.assertEqual(1, len(t.circuit_breaker_stats()))
+
+    def test_unexpected_errors_release_the_probe_slot(self):
+        t = Transport(
+            [{"exception": ValueError("bug")}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(
+                failure_threshold=1, recovery_timeout=0
+            ),
+        )
+        breaker = t.get_circuit_breaker(t.get_connection())
+        breaker.record_failure()
+
+        for _ in range(2):
+            self.assertRaises(ValueError, t.perform_request, "GET", "/")
+        self.assertEqual("half_open", breaker.state())
+        self.assertTrue(breaker.allow_request())
+
+    def test_all_circuit_breakers_open_fails_fast(self):
+        t = Transport(
+            [{"exception": ConnectionError("abandon ship")}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(failure_threshold=2),
+        )
+
+        self.assertRaises(TransportError, t.perform_request, "GET", "/")
+        self.assertEqual(2, len(t.get_connection().calls))
+
+    def test_client_errors_do_not_open_circuit_breaker(self):
+        t = Transport(
+            [{"status": 404, "exception": TransportError(404)}],
+            connection_class=DummyConnection,
+            circuit_breaker_class=lambda: CircuitBreaker(failure_threshold=1),
+        )
+
+        for _ in range(2):
+            self.assertRaises(TransportError, t.perform_request, "GET", "/")
+        self.assertEqual("closed", t.get_circuit_breaker(t.get_connection()).state())
+
     def test_sniff_will_use_seed_connections(self):
         t = Transport([{"data": CLUSTER_NODES}], connection_class=DummyConnection)
         t.set_connections([{"data": "invalid"}])
@@ -274,6 +579,70 @@ class TestTransport(TestCase):
         self.assertEqual(1, len(t.connection_pool.connections))
         self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
 
+    def test_sniff_requests_are_sent_in_parallel(self):
+        t = Transport(
+            [
+                {"exception": ConnectionError("abandon ship"), "delay": 0.5},
+                {"data": CLUSTER_NODES, "delay": 0.5},
+                {"data": CLUSTER_NODES, "delay": 0.5},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+
+        start = time.time()
+        t.sniff_hosts()
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(1, len(t.connection_pool.connections))
+        self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
+
+    def test_sniff_stops_sending_requests_after_first_success(self):
+        t = Transport(
+            [{"data": CLUSTER_NODES}, {"data": CLUSTER_NODES}, {"data": CLUSTER_NODES}],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+        t.SNIFF_MAX_WORKERS = 1
+        connections = t.connection_pool.connections
+
+        t.sniff_hosts()
+        self.assertEqual([1, 0, 0], [len(c.calls) for c in connections])
+
+    def test_sniff_errors_are_raised_only_if_no_node_succeeds(self):
+        t = Transport(
+            [
+                {"exception": TransportError(401, "unauthorized")},
+                {"data": CLUSTER_NODES, "delay": 0.1},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+        t.sniff_hosts()
+        self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
+
+        t = Transport(
+            [
+                {"exception": TransportError(401, "unauthorized"), "delay": 0.1},
+                {"exception": TransportError(500, "boom")},
+            ],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+        with self.assertRaises(TransportError) as e:
+            t.sniff_hosts()
+        # the error of the first node, whichever answers first
+        self.assertEqual(401, e.exception.status_code)
+
+    def test_sniff_fails_when_all_connections_fail(self):
+        t = Transport(
+            [{"exception": ConnectionError("abandon ship")}, {"data": "invalid"}],
+            connection_class=DummyConnection,
+        )
+        last_sniff = t.last_sniff
+
+        self.assertRaises(TransportError, t.sniff_hosts)
+        self.assertEqual(last_sniff, t.last_sniff)
+
     def test_sniff_on_start_fetches_and_uses_nodes_list(self):
         t = Transport(
             [{"data": CLUSTER_NODES}],
@@ -283,6 +652,15 @@ class TestTransport(TestCase):
         self.assertEqual(1, len(t.connection_pool.connections))
         self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
 
+    def test_sniff_is_recorded_in_metrics(self):
+        t = Transport(
+            [{"data": CLUSTER_NODES}],
+            connection_class=DummyConnection,
+            sniff_on_start=True,
+            metrics=Metrics(),
+        )
+        self.assertEqual(1, t.metrics.snapshot()["sniff"]["count"])
+
     def test_sniff_on_start_ignores_sniff_timeout(self):
         t = Transport(
             [{"data": CLUSTER_NODES}],
@@ -319,6 +697,123 @@ class TestTransport(TestCase):
         self.assertEqual(1, len(t.connection_pool.connections))
         self.assertIs(connection, t.get_connection())
 
+    def test_sniff_updates_connection_pool_in_place(self):
+        t = Transport(
+            [{"data": CLUSTER_NODES}, {"host": "1.1.1.1", "port": 123}],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+        t.add_connection({"host": "2.2.2.2", "port": 123})
+        connection_pool = t.connection_pool
+        seed, kept, removed = connection_pool.connections
+        t.connection_pool.mark_dead(kept)
+        removed.close = lambda: removed.calls.append("close")
+        seed.close = lambda: seed.calls.append("close")
+
+        CLUSTER_NODES_2 = CLUSTER_NODES.replace(
+            '"nodes" : {',
+            '"nodes" : {"other": {"http": {"publish_address": "3.3.3.3:123"}},',
+        )
+        seed.data = CLUSTER_NODES_2
+        t.sniff_hosts()
+
+        self.assertIs(connection_pool, t.connection_pool)
+        self.assertEqual(["close"], removed.calls)
+        self.assertEqual(
+            ["http://3.3.3.3:123"], [c.host for c in t.connection_pool.connections]
+        )
+        self.assertEqual({kept: 1}, t.connection_pool.dead_count)
+        self.assertIs(kept, t.connection_pool.dead.get()[1])
+        # seed connections are kept open for sniffing
+        self.assertNotIn("close", seed.calls)
+
+    def test_sniff_closes_busy_connections_once_idle(self):
+        t = Transport(
+            [{"data": CLUSTER_NODES}, {"host": "2.2.2.2", "delay": 0.2}],
+            connection_class=DummyConnection,
+            randomize_hosts=False,
+        )
+        seed, busy = t.connection_pool.connections
+        t.seed_connections = [seed]
+        busy.close = lambda: busy.calls.append("close")
+
+        request = threading.Thread(target=busy_request, args=(t, busy))
+        request.start()
+        while not busy.in_flight:
+            time.sleep(0.01)
+
+        t.sniff_hosts()
+        self.assertNotIn(busy, t.connection_pool.connections)
+        self.assertNotIn("close", busy.calls)
+
+        request.join()
+        self.assertIn("close", busy.calls)
+        self.assertEqual(0, busy.in_flight)
+
+    def test_requests_skip_connections_closed_after_checkout(self):
+        t = Transport(
+            [{"host": "2.2.2.2", "data": CLUSTER_NODES}],
+            connection_class=DummyConnection,
+        )
+        old = t.get_connection()
+        old.close = lambda: old.calls.append("close")
+        t.seed_connections = []
+        get_request_connection = t._get_request_connection
+
+        def checkout_then_sniff():
+            connection = get_request_connection()
+            if connection is old:
+                t.sniff_hosts()
+            return connection
+
+        t._get_request_connection = checkout_then_sniff
+        t.perform_request("GET", "/i")
+
+        self.assertEqual("close", old.calls[-1])
+        self.assertNotIn(("GET", "/i"), [c[0][:2] for c in old.calls[:-1]])
+        new = t.get_connection()
+        self.assertEqual("http://1.1.1.1:123", new.host)
+        self.assertEqual(("GET", "/i"), new.calls[0][0][:2])
+        self.assertEqual(0, new.in_flight)
+
+    def test_warmup_every_connection(self):
+        t = Transport(
+            [{"host": "a"}, {"host": "b", "exception": ConnectionError("N/A", "")}],
+            connection_class=DummyConnection,
+        )
+        self.assertEqual({"http://a:9200": 1, "http://b:9200": 0}, t.warmup(3))
+        for connection in t.connection_pool.connections:
+            self.assertEqual([(("HEAD", "/"), {})], connection.calls)
+
+    def test_drain_waits_for_in_flight_requests(self):
+        t = Transport([{"delay": 0.2}], connection_class=DummyConnection)
+        connection = t.get_connection()
+        closed = []
+        connection.close = lambda: closed.append(len(connection.calls))
+
+        request = threading.Thread(target=t.perform_request, args=("GET", "/"))
+        request.start()
+        while not connection.in_flight:
+            time.sleep(0.01)
+
+        self.assertTrue(t.drain())
+        self.assertEqual([1], closed)
+        request.join()
+
+    def test_drain_gives_up_after_timeout(self):
+        t = Transport([{"delay": 0.5}], connection_class=DummyConnection)
+        closed = []
+        t.get_connection().close = lambda: closed.append(True)
+
+        request = threading.Thread(target=t.perform_request, args=("GET", "/"))
+        request.start()
+        while not t.get_connection().in_flight:
+            time.sleep(0.01)
+
+        self.assertFalse(t.drain(timeout=0.05))
+        self.assertEqual([True], closed)
+        request.join()
+
     def test_sniff_on_fail_triggers_sniffing_on_fail(self):
         t = Transport(
             [{"exception": ConnectionError("abandon ship")}, {"data": CLUSTER_NODES}],
@@ -329,6 +824,7 @@ class TestTransport(TestCase):
         )
 
         self.assertRaises(ConnectionError, t.perform_request, "GET", "/")
+        t.sniffing_thread.join()
         self.assertEqual(1, len(t.connection_pool.connections))
         self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
 
@@ -345,6 +841,7 @@ class TestTransport(TestCase):
 
         conn_err, conn_data = t.connection_pool.connections
         response = t.perform_request("GET", "/")
+        t.sniffing_thread.join()
         self.assertEqual(json.loads(CLUSTER_NODES), response)
         self.assertEqual(1, sniff_hosts.call_count)
         self.assertEqual(1, len(conn_err.calls))
@@ -364,10 +861,54 @@ class TestTransport(TestCase):
         t.last_sniff = time.time() - 5.1
 
         t.perform_request("GET", "/")
+        t.sniffing_thread.join()
         self.assertEqual(1, len(t.connection_pool.connections))
         self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
         self.assertTrue(time.time() - 1 < t.last_sniff < time.time() + 0.01)
 
+    def test_sniff_runs_in_background_thread(self):
+        started, release = threading.Event(), threading.Event()
+
+        class BlockingTransport(Transport):
+            def sniff_hosts(self, initial=False):
+                started.set()
+                release.wait()
+                super(BlockingTransport, self).sniff_hosts(initial)
+
+        t = BlockingTransport(
+            [{"data": CLUSTER_NODES}],
+            connection_class=DummyConnection,
+            sniffer_timeout=5,
+        )
+        connection = t.get_connection()
+        t.last_sniff = time.time() - 5.1
+
+        # the request doesn't wait for the sniff and uses the current pool
+        self.assertEqual(json.loads(CLUSTER_NODES), t.perform_request("GET", "/"))
+        started.wait()
+        self.assertIs(connection, t.connection_pool.get_connection())
+
+        # only a single sniff is running at a time
+        sniffing_thread = t.sniffing_thread
+        self.assertIs(sniffing_thread, t.create_sniff_thread())
+
+        release.set()
+        sniffing_thread.join()
+        self.assertEqual("http://1.1.1.1:123", t.get_connection().host)
+
+    def test_failed_background_sniff_keeps_connection_pool(self):
+        t = Transport(
+            [{"data": "{}"}],
+            connection_class=DummyConnection,
+            sniffer_timeout=5,
+        )
+        connection_pool = t.connection_pool
+        t.last_sniff = time.time() - 5.1
+
+        self.assertEqual({}, t.perform_request("GET", "/"))
+        t.sniffing_thread.join()
+        self.assertIs(connection_pool, t.connection_pool)
+
     def test_sniff_7x_publish_host(self):
         # Test the response shaped when a 7.x node has publish_host set
         # and the returend data is shaped in the fqdn/ip:port format.
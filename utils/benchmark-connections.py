@@ -0,0 +1,187 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Benchmarks the connection classes against local stand-in servers.
+
+Two stand-ins are started on localhost: a threaded HTTP/1.1 server and an
+asyncio HTTP/2 server (cleartext, prior knowledge) built on the ``h2``
+library. Both answer every request with ``{}`` after ``--latency`` ms
+to simulate the time a node spends on a request. Each connection class
+then sends ``--requests`` requests from ``--concurrency`` threads sharing
+a single connection instance.
+
+    $ python utils/benchmark-connections.py --concurrency 64 --latency 5
+
+Requires ``httpx[http2]`` to be installed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+
+from elasticsearch.connection import HttpxHttpConnection, Urllib3HttpConnection
+
+RESPONSE_BODY = b"{}"
+
+
+class HTTP11Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def _respond(self):
+        length = int(self.headers.get("content-length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    do_GET = do_POST = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class H2Protocol(asyncio.Protocol):
+    latency = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        loop = asyncio.get_event_loop()
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.DataReceived):
+                self.conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                loop.call_later(self.latency, self._respond, event.stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+    def _respond(self, stream_id):
+        self.conn.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(RESPONSE_BODY))),
+            ],
+        )
+        self.conn.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+def start_http11_server(latency):
+    HTTP11Handler.latency = latency
+    server = ThreadingHTTPServer(("localhost", 0), HTTP11Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def start_h2_server(latency):
+    H2Protocol.latency = latency
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(loop.create_server(H2Protocol, "localhost", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def run(name, connection, requests, concurrency):
+    durations = []
+
+    def request(_):
+        start = time.perf_counter()
+        connection.perform_request("POST", "/_search", body=b'{"size": 0}')
+        durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(requests)))
+    elapsed = time.perf_counter() - start
+    connection.close()
+
+    durations.sort()
+    print(
+        "%-28s %8.0f req/s   p50 %6.2fms   p99 %6.2fms"
+        % (
+            name,
+            requests / elapsed,
+            statistics.median(durations) * 1000,
+            durations[int(len(durations) * 0.99) - 1] * 1000,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--latency", type=float, default=2.0, help="server latency in ms"
+    )
+    args = parser.parse_args()
+
+    latency = args.latency / 1000.0
+    http11_port = start_http11_server(latency)
+    h2_port = start_h2_server(latency)
+
+    h2_connection = HttpxHttpConnection(port=h2_port)
+    # Plain text HTTP/2 requires 'prior knowledge' as there's no TLS to negotiate it.
+    h2_connection.client = h2_connection._create_client(http1=False, http2=True)
+
+    candidates = [
+        (
+            "Urllib3HttpConnection",
+            Urllib3HttpConnection(port=http11_port, maxsize=args.concurrency),
+        ),
+        (
+            "HttpxHttpConnection (h1)",
+            HttpxHttpConnection(
+                port=http11_port, http2=False, maxsize=args.concurrency
+            ),
+        ),
+        ("HttpxHttpConnection (h2)", h2_connection),
+    ]
+    print(
+        "%d requests, %d threads, %.1fms server latency"
+        % (args.requests, args.concurrency, args.latency)
+    )
+    for name, connection in candidates:
+        run(name, connection, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+"""Measures the client-side overhead of ``perform_request``.
+
+Sends small sequential ``GET`` requests to a local mock server which
+answers immediately, so the time per request is dominated by the work
+the connection class does rather than by the network:
+
+    $ python utils/benchmark-perform-request.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from elasticsearch.connection import Urllib3HttpConnection
+
+try:
+    from elasticsearch import AIOHttpConnection
+except ImportError:
+    AIOHttpConnection = None
+
+RESPONSE_BODY = b'{"_index":"test","_id":"1","found":true,"_source":{}}'
+
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"content-type: application/json\r\n"
+    b"content-length: %d\r\n\r\n%s" % (len(RESPONSE_BODY), RESPONSE_BODY)
+)
+
+
+class MockServerProtocol(asyncio.Protocol):
+    """Answers every bodyless request with a canned response. Keeping
+    the server minimal keeps its share of the time per request small.
+    """
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.buffer = b""
+
+    def data_received(self, data):
+        self.buffer += data
+        while b"\r\n\r\n" in self.buffer:
+            _, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+            self.transport.write(RESPONSE)
+
+
+def serve(conn):
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        loop.create_server(MockServerProtocol, "localhost", 0)
+    )
+    conn.send(server.sockets[0].getsockname()[1])
+    loop.run_forever()
+
+
+def start_server():
+    # The server runs in its own process so it doesn't compete with
+    # the client for the GIL.
+    parent_conn, child_conn = multiprocessing.Pipe()
+    multiprocessing.Process(target=serve, args=(child_conn,), daemon=True).start()
+    return parent_conn.recv()
+
+
+def report(name, requests, elapsed):
+    print(
+        "%-22s %8.0f req/s   %6.1fus/request"
+        % (name, requests / elapsed, elapsed / requests * 1e6)
+    )
+
+
+def bench_urllib3(port, requests, params):
+    con = Urllib3HttpConnection(port=port)
+    con.perform_request("GET", "/test/_doc/1", params=params)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        con.perform_request("GET", "/test/_doc/1", params=params, timeout=5)
+    report("Urllib3HttpConnection", requests, time.perf_counter() - start)
+    con.close()
+
+
+async def bench_aiohttp(port, requests, params):
+    con = AIOHttpConnection(port=port)
+    await con.perform_request("GET", "/test/_doc/1", params=params)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await con.perform_request("GET", "/test/_doc/1", params=params, timeout=5)
+    report("AIOHttpConnection", requests, time.perf_counter() - start)
+    await con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument(
+        "--params", action="store_true", help="send query string parameters"
+    )
+    args = parser.parse_args()
+
+    port = start_server()
+    params = {"routing": "1", "_source": "false"} if args.params else None
+
+    bench_urllib3(port, args.requests, params)
+    if AIOHttpConnection is not None:
+        asyncio.get_event_loop().run_until_complete(
+            bench_aiohttp(port, args.requests, params)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+"""Measures the per-call overhead of the API methods.
+
+Calls ``get`` and ``search`` against a stub transport that returns
+immediately, so the time per call is spent processing the arguments in
+``query_params``, building the URL and calling into the transport:
+
+    $ python utils/benchmark-query-params.py --calls 200000
+"""
+
+import argparse
+import time
+
+from elasticsearch import Elasticsearch
+
+
+class StubTransport(object):
+    """Accepts the arguments of ``Transport`` and answers every request
+    with an empty response without serializing anything.
+    """
+
+    metrics = None
+    tracer = None
+
+    def __init__(self, hosts, **kwargs):
+        pass
+
+    def perform_request(self, method, url, headers=None, params=None, body=None):
+        return {}
+
+
+def report(name, calls, elapsed):
+    print("%-30s %6.2fus/call" % (name, elapsed / calls * 1e6))
+
+
+def bench(name, calls, func, *args, **kwargs):
+    func(*args, **kwargs)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(*args, **kwargs)
+    report(name, calls, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    es = Elasticsearch(transport_class=StubTransport)
+    query = {"query": {"match_all": {}}}
+
+    bench("get", args.calls, es.get, index="test", id="1")
+    bench(
+        "get (routing, _source)",
+        args.calls,
+        es.get,
+        index="test",
+        id="1",
+        routing="user-1",
+        _source=False,
+    )
+    bench("search", args.calls, es.search, index="test", body=query)
+    bench(
+        "search (size, from_, timeout)",
+        args.calls,
+        es.search,
+        index="test",
+        body=query,
+        size=10,
+        from_=20,
+        request_timeout=5,
+    )
+    bench(
+        "search (headers, opaque_id)",
+        args.calls,
+        es.search,
+        index="test",
+        body=query,
+        headers={"X-Custom": "1"},
+        opaque_id="app-1",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#  Licensed to Elasticsearch B.V. under one or more contributor
+#  license agreements. See the NOTICE file distributed with
+#  this work for additional information regarding copyright
+#  ownership. Elasticsearch B.V. licenses this file to you under
+#  the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+
+"""Measures connection warm-up and TLS session reuse against local TLS nodes.
+
+``--nodes`` stand-in HTTPS servers are started on localhost with a freshly
+generated self-signed certificate (requires the ``openssl`` command). Every
+new TCP connection is delayed by ``--rtt`` ms to simulate the network
+round-trip of opening it. Two scenarios are measured:
+
+* cold start: the latency of the first request to every node of a new
+  ``Transport``, with and without ``Transport.warmup()``.
+* reconnects: the servers close the connection after every response so
+  each request opens a new socket, with and without
+  ``create_ssl_context(session_reuse=True)``.
+
+    $ python utils/benchmark-tls-warmup.py --nodes 3 --rtt 20
+"""
+
+import argparse
+import os
+import shutil
+import ssl
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from elasticsearch import Transport
+from elasticsearch.connection import create_ssl_context
+
+RESPONSE_BODY = b"{}"
+
+
+class TLSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    ssl_context = None
+    rtt = 0.0
+    close_connections = False
+    resumed = []
+
+    def setup(self):
+        # The handshake is done in the handler's thread so that
+        # new connections to a node don't queue up behind each other.
+        time.sleep(self.rtt)
+        self.request = self.ssl_context.wrap_socket(self.request, server_side=True)
+        self.resumed.append(self.request.session_reused)
+        super().setup()
+
+    def _respond(self):
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(RESPONSE_BODY)))
+        if self.close_connections:
+            self.send_header("connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(RESPONSE_BODY)
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (ConnectionError, ssl.SSLError):
+            pass
+
+
+def create_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.check_call(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return cert, key
+
+
+def start_server():
+    server = ThreadingHTTPServer(("localhost", 0), TLSHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def create_transport(ports, ssl_context, maxsize):
+    hosts = [{"host": "localhost", "port": port} for port in ports]
+    return Transport(
+        hosts,
+        use_ssl=True,
+        ssl_context=ssl_context,
+        maxsize=maxsize,
+        sniff_on_start=False,
+    )
+
+
+def first_requests(transport):
+    # The first request to every node, in the order of the connection pool.
+    start = time.perf_counter()
+    for connection in transport.connection_pool.connections:
+        connection.perform_request("GET", "/")
+    return time.perf_counter() - start
+
+
+def cold_start(ports, cert, connections_per_node, repeat):
+    cold, warm, warmup = [], [], []
+    for _ in range(repeat):
+        transport = create_transport(
+            ports, create_ssl_context(cafile=cert), connections_per_node
+        )
+        cold.append(first_requests(transport))
+        transport.close()
+
+        transport = create_transport(
+            ports, create_ssl_context(cafile=cert), connections_per_node
+        )
+        start = time.perf_counter()
+        transport.warmup(connections_per_node)
+        warmup.append(time.perf_counter() - start)
+        warm.append(first_requests(transport))
+        transport.close()
+
+    print("cold start, first request to every node (median of %d)" % repeat)
+    print("  without warmup            %8.2fms" % (statistics.median(cold) * 1000))
+    print(
+        "  after warmup(%d)           %8.2fms   (warmup took %.2fms)"
+        % (
+            connections_per_node,
+            statistics.median(warm) * 1000,
+            statistics.median(warmup) * 1000,
+        )
+    )
+
+
+def reconnects(ports, cert, requests):
+    TLSHandler.close_connections = True
+    print("reconnects, new socket for each of %d requests" % requests)
+    for session_reuse in (False, True):
+        del TLSHandler.resumed[:]
+        ssl_context = create_ssl_context(cafile=cert, session_reuse=session_reuse)
+        transport = create_transport(ports[:1], ssl_context, 1)
+        connection = transport.connection_pool.connections[0]
+
+        durations = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            connection.perform_request("GET", "/")
+            durations.append(time.perf_counter() - start)
+        transport.close()
+
+        print(
+            "  session_reuse=%-5s       %8.2fms per request   %3d%% resumed"
+            % (
+                session_reuse,
+                statistics.median(durations) * 1000,
+                100 * sum(TLSHandler.resumed) / len(TLSHandler.resumed),
+            )
+        )
+    TLSHandler.close_connections = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument(
+        "--rtt", type=float, default=20.0, help="delay of a new connection in ms"
+    )
+    parser.add_argument("--connections-per-node", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        cert, key = create_certificate(directory)
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(cert, key)
+        TLSHandler.ssl_context = server_context
+        TLSHandler.rtt = args.rtt / 1000.0
+        ports = [start_server() for _ in range(args.nodes)]
+
+        print("%d nodes, %.1fms per new connection" % (args.nodes, args.rtt))
+        cold_start(ports, cert, args.connections_per_node, args.repeat)
+        reconnects(ports, cert, args.requests)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -70,9 +70,14 @@ GLOBAL_QUERY_PARAMS = {
     "filter_path": "Optional[Union[str, Collection[str]]]",
     "request_timeout": "Optional[Union[int, float]]",
     "ignore": "Optional[Union[int, Collection[int]]]",
+    # only accepted by read-only APIs, see API.cacheable
+    "cache_ttl": "Optional[Union[int, float]]",
     "opaque_id": "Optional[str]",
 }
 
+# same as elasticsearch.cache.CACHEABLE_POST_ENDPOINTS
+CACHEABLE_POST_ENDPOINTS = {"_search", "_count", "_msearch", "_mget"}
+
 jinja_env = Environment(
     loader=FileSystemLoader([CODE_ROOT / "utils" / "templates"]),
     trim_blocks=True,
@@ -286,6 +291,16 @@ class API:
             return "POST"
         return default_method
 
+    @property
+    def cacheable(self):
+        """Whether the transport caches responses of calls given a 'cache_ttl'."""
+        if self.method in ("GET", "HEAD"):
+            return True
+        return (
+            self.method == "POST"
+            and self.path["path"].rsplit("/", 1)[-1] in CACHEABLE_POST_ENDPOINTS
+        )
+
     @property
     def url_parts(self):
         path = self.path["path"]